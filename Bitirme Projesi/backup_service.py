@@ -131,7 +131,8 @@ def export_to_csv(output_path: str = None) -> tuple[bool, str]:
         tuple: (Başarılı mı, Mesaj)
     """
     import csv
-    import json
+    from itertools import chain
+    from storage import iter_collection
     
     if output_path is None:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -142,18 +143,17 @@ def export_to_csv(output_path: str = None) -> tuple[bool, str]:
     output_path.parent.mkdir(exist_ok=True)
     
     try:
-        cards_file = DATA_DIR / "cards.json"
-        if not cards_file.exists():
+        columns = ['id', 'deck_id', 'front', 'back', 'created_at']
+        cards = iter_collection('cards', fields=columns)
+        first = next(cards, None)
+        if first is None:
             return False, "Dışa aktarılacak kart bulunamadı."
         
-        with open(cards_file, 'r', encoding='utf-8') as f:
-            cards = json.load(f)
-        
         with open(output_path, 'w', encoding='utf-8', newline='') as f:
             writer = csv.writer(f)
-            writer.writerow(['id', 'deck_id', 'front', 'back', 'created_at'])
+            writer.writerow(columns)
             
-            for card in cards:
+            for card in chain([first], cards):
                 writer.writerow([
                     card.get('id', ''),
                     card.get('deck_id', ''),
@@ -199,8 +199,7 @@ def import_from_csv(file_path: str, deck_id: int) -> tuple[bool, str, int]:
         if not success:
             return False, f"Geçersiz deck: {msg}", 0
         
-        imported_count = 0
-        from card_service import create_card
+        from card_service import create_cards
         
         with open(file_path, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
@@ -209,19 +208,21 @@ def import_from_csv(file_path: str, deck_id: int) -> tuple[bool, str, int]:
             if not first_row:
                 return False, "CSV dosyası boş.", 0
             
+            pairs = []
             if first_row[0].lower() in ['front', 'soru', 'question', 'ön', 'on']:
                 pass
             else:
                 if len(first_row) >= 2:
-                    success, _, _ = create_card(deck_id, first_row[0], first_row[1])
-                    if success:
-                        imported_count += 1
+                    pairs.append((first_row[0], first_row[1]))
             
             for row in reader:
                 if len(row) >= 2 and row[0].strip() and row[1].strip():
-                    success, _, _ = create_card(deck_id, row[0].strip(), row[1].strip())
-                    if success:
-                        imported_count += 1
+                    pairs.append((row[0], row[1]))
+        
+        success, msg, cards = create_cards(deck_id, pairs)
+        if not success:
+            return False, msg, 0
+        imported_count = len(cards)
         
         logger.info(f"CSV import: {imported_count} kart eklendi (deck: {deck_id})")
         return True, f"{imported_count} kart başarıyla içe aktarıldı!", imported_count
@@ -8,12 +8,12 @@ main.py'nin yükünü azaltmak için ayrı modülde tutulur.
 from auth import register, login, logout, is_logged_in, get_current_user
 from deck_service import create_deck, list_decks, update_deck, delete_deck
 from card_service import create_card, list_cards, update_card, delete_card, get_card
-from review_service import get_due_cards, submit_review
-from report_service import print_today_summary, print_weekly_report, get_all_decks_report
+from review_service import get_due_cards, start_review_session, record_answer, end_review_session
+from report_service import print_today_summary, print_weekly_report, get_all_decks_report, get_due_forecast
 from backup_service import create_backup, list_backups, export_to_csv
 from utils import (
     print_header, print_success, print_error, print_warning, print_info,
-    get_input, get_int_input, confirm, get_quality_description
+    get_input, get_int_input, confirm, get_quality_description, add_days
 )
 
 
@@ -116,7 +116,13 @@ def handle_delete_deck():
     
     deck_id = get_int_input("Silinecek Deck ID: ")
     
-    if confirm("Bu deck ve tüm kartları silinecek. Emin misiniz?"):
+    success, msg = delete_deck(deck_id, dry_run=True)
+    if not success:
+        print_error(msg)
+        return
+    print_info(msg)
+    
+    if confirm("Emin misiniz?"):
         success, msg = delete_deck(deck_id)
         if success:
             print_success(msg)
@@ -215,18 +221,39 @@ def handle_delete_card(deck_id: int):
 
 
 def handle_review_session():
-    """Çalışma oturumu akışı."""
+    """Çalışma oturumu akışı. Cevaplar tamponlanır, oturum bitince (veya yarıda kalınca) kaydedilir."""
+    success, msg, recovered = start_review_session()
+    if not success:
+        print_error(msg)
+        return
+    if recovered:
+        print_info(msg)
+    
+    try:
+        studied = _run_review_session()
+    finally:
+        success, msg, _ = end_review_session()
+        if not success:
+            print_error(msg)
+    
+    if studied:
+        print_header("✨ Çalışma Tamamlandı!")
+        print_today_summary()
+
+
+def _run_review_session() -> bool:
+    """Due kartları sırayla sorar ve cevapları oturuma ekler. Kart çalışıldıysa True döner."""
     success, msg, due_cards = get_due_cards()
     
     if not success:
         print_error(msg)
-        return
+        return False
     
     if not due_cards:
         print_header("🎉 Tebrikler!")
         print("Bugün çalışılacak kart kalmadı.")
         print("Yarın tekrar gel!")
-        return
+        return False
     
     print_header(f"📖 Bugün Çalış - {len(due_cards)} kart")
     
@@ -246,7 +273,7 @@ def handle_review_session():
         
         quality = get_int_input("Puanınız (0-5): ", 0, 5)
         
-        success, msg, srs = submit_review(card['id'], quality)
+        success, msg = record_answer(card['id'], quality)
         if success:
             print_success(msg)
         else:
@@ -257,8 +284,7 @@ def handle_review_session():
                 print_info("Çalışma sonlandırıldı.")
                 break
     
-    print_header("✨ Çalışma Tamamlandı!")
-    print_today_summary()
+    return True
 
 
 def handle_deck_reports():
@@ -287,6 +313,41 @@ def handle_deck_reports():
             print(f"   Öğrenme: {mastery['learning']} | İnceleme: {mastery['reviewing']} | Ustalaşmış: {mastery['mastered']}")
 
 
+def handle_due_forecast():
+    """Due yükü tahmini akışı."""
+    print_header("📈 Due Yükü Tahmini")
+    print("1) 30 gün")
+    print("2) 90 gün")
+    print("3) 365 gün")
+    
+    days = {1: 30, 2: 90, 3: 365}[get_int_input("Seçiminiz: ", 1, 3)]
+    success, msg, forecast = get_due_forecast(days)
+    
+    if not success:
+        print_error(msg)
+        return
+    
+    projected = forecast['projected']
+    print(f"\nŞu an planlanmış: {sum(forecast['scheduled'])} review")
+    print(f"Tekrarlar dahil beklenen: {forecast['cumulative'][-1]:.0f} review")
+    print(f"En yoğun gün: {forecast['peak']['date']} ({forecast['peak']['count']:.0f} review)")
+    
+    step = 1 if days <= 30 else 7 if days <= 90 else 30
+    print(f"\n{'Günlük' if step == 1 else f'{step} günlük'} dağılım:")
+    print("-" * 40)
+    
+    highest = max(sum(projected[i:i + step]) for i in range(0, days, step)) or 1
+    for i in range(0, days, step):
+        count = sum(projected[i:i + step])
+        bar = "█" * round(count / highest * 20)
+        print(f"{add_days(forecast['start'], i)}: {bar} ({count:.0f})")
+    
+    if forecast['decks']:
+        print("\nDeck bazında:")
+        for deck in forecast['decks']:
+            print(f"   📦 {deck['deck_name']}: {deck['projected']:.0f} review (planlanmış {deck['scheduled']})")
+
+
 def handle_backup():
     """Yedekleme akışı."""
     print_header("💾 Yedekleme")
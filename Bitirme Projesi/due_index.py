@@ -0,0 +1,205 @@
+"""
+due_index.py - Kullanıcı Bazlı Due İndeksi
+
+Her kullanıcının SRS kayıtlarını deck bazında (due gün numarası, srs id)
+çiftlerinin sıralı listesi olarak tutar. Bugün due olan kartlar her listenin
+başındaki bir önektir; ikili arama ile bulunur ve deck'ler heapq.merge ile
+due sırasına göre birleştirilir. Kuyruğu almak due kart sayısıyla orantılıdır,
+kullanıcının toplam kart sayısıyla değil.
+
+İndeks srs_state ve cards yazmalarını storage dinleyicileriyle izler:
+submit_review, reset_card, create_card ve silmeler indeksi yeniden kurmadan
+günceller. Başka bir süreç koleksiyonu değiştirdiyse (imza uyuşmazsa) indeks
+atılır ve kullanıcı başına ilk erişimde yeniden kurulur.
+
+Kullanım:
+    srs_ids = get_due(user_id, get_today_ordinal(), deck_id=3, limit=20)
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+import storage
+from utils import date_to_ordinal
+
+WATCHED = ('srs_state', 'cards')
+NO_DATE = 0    # due_date yok/geçersiz: her zaman due sayılır
+
+_state = {
+    'signatures': None,    # koleksiyon -> {bölüm adı: imza}; None ise indeks geçersiz
+    'users': {},           # user_id -> {deck_id: [(due, srs_id), ...] sıralı}
+    'entries': {},         # srs_id -> (user_id, deck_id, due)
+    'card_decks': {}       # card_id -> deck_id (indekslenmiş kartlar)
+}
+
+
+def _reset():
+    """İndeksi atar; sonraki erişimde yeniden kurulur."""
+    _state['signatures'] = None
+    _state['users'].clear()
+    _state['entries'].clear()
+    _state['card_decks'].clear()
+
+
+def _sync() -> bool:
+    """
+    İndeksin koleksiyonlarla uyumlu olduğunu doğrular, değilse atar.
+    
+    Returns:
+        bool: İndeks kullanılabilir ise True (açık transaction'da kaydedilmemiş
+              değişiklik varsa False)
+    """
+    signatures = {}
+    for collection_name in WATCHED:
+        signature = storage.get_collection_signature(collection_name)
+        if signature is None:
+            return False
+        signatures[collection_name] = dict(signature) if storage.get_backend() == 'json' else signature
+    
+    if _state['signatures'] != signatures:
+        _reset()
+        _state['signatures'] = signatures
+    return True
+
+
+def _deck_of(card_id) -> int | None:
+    """Kartın deck'ini döndürür (kart yoksa None)."""
+    deck_id = _state['card_decks'].get(card_id)
+    if deck_id is None:
+        card = storage.find_by_id('cards', card_id)
+        if card is None:
+            return None
+        deck_id = card.get('deck_id')
+        _state['card_decks'][card_id] = deck_id
+    return deck_id
+
+
+def _add(srs: dict, decks: dict):
+    """SRS kaydını kullanıcının indeksine ekler (kartı olmayan kayıtlar atlanır)."""
+    deck_id = _deck_of(srs.get('card_id'))
+    if deck_id is None:
+        return
+    due = date_to_ordinal(srs.get('due_date')) or NO_DATE
+    insort(decks.setdefault(deck_id, []), (due, srs['id']))
+    _state['entries'][srs['id']] = (srs.get('user_id'), deck_id, due)
+
+
+def _remove(srs_id):
+    """SRS kaydını indeksten çıkarır (indekste yoksa bir şey yapmaz)."""
+    entry = _state['entries'].pop(srs_id, None)
+    if entry is None:
+        return
+    user_id, deck_id, due = entry
+    bucket = _state['users'][user_id][deck_id]
+    position = bisect_left(bucket, (due, srs_id))
+    if position < len(bucket) and bucket[position] == (due, srs_id):
+        del bucket[position]
+
+
+def _build_user(user_id: int) -> tuple[dict, list]:
+    """Kullanıcının deck bazlı due listelerini kurar: (deck listeleri, [(srs_id, girdi), ...])."""
+    decks = {}
+    entries = []
+    for srs in storage.find_all_by_field('srs_state', 'user_id', user_id):
+        deck_id = _deck_of(srs.get('card_id'))
+        if deck_id is None:
+            continue
+        due = date_to_ordinal(srs.get('due_date')) or NO_DATE
+        decks.setdefault(deck_id, []).append((due, srs['id']))
+        entries.append((srs['id'], (user_id, deck_id, due)))
+    for bucket in decks.values():
+        bucket.sort()
+    return decks, entries
+
+
+def _user_index(user_id: int) -> dict:
+    """Kullanıcının indeksini döndürür, gerekirse kurar."""
+    if not _sync():
+        return _build_user(user_id)[0]
+    
+    decks = _state['users'].get(user_id)
+    if decks is None:
+        decks, entries = _build_user(user_id)
+        _state['users'][user_id] = decks
+        _state['entries'].update(entries)
+    return decks
+
+
+def _on_change(collection_name: str, old_signature, new_signature, ops: list | None):
+    """storage değişiklik dinleyicisi: yazmayı indekse uygular veya indeksi atar."""
+    signatures = _state['signatures']
+    if signatures is None:
+        return
+    
+    base_name = storage._base_name(collection_name)
+    known = signatures[base_name]
+    if ops is None or known.get(collection_name) != old_signature:
+        _reset()
+        return
+    known[collection_name] = new_signature
+    
+    for op, value in ops:
+        if base_name == 'cards':
+            if op == 'put' and value['id'] in _state['card_decks'] and (
+                _state['card_decks'][value['id']] != value.get('deck_id')
+            ):
+                _reset()
+                return
+        elif op == 'del':
+            _remove(value)
+        else:
+            _remove(value['id'])
+            decks = _state['users'].get(value.get('user_id'))
+            if decks is not None:
+                _add(value, decks)
+
+
+def get_due(user_id: int, today: int, deck_id: int = None, limit: int = None) -> list:
+    """
+    Kullanıcının due olan SRS kayıtlarının ID'lerini döndürür.
+    
+    Args:
+        user_id: Kullanıcı ID
+        today: Bugünün gün numarası (bkz. utils.get_today_ordinal)
+        deck_id: Verilirse sadece bu deck'in kartları
+        limit: En fazla kaç kayıt döneceği (None ise hepsi)
+    
+    Returns:
+        list: SRS ID'leri, en eski due tarihi önce
+    """
+    decks = _user_index(user_id)
+    bound = (today, float('inf'))
+    
+    if deck_id is not None:
+        buckets = [decks.get(deck_id, [])]
+    else:
+        buckets = list(decks.values())
+    if not buckets:
+        return []
+    
+    prefixes = [islice(bucket, bisect_right(bucket, bound)) for bucket in buckets]
+    due = prefixes[0] if len(prefixes) == 1 else heapq.merge(*prefixes)
+    return [srs_id for _, srs_id in islice(due, limit)]
+
+
+def count_due(user_id: int, today: int, deck_id: int = None) -> int:
+    """
+    Kullanıcının due olan SRS kayıtlarının sayısını döndürür.
+    
+    Args:
+        user_id: Kullanıcı ID
+        today: Bugünün gün numarası
+        deck_id: Verilirse sadece bu deck'in kartları
+    
+    Returns:
+        int: Due kayıt sayısı
+    """
+    decks = _user_index(user_id)
+    bound = (today, float('inf'))
+    buckets = [decks.get(deck_id, [])] if deck_id is not None else decks.values()
+    return sum(bisect_right(bucket, bound) for bucket in buckets)
+
+
+for _collection_name in WATCHED:
+    storage.add_listener(_collection_name, _on_change)
@@ -0,0 +1,218 @@
+"""
+forecast.py - Due Yükü Tahmini
+
+Önümüzdeki N günün her birinde kaç review yapılacağını kullanıcı ve deck
+bazında tahmin eder. Tahmin iki parçadan oluşur:
+
+1. Planlanmış yük: SRS kayıtlarının due gün numaraları bugüne göre gün
+   farkına çevrilip bir histograma sayılır (gecikmiş ve tarihsiz kartlar
+   bugüne yazılır). Histogramın prefix-sum'ı "k gün içinde kaç kart due"
+   sorusunu sabit zamanda cevaplar.
+2. Tekrar projeksiyonu: Her kart due olduğu gün çalışılmış sayılır; kalite
+   puanı kullanıcının geçmiş kalite dağılımından (review_rollups) çekilir ve
+   yeni interval SM-2 ile hesaplanır. Simülasyon gün gün ilerler, her gün o
+   gün due olan kartların tamamı sm2_batch.calculate_sm2_batch ile tek
+   çağrıda güncellenir (sonuçlar review_service.calculate_sm2 ile aynıdır).
+
+Projeksiyon sabit tohumla çalışır, aynı veri için aynı sonucu verir. Kart
+sayısı MIN_SAMPLE'dan azsa kartlar çoğaltılıp sonuç ölçeklenir; böylece az
+kartlı kullanıcılarda da tahmin tek bir rastgele senaryoya bağlı kalmaz.
+
+Kullanım:
+    result = forecast_user(user_id, get_today_ordinal(), days=90)
+    result['projected'][6]      # 7. gün beklenen review sayısı
+    result['cumulative'][29]    # 30 gün içindeki toplam
+"""
+
+import random
+from itertools import accumulate
+
+from rollups import get_rollups
+from sm2_batch import calculate_sm2_batch
+from srs_store import get_store
+from storage import find_all_by_field, find_all_in
+
+MAX_DAYS = 365
+MIN_SAMPLE = 10_000    # Projeksiyonda en az bu kadar kart simüle edilir
+SEED = 0
+
+# Kullanıcının hiç review'u yoksa kullanılan kalite dağılımı (hep 4)
+DEFAULT_QUALITY_WEIGHTS = (0, 0, 0, 0, 1, 0)
+
+
+def quality_weights(user_id: int) -> list:
+    """
+    Kullanıcının geçmiş review'larından 0-5 kalite dağılımını döndürür.
+    
+    Args:
+        user_id: Kullanıcı ID
+    
+    Returns:
+        list: Kalite başına olasılık (toplamı 1); geçmiş yoksa DEFAULT_QUALITY_WEIGHTS
+    """
+    histogram = [0] * 6
+    for row in get_rollups(user_id):
+        histogram = [a + b for a, b in zip(histogram, row['histogram'])]
+    
+    total = sum(histogram)
+    if not total:
+        total = sum(DEFAULT_QUALITY_WEIGHTS)
+        histogram = DEFAULT_QUALITY_WEIGHTS
+    return [count / total for count in histogram]
+
+
+def due_histogram(due_days, today: int, days: int) -> list:
+    """
+    Due gün numaralarını bugünden itibaren gün gün sayar.
+    
+    Args:
+        due_days: Due gün numaraları (0 veya bugünden önceki günler bugüne sayılır)
+        today: Bugünün gün numarası
+        days: Gün sayısı (ufuk dışındaki kartlar sayılmaz)
+    
+    Returns:
+        list: Gün başına kart sayısı (uzunluk days)
+    """
+    counts = [0] * days
+    for due in due_days:
+        offset = due - today
+        if offset < days:
+            counts[offset if offset > 0 else 0] += 1
+    return counts
+
+
+def prefix_sums(counts: list) -> list:
+    """Gün başına sayıların kümülatif toplamları: sonuç[k] = ilk k+1 günün toplamı."""
+    return list(accumulate(counts))
+
+
+def project(rows: list, today: int, days: int, weights: list, seed: int = SEED) -> dict:
+    """
+    Kartların ufuk boyunca yapılacak review'larını SM-2 ile gün gün simüle eder.
+    
+    Args:
+        rows: (deck_id, due gün numarası, tekrar sayısı, ef, interval) kayıtları
+        today: Bugünün gün numarası
+        days: Gün sayısı
+        weights: 0-5 kalite olasılıkları (bkz. quality_weights)
+        seed: Rastgele sayı tohumu
+    
+    Returns:
+        dict: deck ID -> gün başına beklenen review sayısı (uzunluk days)
+    """
+    totals = {}
+    if not rows:
+        return totals
+    
+    copies = -(-MIN_SAMPLE // len(rows))
+    pending = [[] for _ in range(days)]
+    for deck_id, due, repetition, ef, interval in rows:
+        offset = due - today
+        if offset < days:
+            pending[offset if offset > 0 else 0].extend([(deck_id, repetition, ef, interval)] * copies)
+    
+    rng = random.Random(seed)
+    cum_weights = list(accumulate(weights))
+    qualities = range(6)
+    
+    for day in range(days):
+        batch = pending[day]
+        if not batch:
+            continue
+        pending[day] = None
+        
+        deck_ids, repetitions, efs, intervals = zip(*batch)
+        for deck_id in deck_ids:
+            counts = totals.get(deck_id)
+            if counts is None:
+                counts = totals[deck_id] = [0] * days
+            counts[day] += 1
+        
+        answers = rng.choices(qualities, cum_weights=cum_weights, k=len(batch))
+        new_repetitions, new_efs, new_intervals = calculate_sm2_batch(answers, repetitions, efs, intervals)
+        for deck_id, repetition, ef, interval in zip(deck_ids, new_repetitions, new_efs, new_intervals):
+            next_day = day + max(interval, 1)
+            if next_day < days:
+                pending[next_day].append((deck_id, repetition, ef, interval))
+    
+    return {deck_id: [count / copies for count in counts] for deck_id, counts in totals.items()}
+
+
+def user_rows(user_id: int, deck_id: int = None) -> list:
+    """
+    Kullanıcının deck'lerindeki kartların SRS satırlarını döndürür.
+    
+    Args:
+        user_id: Kullanıcı ID
+        deck_id: Verilirse sadece bu deck'in kartları
+    
+    Returns:
+        list: (deck_id, due gün numarası, tekrar sayısı, ef, interval) satırları
+    """
+    if deck_id is not None:
+        deck_ids = [deck_id]
+    else:
+        deck_ids = [deck['id'] for deck in find_all_by_field('decks', 'user_id', user_id)]
+    card_decks = {card['id']: card['deck_id'] for card in find_all_in('cards', 'deck_id', deck_ids)}
+    
+    store = get_store(user_id)
+    start, end = store.user_range(user_id)
+    deck_of = card_decks.get
+    return [
+        (deck_of(card_id), due, repetition, ef, interval)
+        for card_id, due, repetition, ef, interval in zip(
+            store.card_id[start:end], store.due_date[start:end], store.repetition[start:end],
+            store.ef[start:end], store.interval_days[start:end]
+        )
+        if card_id in card_decks
+    ]
+
+
+def forecast_user(user_id: int, today: int, days: int = 30, deck_id: int = None) -> dict:
+    """
+    Kullanıcının önümüzdeki günlerdeki review yükünü tahmin eder.
+    
+    Args:
+        user_id: Kullanıcı ID
+        today: Bugünün gün numarası
+        days: Gün sayısı (1 - MAX_DAYS)
+        deck_id: Verilirse sadece bu deck'in kartları
+    
+    Returns:
+        dict: scheduled (şu an planlanmış due sayıları), projected (tekrarlar
+              dahil beklenen review sayıları), cumulative (projected'ın
+              prefix-sum'ı), by_deck (deck ID -> {scheduled, projected}) ve
+              quality_weights; listelerin uzunluğu days
+    
+    Raises:
+        ValueError: Gün sayısı 1 - MAX_DAYS dışındaysa
+    """
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError(f"Gün sayısı 1 - {MAX_DAYS} arasında olmalıdır.")
+    
+    rows = user_rows(user_id, deck_id)
+    weights = quality_weights(user_id)
+    projected = project(rows, today, days, weights)
+    
+    due_by_deck = {}
+    for row in rows:
+        due_by_deck.setdefault(row[0], []).append(row[1])
+    
+    by_deck = {}
+    scheduled = [0] * days
+    total = [0.0] * days
+    for deck in sorted(due_by_deck):
+        deck_scheduled = due_histogram(due_by_deck[deck], today, days)
+        deck_projected = projected.get(deck, [0.0] * days)
+        by_deck[deck] = {'scheduled': deck_scheduled, 'projected': deck_projected}
+        scheduled = [a + b for a, b in zip(scheduled, deck_scheduled)]
+        total = [a + b for a, b in zip(total, deck_projected)]
+    
+    return {
+        'days': days,
+        'scheduled': scheduled,
+        'projected': total,
+        'cumulative': prefix_sums(total),
+        'by_deck': by_deck,
+        'quality_weights': weights
+    }
@@ -29,7 +29,7 @@ from cli_handlers import (
     handle_login, handle_register, handle_logout,
     handle_list_decks, handle_create_deck, handle_update_deck, handle_delete_deck,
     handle_list_cards, handle_create_card, handle_update_card, handle_delete_card,
-    handle_review_session, handle_deck_reports,
+    handle_review_session, handle_deck_reports, handle_due_forecast,
     handle_backup, handle_list_backups, handle_export_csv, handle_import_csv,
     handle_search_cards, handle_filter_due_by_deck
 )
@@ -178,11 +178,12 @@ def report_menu():
         print("1) Bugünün Özeti")
         print("2) Haftalık Rapor")
         print("3) Deck Raporları")
-        print("4) Geri Dön")
+        print("4) Due Yükü Tahmini")
+        print("5) Geri Dön")
         
-        choice = get_int_input("Seçiminiz: ", 1, 4)
+        choice = get_int_input("Seçiminiz: ", 1, 5)
         
-        if choice == 4:
+        if choice == 5:
             return
         elif choice == 1:
             print_today_summary()
@@ -190,6 +191,8 @@ def report_menu():
             print_weekly_report()
         elif choice == 3:
             handle_deck_reports()
+        elif choice == 4:
+            handle_due_forecast()
         
         input("\nDevam etmek için Enter'a basın...")
 
@@ -277,7 +280,7 @@ def main():
                 break
             
             menus[choice]()
-            
+        
         except KeyboardInterrupt:
             print("\n\n👋 Uygulama kapatılıyor...")
             if is_logged_in():
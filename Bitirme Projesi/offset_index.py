@@ -0,0 +1,131 @@
+"""
+offset_index.py - Kayıt Konum İndeksi
+
+Koleksiyon dosyasının yanında tutulan <koleksiyon>.idx dosyası her kaydın
+dosyadaki yerini (id -> offset, uzunluk) saklar. Önbellek soğukken
+find_by_id tüm dosyayı çözmek yerine bu indeksle sadece tek kaydı okur.
+
+Dosya biçimi: başlık (sihirli bayt, snapshot imzası, biçim, kayıt sayısı) ve
+id'ye göre sıralı, sabit boyutlu (id, offset, uzunluk) girdileri. Arama mmap
+üzerinde ikili arama ile yapılır. Başlıktaki imza snapshot dosyasının imzası
+(mtime_ns, boyut, inode) ile uyuşmazsa indeks geçersiz sayılır.
+"""
+
+import mmap
+import os
+import struct
+
+MAGIC = b'SBIDX1\n'
+_HEADER = struct.Struct('<7sqQQBQ')    # sihirli bayt, mtime_ns, boyut, inode, biçim, kayıt sayısı
+_ENTRY = struct.Struct('<qQI')          # id, offset, uzunluk
+
+# Konum indeksi tutulabilen biçimler (pickle tek nesne olduğu için yok)
+CODEC_IDS = {'json': 0, 'json-compact': 1, 'records': 2}
+_CODEC_NAMES = {number: name for name, number in CODEC_IDS.items()}
+
+_ID_MIN = -2 ** 63
+_ID_MAX = 2 ** 63 - 1
+
+
+def _signature(st: os.stat_result) -> tuple:
+    """Snapshot dosyasının imzası."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def write(index_path, file_path, codec: str, entries) -> bool:
+    """
+    Snapshot dosyası için konum indeksini yazar (atomic).
+    Sadece tam sayı ID'ler indekslenir; aynı ID birden fazla kez geçiyorsa ilki tutulur.
+    
+    Args:
+        index_path: İndeks dosya yolu
+        file_path: Snapshot dosya yolu (imza bu dosyadan alınır)
+        codec: Snapshot biçimi
+        entries: (id, offset, uzunluk) listesi, dosyadaki sırayla
+    
+    Returns:
+        bool: İndeks yazıldıysa True (biçim desteklenmiyorsa False)
+    """
+    if codec not in CODEC_IDS:
+        if os.path.exists(index_path):
+            os.unlink(index_path)
+        return False
+    
+    first = {}
+    for item_id, offset, length in entries:
+        if type(item_id) is int and _ID_MIN <= item_id <= _ID_MAX and item_id not in first:
+            first[item_id] = (offset, length)
+    
+    header = _HEADER.pack(MAGIC, *_signature(os.stat(file_path)), CODEC_IDS[codec], len(first))
+    body = b''.join(_ENTRY.pack(item_id, *first[item_id]) for item_id in sorted(first))
+    
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header + body)
+    os.replace(temp_path, index_path)
+    return True
+
+
+def read_record(index_path, file_path, item_id: int) -> tuple | None:
+    """
+    Kaydın baytlarını indeks üzerinden okur.
+    
+    Snapshot dosyası önce açılır ve imzası açık dosyadan alınır; böylece okunan
+    baytlar indeksin ait olduğu snapshot'tan gelir.
+    
+    Args:
+        index_path: İndeks dosya yolu
+        file_path: Snapshot dosya yolu
+        item_id: Aranacak ID
+    
+    Returns:
+        tuple | None: (biçim, kayıt baytları veya ID yoksa None);
+                      indeks yoksa veya snapshot ile uyuşmuyorsa None
+    """
+    try:
+        data_file = open(file_path, 'rb')
+    except FileNotFoundError:
+        return None
+    
+    with data_file:
+        try:
+            index_file = open(index_path, 'rb')
+        except FileNotFoundError:
+            return None
+        
+        with index_file:
+            size = os.fstat(index_file.fileno()).st_size
+            if size < _HEADER.size:
+                return None
+            with mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                magic, mtime_ns, file_size, inode, codec_id, count = _HEADER.unpack_from(view, 0)
+                if (
+                    magic != MAGIC
+                    or (mtime_ns, file_size, inode) != _signature(os.fstat(data_file.fileno()))
+                    or codec_id not in _CODEC_NAMES
+                    or size != _HEADER.size + count * _ENTRY.size
+                ):
+                    return None
+                position = _search(view, count, item_id)
+        
+        codec = _CODEC_NAMES[codec_id]
+        if position is None:
+            return codec, None
+        
+        data_file.seek(position[0])
+        return codec, data_file.read(position[1])
+
+
+def _search(view, count: int, item_id: int) -> tuple | None:
+    """Sıralı girdilerde ikili arama yapar; (offset, uzunluk) veya None döndürür."""
+    low, high = 0, count - 1
+    while low <= high:
+        middle = (low + high) // 2
+        entry_id, offset, length = _ENTRY.unpack_from(view, _HEADER.size + middle * _ENTRY.size)
+        if entry_id == item_id:
+            return offset, length
+        if entry_id < item_id:
+            low = middle + 1
+        else:
+            high = middle - 1
+    return None
@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 """
 report_service.py - Raporlama Modülü
 
@@ -6,15 +5,96 @@ report_service.py - Raporlama Modülü
 Due kartları, haftalık performans ve deck bazlı analizler sunar.
 """
 
+import copy
 import logging
-from datetime import datetime, timedelta
-from storage import load_json, find_all_by_field
+from collections import OrderedDict
+from functools import wraps
+
+import storage
+from storage import find_all_by_field, find_all_in, count_by
 from auth import get_current_user_id
-from utils import get_today_str, parse_date
+from forecast import forecast_user, MAX_DAYS as MAX_FORECAST_DAYS
+from rollups import get_rollups
+from srs_store import get_store
+from utils import get_today_str, get_today_ordinal, ordinal_to_date
 
 logger = logging.getLogger(__name__)
 
+REPORT_CACHE_SIZE = 128    # Önbellekte tutulan en fazla rapor sayısı
+
+# (rapor, user_id, parametreler) -> ((gün, koleksiyon imzaları), sonuç); en eski kullanılan başta
+_report_cache = OrderedDict()
+_report_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def _cached_report(*collections):
+    """
+    Rapor fonksiyonunun sonucunu kullanıcı ve parametreler bazında önbelleğe alır.
+    
+    Sonuç, hesaplandığı gün ve okuduğu koleksiyonların imzalarıyla
+    (storage.get_collection_signature) birlikte saklanır. İmzalar her yazmada
+    değiştiği için veri nesli gibi çalışır: koleksiyonlara yazılınca (başka
+    süreçten veya SQLite'tan da olsa) ya da gün değişince rapor yeniden
+    hesaplanır. Giriş yapılmamışsa, açık transaction'da kaydedilmemiş değişiklik
+    varsa veya rapor başarısızsa önbellek kullanılmaz.
+    
+    Args:
+        collections: Raporun okuduğu koleksiyonlar
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            user_id = get_current_user_id()
+            signatures = tuple(storage.get_collection_signature(name) for name in collections)
+            if not user_id or None in signatures:
+                return func(*args, **kwargs)
+            
+            key = (func.__name__, user_id, args, tuple(sorted(kwargs.items())))
+            stamp = (get_today_ordinal(), signatures)
+            entry = _report_cache.get(key)
+            if entry is not None and entry[0] == stamp:
+                _report_cache.move_to_end(key)
+                _report_cache_stats['hits'] += 1
+                return copy.deepcopy(entry[1])
+            
+            _report_cache_stats['misses'] += 1
+            result = func(*args, **kwargs)
+            if result[0]:
+                _report_cache[key] = (stamp, copy.deepcopy(result))
+                _report_cache.move_to_end(key)
+                while len(_report_cache) > REPORT_CACHE_SIZE:
+                    _report_cache.popitem(last=False)
+            else:
+                _report_cache.pop(key, None)
+            return result
+        return wrapper
+    return decorator
+
+
+def get_report_cache_stats() -> dict:
+    """
+    Rapor önbelleği istatistiklerini döndürür.
+    
+    Returns:
+        dict: hits, misses, hit_ratio ve entries (önbellekteki rapor sayısı)
+    """
+    total = _report_cache_stats['hits'] + _report_cache_stats['misses']
+    return {
+        'hits': _report_cache_stats['hits'],
+        'misses': _report_cache_stats['misses'],
+        'hit_ratio': round(_report_cache_stats['hits'] / total, 4) if total else 0.0,
+        'entries': len(_report_cache)
+    }
+
+
+def clear_report_cache():
+    """Rapor önbelleğini ve istatistiklerini temizler."""
+    _report_cache.clear()
+    _report_cache_stats['hits'] = 0
+    _report_cache_stats['misses'] = 0
 
+
+@_cached_report('srs_state', 'review_rollups')
 def get_today_summary() -> tuple[bool, str, dict | None]:
     """
     Bugünün özetini döndürür.
@@ -28,30 +108,34 @@ def get_today_summary() -> tuple[bool, str, dict | None]:
     
     today = get_today_str()
     
-    srs_states = find_all_by_field('srs_state', 'user_id', user_id)
-    due_count = sum(1 for s in srs_states if s.get('due_date', '') <= today)
+    due_count = get_store(user_id).count_due(user_id, get_today_ordinal())
     
-    reviews = find_all_by_field('reviews', 'user_id', user_id)
-    today_reviews = [r for r in reviews if r.get('reviewed_at', '').startswith(today)]
+    today_rollups = get_rollups(user_id, since=today, until=ordinal_to_date(get_today_ordinal() + 1))
+    reviewed = sum(row['count'] for row in today_rollups)
     
-    if today_reviews:
-        avg_quality = sum(r.get('quality', 0) for r in today_reviews) / len(today_reviews)
+    if reviewed:
+        avg_quality = sum(row['quality_sum'] for row in today_rollups) / reviewed
     else:
         avg_quality = 0
     
     summary = {
         'date': today,
         'due_cards': due_count,
-        'reviewed_today': len(today_reviews),
+        'reviewed_today': reviewed,
         'average_quality': round(avg_quality, 2)
     }
     
     return True, "Bugünün özeti hazırlandı.", summary
 
 
-def get_weekly_stats() -> tuple[bool, str, dict | None]:
+@_cached_report('review_rollups')
+def get_period_stats(days: int = 7) -> tuple[bool, str, dict | None]:
     """
-    Son 7 günün istatistiklerini döndürür.
+    Son N günün istatistiklerini günlük review özetlerinden döndürür.
+    Okunan satır sayısı review sayısıyla değil gün (ve deck) sayısıyla orantılıdır.
+    
+    Args:
+        days: Gün sayısı
     
     Returns:
         tuple: (Başarılı mı, Mesaj, İstatistikler veya None)
@@ -60,83 +144,81 @@ def get_weekly_stats() -> tuple[bool, str, dict | None]:
     if not user_id:
         return False, "Bu işlem için giriş yapmalısınız.", None
     
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    week_ago = today - timedelta(days=7)
-    
-    reviews = find_all_by_field('reviews', 'user_id', user_id)
+    if not isinstance(days, int) or days < 1:
+        return False, "Gün sayısı en az 1 olmalıdır.", None
     
-    weekly_reviews = []
-    for r in reviews:
-        reviewed_at = r.get('reviewed_at', '')
-        try:
-            review_date = datetime.fromisoformat(reviewed_at)
-            if review_date >= week_ago:
-                weekly_reviews.append(r)
-        except:
-            continue
+    today = get_today_ordinal()
+    since = ordinal_to_date(today - days)
     
     daily_counts = {}
-    daily_qualities = {}
+    daily_sums = {}
     
-    for i in range(7):
-        date = (today - timedelta(days=i)).strftime('%Y-%m-%d')
+    for i in range(days):
+        date = ordinal_to_date(today - i)
         daily_counts[date] = 0
-        daily_qualities[date] = []
-    
-    for r in weekly_reviews:
-        date = r.get('reviewed_at', '')[:10]
+        daily_sums[date] = 0
+    
+    total_reviews = 0
+    total_quality = 0
+    histogram = [0] * 6
+    
+    for row in get_rollups(user_id, since=since, until=ordinal_to_date(today + 1)):
+        total_reviews += row['count']
+        total_quality += row['quality_sum']
+        histogram = [a + b for a, b in zip(histogram, row['histogram'])]
+        
+        date = row['day']
         if date in daily_counts:
-            daily_counts[date] += 1
-            daily_qualities[date].append(r.get('quality', 0))
+            daily_counts[date] += row['count']
+            daily_sums[date] += row['quality_sum']
     
-    total_reviews = len(weekly_reviews)
-    total_quality = sum(r.get('quality', 0) for r in weekly_reviews)
     avg_quality = total_quality / total_reviews if total_reviews > 0 else 0
     
     stats = {
-        'period': 'Son 7 gün',
+        'period': f'Son {days} gün',
         'total_reviews': total_reviews,
         'average_quality': round(avg_quality, 2),
+        'quality_distribution': histogram,
         'daily_breakdown': [
             {
                 'date': date,
                 'count': daily_counts[date],
-                'avg_quality': round(sum(daily_qualities[date]) / len(daily_qualities[date]), 2) if daily_qualities[date] else 0
+                'avg_quality': round(daily_sums[date] / daily_counts[date], 2) if daily_counts[date] else 0
             }
             for date in sorted(daily_counts.keys(), reverse=True)
         ]
     }
     
-    return True, "Haftalık istatistikler hazırlandı.", stats
+    return True, f"Son {days} günün istatistikleri hazırlandı.", stats
 
 
-def get_deck_report(deck_id: int) -> tuple[bool, str, dict | None]:
+@_cached_report('review_rollups')
+def get_weekly_stats() -> tuple[bool, str, dict | None]:
     """
-    Deck bazlı rapor döndürür.
-    
-    Args:
-        deck_id: Deck ID
+    Son 7 günün istatistiklerini döndürür (bkz. get_period_stats).
     
     Returns:
-        tuple: (Başarılı mı, Mesaj, Rapor veya None)
+        tuple: (Başarılı mı, Mesaj, İstatistikler veya None)
     """
-    from deck_service import get_deck
-    
-    success, msg, deck = get_deck(deck_id)
+    success, msg, stats = get_period_stats(7)
     if not success:
-        return success, msg, None
-    
-    user_id = get_current_user_id()
-    today = get_today_str()
-    
-    cards = find_all_by_field('cards', 'deck_id', deck_id)
-    card_ids = [c['id'] for c in cards]
+        return success, msg, stats
+    return True, "Haftalık istatistikler hazırlandı.", stats
+
+
+def _build_deck_report(deck: dict, total_cards: int, due_count: int, ef_values) -> dict:
+    """
+    Deck raporunu hesaplanmış değerlerden oluşturur.
     
-    srs_states = load_json('srs_state')
-    deck_srs = [s for s in srs_states if s.get('card_id') in card_ids and s.get('user_id') == user_id]
+    Args:
+        deck: Deck kaydı
+        total_cards: Deck'teki kart sayısı
+        due_count: Bugün due olan kart sayısı
+        ef_values: Deck kartlarının ef değerleri
     
-    due_count = sum(1 for s in deck_srs if s.get('due_date', '') <= today)
-    ef_values = [s.get('ef', 2.5) for s in deck_srs]
+    Returns:
+        dict: Deck raporu
+    """
     avg_ef = sum(ef_values) / len(ef_values) if ef_values else 2.5
     
     mastery = {
@@ -145,257 +227,133 @@ def get_deck_report(deck_id: int) -> tuple[bool, str, dict | None]:
         'mastered': sum(1 for ef in ef_values if ef >= 2.5)
     }
     
-    report = {
-        'deck_id': deck_id,
+    return {
+        'deck_id': deck['id'],
         'deck_name': deck['name'],
-        'total_cards': len(cards),
+        'total_cards': total_cards,
         'due_today': due_count,
         'average_ef': round(avg_ef, 2),
         'mastery_distribution': mastery
     }
-    
-    return True, "Deck raporu hazırlandı.", report
 
 
-def get_all_decks_report() -> tuple[bool, str, list]:
-    """
-    Tüm decks için özet rapor döndürür.
-    
-    Returns:
-        tuple: (Başarılı mı, Mesaj, Raporlar listesi)
-    """
-    from deck_service import list_decks
-    
-    success, msg, decks = list_decks()
-    if not success:
-        return success, msg, []
-    
-    reports = []
-    for deck in decks:
-        _, _, report = get_deck_report(deck['id'])
-        if report:
-            reports.append(report)
-    
-    return True, f"{len(reports)} deck raporu hazırlandı.", reports
-
-
-def print_weekly_report():
-    """
-    Haftalık raporu formatlı yazdırır.
+@_cached_report('decks', 'cards', 'srs_state')
+def get_deck_report(deck_id: int) -> tuple[bool, str, dict | None]:
     """
-    from utils import print_header
-    
-    success, _, stats = get_weekly_stats()
-    if not success:
-        print("❌ Rapor oluşturulamadı.")
-        return
+    Deck bazlı rapor döndürür.
     
-    print_header("📊 Haftalık Rapor")
-    print(f"Toplam Review: {stats['total_reviews']}")
-    print(f"Ortalama Kalite: {stats['average_quality']}/5")
-    print()
-    print("Günlük Dağılım:")
-    print("-" * 40)
+    Args:
+        deck_id: Deck ID
     
-    for day in stats['daily_breakdown']:
-        bar = "█" * day['count'] if day['count'] <= 20 else "█" * 20 + f"... ({day['count']})"
-        print(f"{day['date']}: {bar} ({day['count']} review, avg: {day['avg_quality']})")
-
-
-def print_today_summary():
-    """
-    Bugünün özetini formatlı yazdırır.
+    Returns:
+        tuple: (Başarılı mı, Mesaj, Rapor veya None)
     """
-    from utils import print_header
+    from deck_service import get_deck
     
-    success, _, summary = get_today_summary()
+    success, msg, deck = get_deck(deck_id)
     if not success:
-        print("❌ Özet oluşturulamadı.")
-        return
-    
-    print_header(f"📅 Bugün: {summary['date']}")
-    print(f"Due Kartlar: {summary['due_cards']}")
-    print(f"Bugün Yapılan Review: {summary['reviewed_today']}")
-    print(f"Bugünkü Ortalama Kalite: {summary['average_quality']}/5")
-=======
-"""
-report_service.py - Raporlama Modülü
-
-İstatistikler ve raporlar oluşturur.
-Due kartları, haftalık performans ve deck bazlı analizler sunar.
-"""
-
-import logging
-from datetime import datetime, timedelta
-from storage import load_json, find_all_by_field
-from auth import get_current_user_id
-from utils import get_today_str, parse_date
-
-logger = logging.getLogger(__name__)
-
-
-def get_today_summary() -> tuple[bool, str, dict | None]:
-    """
-    Bugünün özetini döndürür.
+        return success, msg, None
     
-    Returns:
-        tuple: (Başarılı mı, Mesaj, Özet veya None)
-    """
     user_id = get_current_user_id()
-    if not user_id:
-        return False, "Bu işlem için giriş yapmalısınız.", None
+    today = get_today_ordinal()
     
-    today = get_today_str()
-    
-    srs_states = find_all_by_field('srs_state', 'user_id', user_id)
-    due_count = sum(1 for s in srs_states if s.get('due_date', '') <= today)
-    
-    reviews = find_all_by_field('reviews', 'user_id', user_id)
-    today_reviews = [r for r in reviews if r.get('reviewed_at', '').startswith(today)]
+    cards = find_all_by_field('cards', 'deck_id', deck_id)
+    card_ids = {c['id'] for c in cards}
     
-    if today_reviews:
-        avg_quality = sum(r.get('quality', 0) for r in today_reviews) / len(today_reviews)
-    else:
-        avg_quality = 0
+    store = get_store(user_id)
+    due_count = store.count_due(user_id, today, card_ids)
+    ef_values = store.ef_values(user_id, card_ids)
     
-    summary = {
-        'date': today,
-        'due_cards': due_count,
-        'reviewed_today': len(today_reviews),
-        'average_quality': round(avg_quality, 2)
-    }
+    report = _build_deck_report(deck, len(cards), due_count, ef_values)
     
-    return True, "Bugünün özeti hazırlandı.", summary
+    return True, "Deck raporu hazırlandı.", report
 
 
-def get_weekly_stats() -> tuple[bool, str, dict | None]:
+@_cached_report('decks', 'cards', 'srs_state')
+def get_all_decks_report() -> tuple[bool, str, list]:
     """
-    Son 7 günün istatistiklerini döndürür.
+    Tüm decks için özet rapor döndürür.
+    
+    Kartlar deck'lere tek sorguyla dağıtılır, SRS satırları tek geçişte deck
+    bazında gruplanır; sonuç her deck için get_deck_report ile aynıdır.
     
     Returns:
-        tuple: (Başarılı mı, Mesaj, İstatistikler veya None)
+        tuple: (Başarılı mı, Mesaj, Raporlar listesi)
     """
     user_id = get_current_user_id()
     if not user_id:
-        return False, "Bu işlem için giriş yapmalısınız.", None
-    
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    week_ago = today - timedelta(days=7)
+        return False, "Bu işlem için giriş yapmalısınız.", []
     
-    reviews = find_all_by_field('reviews', 'user_id', user_id)
+    decks = find_all_by_field('decks', 'user_id', user_id)
+    cards = find_all_in('cards', 'deck_id', [d['id'] for d in decks])
+    card_counts = count_by(cards, 'deck_id')
+    groups = get_store(user_id).deck_groups(user_id, get_today_ordinal(), {c['id']: c['deck_id'] for c in cards})
     
-    weekly_reviews = []
-    for r in reviews:
-        reviewed_at = r.get('reviewed_at', '')
-        try:
-            review_date = datetime.fromisoformat(reviewed_at)
-            if review_date >= week_ago:
-                weekly_reviews.append(r)
-        except:
-            continue
-    
-    daily_counts = {}
-    daily_qualities = {}
-    
-    for i in range(7):
-        date = (today - timedelta(days=i)).strftime('%Y-%m-%d')
-        daily_counts[date] = 0
-        daily_qualities[date] = []
-    
-    for r in weekly_reviews:
-        date = r.get('reviewed_at', '')[:10]
-        if date in daily_counts:
-            daily_counts[date] += 1
-            daily_qualities[date].append(r.get('quality', 0))
-    
-    total_reviews = len(weekly_reviews)
-    total_quality = sum(r.get('quality', 0) for r in weekly_reviews)
-    avg_quality = total_quality / total_reviews if total_reviews > 0 else 0
-    
-    stats = {
-        'period': 'Son 7 gün',
-        'total_reviews': total_reviews,
-        'average_quality': round(avg_quality, 2),
-        'daily_breakdown': [
-            {
-                'date': date,
-                'count': daily_counts[date],
-                'avg_quality': round(sum(daily_qualities[date]) / len(daily_qualities[date]), 2) if daily_qualities[date] else 0
-            }
-            for date in sorted(daily_counts.keys(), reverse=True)
-        ]
-    }
+    reports = []
+    for deck in decks:
+        due_count, ef_values = groups.get(deck['id'], (0, []))
+        reports.append(_build_deck_report(deck, card_counts.get(deck['id'], 0), due_count, ef_values))
     
-    return True, "Haftalık istatistikler hazırlandı.", stats
+    return True, f"{len(reports)} deck raporu hazırlandı.", reports
 
 
-def get_deck_report(deck_id: int) -> tuple[bool, str, dict | None]:
+@_cached_report('decks', 'cards', 'srs_state', 'review_rollups')
+def get_due_forecast(days: int = 30, deck_id: int = None) -> tuple[bool, str, dict | None]:
     """
-    Deck bazlı rapor döndürür.
+    Önümüzdeki N günün due yükü tahminini döndürür (bkz. forecast.py).
     
     Args:
-        deck_id: Deck ID
+        days: Gün sayısı (1 - 365)
+        deck_id: Verilirse sadece bu deck
     
     Returns:
-        tuple: (Başarılı mı, Mesaj, Rapor veya None)
+        tuple: (Başarılı mı, Mesaj, Tahmin veya None)
     """
-    from deck_service import get_deck
-    
-    success, msg, deck = get_deck(deck_id)
-    if not success:
-        return success, msg, None
-    
     user_id = get_current_user_id()
-    today = get_today_str()
-    
-    cards = find_all_by_field('cards', 'deck_id', deck_id)
-    card_ids = [c['id'] for c in cards]
-    
-    srs_states = load_json('srs_state')
-    deck_srs = [s for s in srs_states if s.get('card_id') in card_ids and s.get('user_id') == user_id]
-    
-    due_count = sum(1 for s in deck_srs if s.get('due_date', '') <= today)
-    ef_values = [s.get('ef', 2.5) for s in deck_srs]
-    avg_ef = sum(ef_values) / len(ef_values) if ef_values else 2.5
-    
-    mastery = {
-        'learning': sum(1 for ef in ef_values if ef < 2.0),
-        'reviewing': sum(1 for ef in ef_values if 2.0 <= ef < 2.5),
-        'mastered': sum(1 for ef in ef_values if ef >= 2.5)
-    }
+    if not user_id:
+        return False, "Bu işlem için giriş yapmalısınız.", None
     
-    report = {
-        'deck_id': deck_id,
-        'deck_name': deck['name'],
-        'total_cards': len(cards),
-        'due_today': due_count,
-        'average_ef': round(avg_ef, 2),
-        'mastery_distribution': mastery
-    }
+    if not isinstance(days, int) or not 1 <= days <= MAX_FORECAST_DAYS:
+        return False, f"Gün sayısı 1 - {MAX_FORECAST_DAYS} arasında olmalıdır.", None
     
-    return True, "Deck raporu hazırlandı.", report
-
-
-def get_all_decks_report() -> tuple[bool, str, list]:
-    """
-    Tüm decks için özet rapor döndürür.
+    if deck_id is not None:
+        from deck_service import get_deck
+        
+        success, msg, deck = get_deck(deck_id)
+        if not success:
+            return success, msg, None
+        decks = [deck]
+    else:
+        decks = find_all_by_field('decks', 'user_id', user_id)
     
-    Returns:
-        tuple: (Başarılı mı, Mesaj, Raporlar listesi)
-    """
-    from deck_service import list_decks
+    today = get_today_ordinal()
+    result = forecast_user(user_id, today, days, deck_id)
     
-    success, msg, decks = list_decks()
-    if not success:
-        return success, msg, []
+    projected = result['projected']
+    peak = max(range(days), key=projected.__getitem__)
     
-    reports = []
+    deck_totals = []
     for deck in decks:
-        _, _, report = get_deck_report(deck['id'])
-        if report:
-            reports.append(report)
+        counts = result['by_deck'].get(deck['id'])
+        deck_totals.append({
+            'deck_id': deck['id'],
+            'deck_name': deck['name'],
+            'scheduled': sum(counts['scheduled']) if counts else 0,
+            'projected': round(sum(counts['projected']), 1) if counts else 0.0
+        })
+    
+    forecast = {
+        'start': ordinal_to_date(today),
+        'days': days,
+        'scheduled': result['scheduled'],
+        'projected': [round(count, 1) for count in projected],
+        'cumulative': [round(count, 1) for count in result['cumulative']],
+        'peak': {'date': ordinal_to_date(today + peak), 'count': round(projected[peak], 1)},
+        'quality_distribution': [round(weight, 4) for weight in result['quality_weights']],
+        'decks': deck_totals
+    }
     
-    return True, f"{len(reports)} deck raporu hazırlandı.", reports
+    return True, f"{days} günlük due tahmini hazırlandı.", forecast
 
 
 def print_weekly_report():
@@ -436,4 +394,3 @@ def print_today_summary():
     print(f"Due Kartlar: {summary['due_cards']}")
     print(f"Bugün Yapılan Review: {summary['reviewed_today']}")
     print(f"Bugünkü Ortalama Kalite: {summary['average_quality']}/5")
->>>>>>> 49319f5dfc84fb8c02a88209b4cff51a53bda568
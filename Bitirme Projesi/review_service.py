@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 """
 review_service.py - Çalışma ve SM-2 Algoritması Modülü
 
@@ -6,17 +5,38 @@ Review (çalışma) akışını ve SM-2 aralıklı tekrar algoritmasını yönet
 Kartların due tarihlerini ve tekrar durumlarını hesaplar.
 """
 
+import json
 import logging
+import time
 from datetime import datetime, timedelta
+from pathlib import Path
+
+import storage
 from storage import (
-    load_json, save_json, find_by_id, find_all_by_field,
-    insert, update
+    find_by_id, find_all_by_field, find_all_in, find_many, index_by,
+    insert, insert_many, update, update_many, transaction, append_line
 )
 from auth import get_current_user_id
-from utils import get_today_str, add_days
+import due_index
+import rollups
+from utils import get_today_str, get_today_ordinal, date_to_ordinal, ordinal_to_date
 
 logger = logging.getLogger(__name__)
 
+# submit_review / submit_reviews'in SRS kaydında değiştirdiği alanlar
+REVIEW_FIELDS = ('repetition', 'interval_days', 'ef', 'due_date', 'last_quality', 'last_reviewed')
+
+# Tamponlu çalışma oturumu: cevaplar bu kadar biriktiğinde veya son kayıttan bu
+# kadar saniye geçtiğinde kaydedilir (bkz. record_answer)
+SESSION_FLUSH_SIZE = 20
+SESSION_FLUSH_SECONDS = 60
+
+_review_session = {
+    'user_id': None,
+    'buffer': [],       # [(card_id, quality, reviewed_at), ...] henüz kaydedilmemiş cevaplar
+    'flushed_at': 0.0
+}
+
 
 def calculate_sm2(quality: int, repetition: int, ef: float, interval: int) -> tuple[int, float, int]:
     """
@@ -52,12 +72,13 @@ def calculate_sm2(quality: int, repetition: int, ef: float, interval: int) -> tu
     return new_repetition, round(new_ef, 2), new_interval
 
 
-def get_due_cards(deck_id: int = None) -> tuple[bool, str, list]:
+def get_due_cards(deck_id: int = None, limit: int = None) -> tuple[bool, str, list]:
     """
-    Bugün due olan kartları getirir.
+    Bugün due olan kartları getirir (en eski due tarihi önce).
     
     Args:
         deck_id: Belirli bir deck için filtrele (opsiyonel)
+        limit: En fazla kaç kart döneceği (opsiyonel)
     
     Returns:
         tuple: (Başarılı mı, Mesaj, Due kart listesi)
@@ -66,31 +87,25 @@ def get_due_cards(deck_id: int = None) -> tuple[bool, str, list]:
     if not user_id:
         return False, "Bu işlem için giriş yapmalısınız.", []
     
-    today = get_today_str()
+    srs_ids = due_index.get_due(user_id, get_today_ordinal(), deck_id, limit)
     
-    srs_states = find_all_by_field('srs_state', 'user_id', user_id)
-    
-    due_srs = [s for s in srs_states if s.get('due_date', '') <= today]
-    
-    if not due_srs:
+    if not srs_ids:
         return True, "Bugün çalışılacak kart yok. Tebrikler! 🎉", []
     
-    cards = load_json('cards')
-    decks = load_json('decks')
-    
-    user_deck_ids = [d['id'] for d in decks if d.get('user_id') == user_id]
+    srs_by_id = find_many('srs_state', srs_ids)
+    cards_by_id = find_many('cards', [s['card_id'] for s in srs_by_id.values()])
+    decks_by_id = index_by(find_all_by_field('decks', 'user_id', user_id))
     
     due_cards = []
-    for srs in due_srs:
-        card = next((c for c in cards if c['id'] == srs['card_id']), None)
+    for srs_id in srs_ids:
+        srs = srs_by_id.get(srs_id)
+        card = cards_by_id.get(srs['card_id']) if srs else None
         
         if not card:
             continue
         
-        if card.get('deck_id') not in user_deck_ids:
-            continue
-        
-        if deck_id and card.get('deck_id') != deck_id:
+        deck = decks_by_id.get(card.get('deck_id'))
+        if not deck:
             continue
         
         card_info = card.copy()
@@ -100,10 +115,7 @@ def get_due_cards(deck_id: int = None) -> tuple[bool, str, list]:
             'repetition': srs.get('repetition'),
             'interval_days': srs.get('interval_days')
         }
-        
-        deck = next((d for d in decks if d['id'] == card.get('deck_id')), None)
-        if deck:
-            card_info['deck_name'] = deck.get('name', 'Bilinmeyen')
+        card_info['deck_name'] = deck.get('name', 'Bilinmeyen')
         
         due_cards.append(card_info)
     
@@ -133,12 +145,59 @@ def submit_review(card_id: int, quality: int) -> tuple[bool, str, dict | None]:
     if not success:
         return False, msg, None
     
-    srs_states = load_json('srs_state')
+    srs_states = find_all_by_field('srs_state', 'user_id', user_id)
     srs = next(
-        (s for s in srs_states if s.get('card_id') == card_id and s.get('user_id') == user_id),
+        (s for s in srs_states if s.get('card_id') == card_id),
         None
     )
     
+    with transaction():
+        return _apply_review(user_id, card_id, quality, srs)
+
+
+def _review_updates(srs: dict, quality: int, day: int, reviewed_at: str) -> dict:
+    """
+    Bir cevabın SRS kaydında değiştireceği alanları SM-2 ile hesaplar.
+    
+    Args:
+        srs: Mevcut SRS durumu
+        quality: 0-5 arası kalite puanı
+        day: Cevabın verildiği günün numarası (sonraki due tarihi buna göre)
+        reviewed_at: Cevap zamanı (ISO)
+    
+    Returns:
+        dict: Güncellenecek alanlar
+    """
+    new_rep, new_ef, new_interval = calculate_sm2(
+        quality, srs.get('repetition', 0), srs.get('ef', 2.5), srs.get('interval_days', 1)
+    )
+    
+    return {
+        'repetition': new_rep,
+        'interval_days': new_interval,
+        'ef': new_ef,
+        'due_date': ordinal_to_date(day + new_interval),
+        'last_quality': quality,
+        'last_reviewed': reviewed_at
+    }
+
+
+def _apply_review(user_id: int, card_id: int, quality: int, srs: dict | None) -> tuple[bool, str, dict | None]:
+    """
+    submit_review'in yazma kısmı: SRS durumunu günceller ve review kaydını ekler.
+    Çağıran tarafından transaction içinde çalıştırılır.
+    
+    Args:
+        user_id: Kullanıcı ID
+        card_id: Kart ID
+        quality: 0-5 arası kalite puanı
+        srs: Mevcut SRS kaydı (yoksa None, yeni oluşturulur)
+    
+    Returns:
+        tuple: (Başarılı mı, Mesaj, Güncel SRS durumu)
+    """
+    today = get_today_ordinal()
+    
     if not srs:
         srs = {
             'user_id': user_id,
@@ -146,27 +205,13 @@ def submit_review(card_id: int, quality: int) -> tuple[bool, str, dict | None]:
             'repetition': 0,
             'interval_days': 1,
             'ef': 2.5,
-            'due_date': get_today_str(),
+            'due_date': ordinal_to_date(today),
             'last_quality': None
         }
         srs = insert('srs_state', srs)
     
-    old_rep = srs.get('repetition', 0)
-    old_ef = srs.get('ef', 2.5)
-    old_interval = srs.get('interval_days', 1)
-    
-    new_rep, new_ef, new_interval = calculate_sm2(quality, old_rep, old_ef, old_interval)
-    
-    new_due_date = add_days(get_today_str(), new_interval)
-    
-    updates = {
-        'repetition': new_rep,
-        'interval_days': new_interval,
-        'ef': new_ef,
-        'due_date': new_due_date,
-        'last_quality': quality,
-        'last_reviewed': datetime.now().isoformat()
-    }
+    updates = _review_updates(srs, quality, today, datetime.now().isoformat())
+    new_due_date = updates['due_date']
     
     updated_srs = update('srs_state', srs['id'], updates)
     
@@ -177,261 +222,273 @@ def submit_review(card_id: int, quality: int) -> tuple[bool, str, dict | None]:
         'reviewed_at': datetime.now().isoformat()
     }
     insert('reviews', review)
+    rollups.add_reviews([review])
     
     logger.info(f"Review kaydedildi: Card {card_id}, Quality {quality}, Due: {new_due_date}")
     
     return True, f"Güncellendi! Sonraki tekrar: {new_due_date}", updated_srs
 
 
-def get_srs_state(card_id: int) -> tuple[bool, str, dict | None]:
-    """
-    Kartın SRS durumunu getirir.
-    
-    Args:
-        card_id: Kart ID
-    
-    Returns:
-        tuple: (Başarılı mı, Mesaj, SRS durumu veya None)
-    """
-    user_id = get_current_user_id()
-    if not user_id:
-        return False, "Bu işlem için giriş yapmalısınız.", None
-    
-    srs_states = load_json('srs_state')
-    srs = next(
-        (s for s in srs_states if s.get('card_id') == card_id and s.get('user_id') == user_id),
-        None
-    )
-    
-    if not srs:
-        return False, "Bu kart için SRS kaydı bulunamadı.", None
-    
-    return True, "SRS durumu bulundu.", srs
+def _owned_cards(user_id: int, card_ids) -> dict:
+    """Kullanıcının kendi deck'lerindeki kartları tek sorguda döndürür (kart ID -> kart)."""
+    user_decks = index_by(find_all_by_field('decks', 'user_id', user_id))
+    return {
+        card_id: card for card_id, card in find_many('cards', card_ids).items()
+        if card.get('deck_id') in user_decks
+    }
 
 
-def reset_card(card_id: int) -> tuple[bool, str]:
+def submit_reviews(items: list) -> tuple[bool, str, list]:
     """
-    Kartın SRS durumunu sıfırlar.
+    Birden fazla cevabı tek seferde kaydeder.
+    
+    Kart sahipliği tüm parti için bir kez kontrol edilir, SM-2 cevap sırasıyla
+    hesaplanır (aynı kart birden fazla kez geçebilir) ve srs_state ile reviews
+    tek transaction'da birer kez yazılır. Partide geçersiz bir cevap varsa
+    hiçbir şey kaydedilmez.
     
     Args:
-        card_id: Kart ID
+        items: (card_id, quality, reviewed_at) listesi; reviewed_at geçmişte bir ISO
+               tarih/saat veya None (şimdiki zaman). Sonraki due tarihi cevabın gününe
+               göre hesaplanır.
     
     Returns:
-        tuple: (Başarılı mı, Mesaj)
+        tuple: (Başarılı mı, Mesaj, Güncel SRS durumları - kart başına bir tane, ilk geçiş sırasıyla)
     """
     user_id = get_current_user_id()
     if not user_id:
-        return False, "Bu işlem için giriş yapmalısınız."
+        return False, "Bu işlem için giriş yapmalısınız.", []
     
-    from card_service import get_card
-    success, msg, card = get_card(card_id)
-    if not success:
-        return False, msg
+    if not items:
+        return True, "Kaydedilecek cevap yok.", []
     
-    srs_states = load_json('srs_state')
-    srs = next(
-        (s for s in srs_states if s.get('card_id') == card_id and s.get('user_id') == user_id),
-        None
-    )
+    for _, quality, _ in items:
+        if not isinstance(quality, int) or quality < 0 or quality > 5:
+            return False, "Kalite puanı 0-5 arasında olmalıdır.", []
     
-    if not srs:
-        return False, "Bu kart için SRS kaydı bulunamadı."
+    for _, _, reviewed_at in items:
+        if reviewed_at is None:
+            continue
+        try:
+            answered = datetime.fromisoformat(reviewed_at)
+        except (TypeError, ValueError):
+            return False, f"Geçersiz cevap zamanı: {reviewed_at}", []
+        if answered > datetime.now(answered.tzinfo):
+            return False, f"Cevap zamanı gelecekte olamaz: {reviewed_at}", []
+    
+    cards = _owned_cards(user_id, [card_id for card_id, _, _ in items])
+    for card_id, _, _ in items:
+        if card_id not in cards:
+            logger.warning(f"Toplu review reddedildi: User {user_id} -> Card {card_id}")
+            return False, f"Kart bulunamadı veya erişim izniniz yok: {card_id}", []
+    
+    existing = index_by(find_all_by_field('srs_state', 'user_id', user_id), 'card_id')
+    states = {}
+    reviews = []
+    
+    for card_id, quality, reviewed_at in items:
+        reviewed_at = reviewed_at or datetime.now().isoformat()
+        state = states.get(card_id)
+        if state is None:
+            srs = existing.get(card_id)
+            state = dict(srs) if srs else {
+                'user_id': user_id,
+                'card_id': card_id,
+                'repetition': 0,
+                'interval_days': 1,
+                'ef': 2.5,
+                'last_quality': None
+            }
+            states[card_id] = state
+        
+        state.update(_review_updates(state, quality, date_to_ordinal(reviewed_at), reviewed_at))
+        reviews.append({
+            'user_id': user_id,
+            'card_id': card_id,
+            'quality': quality,
+            'reviewed_at': reviewed_at
+        })
     
     updates = {
-        'repetition': 0,
-        'interval_days': 1,
-        'ef': 2.5,
-        'due_date': get_today_str(),
-        'last_quality': None
+        state['id']: {field: state[field] for field in REVIEW_FIELDS}
+        for state in states.values() if 'id' in state
     }
     
-    update('srs_state', srs['id'], updates)
-    logger.info(f"Kart SRS sıfırlandı: {card_id}")
+    with transaction():
+        insert_many('srs_state', [state for state in states.values() if 'id' not in state])
+        update_many('srs_state', updates)
+        insert_many('reviews', reviews)
+        rollups.add_reviews(reviews)
     
-    return True, "Kart başarıyla sıfırlandı!"
-=======
-"""
-review_service.py - Çalışma ve SM-2 Algoritması Modülü
+    logger.info(f"Toplu review kaydedildi: User {user_id}, {len(reviews)} cevap, {len(states)} kart")
+    
+    return True, f"{len(reviews)} cevap kaydedildi.", list(states.values())
 
-Review (çalışma) akışını ve SM-2 aralıklı tekrar algoritmasını yönetir.
-Kartların due tarihlerini ve tekrar durumlarını hesaplar.
-"""
 
-import logging
-from datetime import datetime, timedelta
-from storage import (
-    load_json, save_json, find_by_id, find_all_by_field,
-    insert, update
-)
-from auth import get_current_user_id
-from utils import get_today_str, add_days
+def _session_journal_path(user_id: int) -> Path:
+    """Kullanıcının çalışma oturumu journal dosyası."""
+    return storage.DATA_DIR / f"review_session_{user_id}.journal"
 
-logger = logging.getLogger(__name__)
 
+def _read_session_journal(journal_path: Path) -> list:
+    """Journal'daki cevapları okur; yarım kalmış son satır atlanır."""
+    items = []
+    if not journal_path.exists():
+        return items
+    
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                answer = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Oturum journal'ında okunamayan satır atlandı: {journal_path}")
+                continue
+            items.append((answer['card_id'], answer['quality'], answer['reviewed_at']))
+    return items
 
-def calculate_sm2(quality: int, repetition: int, ef: float, interval: int) -> tuple[int, float, int]:
+
+def _recover_session(user_id: int) -> int:
     """
-    SM-2 benzeri aralıklı tekrar algoritması.
+    Önceki oturumdan kalan (flush edilmemiş) cevapları kaydeder.
     
-    Args:
-        quality: 0-5 arası kalite puanı
-        repetition: Mevcut tekrar sayısı
-        ef: Easiness Factor (başlangıç: 2.5)
-        interval: Mevcut interval (gün)
+    Journal, cevaplar kaydedildikten sonra silinir. Bu ikisi arasında kesilen
+    bir oturumun cevapları reviews'de zaten bulunur; bunlar (card_id,
+    reviewed_at) ile tanınır ve ikinci kez uygulanmaz.
     
     Returns:
-        tuple: (new_repetition, new_ef, new_interval)
+        int: Kurtarılan cevap sayısı
     """
-    new_ef = ef + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-    
-    if new_ef < 1.3:
-        new_ef = 1.3
-    
-    if quality < 3:
-        new_repetition = 0
-        new_interval = 1
-    else:
-        new_repetition = repetition + 1
-        
-        if new_repetition == 1:
-            new_interval = 1
-        elif new_repetition == 2:
-            new_interval = 6
-        else:
-            new_interval = round(interval * new_ef)
-    
-    return new_repetition, round(new_ef, 2), new_interval
+    journal_path = _session_journal_path(user_id)
+    items = _read_session_journal(journal_path)
+    
+    cards = _owned_cards(user_id, [card_id for card_id, _, _ in items])
+    recorded = {
+        (review['card_id'], review['reviewed_at'])
+        for review in find_all_in('reviews', 'card_id', cards)
+        if review.get('user_id') == user_id
+    }
+    pending = [item for item in items if item[0] in cards and (item[0], item[2]) not in recorded]
+    
+    if pending:
+        success, msg, _ = submit_reviews(pending)
+        if not success:
+            logger.error(f"Oturum kurtarılamadı: User {user_id} - {msg}")
+            return 0
+        logger.info(f"Yarım kalan oturumdan {len(pending)} cevap kurtarıldı (User {user_id})")
+    
+    if journal_path.exists():
+        journal_path.unlink()
+    return len(pending)
 
 
-def get_due_cards(deck_id: int = None) -> tuple[bool, str, list]:
+def start_review_session() -> tuple[bool, str, int]:
     """
-    Bugün due olan kartları getirir.
-    
-    Args:
-        deck_id: Belirli bir deck için filtrele (opsiyonel)
+    Tamponlu çalışma oturumu başlatır (bkz. record_answer).
+    Önceki oturumdan flush edilmemiş cevaplar varsa önce onlar kaydedilir.
     
     Returns:
-        tuple: (Başarılı mı, Mesaj, Due kart listesi)
+        tuple: (Başarılı mı, Mesaj, Kurtarılan cevap sayısı)
     """
     user_id = get_current_user_id()
     if not user_id:
-        return False, "Bu işlem için giriş yapmalısınız.", []
+        return False, "Bu işlem için giriş yapmalısınız.", 0
     
-    today = get_today_str()
+    if _review_session['user_id'] is not None:
+        end_review_session()
     
-    srs_states = find_all_by_field('srs_state', 'user_id', user_id)
-    
-    due_srs = [s for s in srs_states if s.get('due_date', '') <= today]
-    
-    if not due_srs:
-        return True, "Bugün çalışılacak kart yok. Tebrikler! 🎉", []
+    recovered = _recover_session(user_id)
+    _review_session['user_id'] = user_id
+    _review_session['buffer'] = []
+    _review_session['flushed_at'] = time.monotonic()
     
-    cards = load_json('cards')
-    decks = load_json('decks')
-    
-    user_deck_ids = [d['id'] for d in decks if d.get('user_id') == user_id]
-    
-    due_cards = []
-    for srs in due_srs:
-        card = next((c for c in cards if c['id'] == srs['card_id']), None)
-        
-        if not card:
-            continue
-        
-        if card.get('deck_id') not in user_deck_ids:
-            continue
-        
-        if deck_id and card.get('deck_id') != deck_id:
-            continue
-        
-        card_info = card.copy()
-        card_info['srs'] = {
-            'due_date': srs.get('due_date'),
-            'ef': srs.get('ef'),
-            'repetition': srs.get('repetition'),
-            'interval_days': srs.get('interval_days')
-        }
-        
-        deck = next((d for d in decks if d['id'] == card.get('deck_id')), None)
-        if deck:
-            card_info['deck_name'] = deck.get('name', 'Bilinmeyen')
-        
-        due_cards.append(card_info)
-    
-    return True, f"Bugün {len(due_cards)} kart due.", due_cards
+    if recovered:
+        return True, f"Yarım kalan oturumdan {recovered} cevap kaydedildi.", recovered
+    return True, "Çalışma oturumu başladı.", 0
 
 
-def submit_review(card_id: int, quality: int) -> tuple[bool, str, dict | None]:
+def record_answer(card_id: int, quality: int) -> tuple[bool, str]:
     """
-    Bir kartı çalışır ve review kaydeder.
+    Oturumdaki bir cevabı tampona ekler.
+    
+    Cevap önce oturum journal'ına yazılır (fsync); tampon SESSION_FLUSH_SIZE
+    cevaba ulaşınca veya son kayıttan bu yana SESSION_FLUSH_SECONDS geçince
+    submit_reviews ile kaydedilir.
     
     Args:
         card_id: Kart ID
         quality: 0-5 arası kalite puanı
     
     Returns:
-        tuple: (Başarılı mı, Mesaj, Güncel SRS durumu veya None)
+        tuple: (Başarılı mı, Mesaj)
     """
-    user_id = get_current_user_id()
-    if not user_id:
-        return False, "Bu işlem için giriş yapmalısınız.", None
+    user_id = _review_session['user_id']
+    if user_id is None or user_id != get_current_user_id():
+        return False, "Aktif çalışma oturumu yok."
     
     if not isinstance(quality, int) or quality < 0 or quality > 5:
-        return False, "Kalite puanı 0-5 arasında olmalıdır.", None
-    
-    from card_service import get_card
-    success, msg, card = get_card(card_id)
-    if not success:
-        return False, msg, None
-    
-    srs_states = load_json('srs_state')
-    srs = next(
-        (s for s in srs_states if s.get('card_id') == card_id and s.get('user_id') == user_id),
-        None
-    )
-    
-    if not srs:
-        srs = {
-            'user_id': user_id,
-            'card_id': card_id,
-            'repetition': 0,
-            'interval_days': 1,
-            'ef': 2.5,
-            'due_date': get_today_str(),
-            'last_quality': None
-        }
-        srs = insert('srs_state', srs)
-    
-    old_rep = srs.get('repetition', 0)
-    old_ef = srs.get('ef', 2.5)
-    old_interval = srs.get('interval_days', 1)
-    
-    new_rep, new_ef, new_interval = calculate_sm2(quality, old_rep, old_ef, old_interval)
+        return False, "Kalite puanı 0-5 arasında olmalıdır."
+    
+    reviewed_at = datetime.now().isoformat()
+    answer = {'card_id': card_id, 'quality': quality, 'reviewed_at': reviewed_at}
+    append_line(_session_journal_path(user_id), json.dumps(answer) + '\n')
+    _review_session['buffer'].append((card_id, quality, reviewed_at))
+    
+    if (
+        len(_review_session['buffer']) >= SESSION_FLUSH_SIZE
+        or time.monotonic() - _review_session['flushed_at'] >= SESSION_FLUSH_SECONDS
+    ):
+        success, msg, _ = flush_review_session()
+        if not success:
+            return False, msg
+    
+    return True, "Cevap kaydedildi."
+
+
+def flush_review_session() -> tuple[bool, str, list]:
+    """
+    Tampondaki cevapları submit_reviews ile kaydeder ve journal'ı temizler.
+    Erişilemeyen kartların (ör. oturum sırasında silinen) cevapları atlanır.
     
-    new_due_date = add_days(get_today_str(), new_interval)
+    Returns:
+        tuple: (Başarılı mı, Mesaj, Güncel SRS durumları)
+    """
+    user_id = _review_session['user_id']
+    if user_id is None:
+        return False, "Aktif çalışma oturumu yok.", []
     
-    updates = {
-        'repetition': new_rep,
-        'interval_days': new_interval,
-        'ef': new_ef,
-        'due_date': new_due_date,
-        'last_quality': quality,
-        'last_reviewed': datetime.now().isoformat()
-    }
+    buffer = _review_session['buffer']
+    cards = _owned_cards(user_id, [card_id for card_id, _, _ in buffer])
+    if len(cards) < len({card_id for card_id, _, _ in buffer}):
+        logger.warning(f"Oturumda erişilemeyen kartların cevapları atlandı (User {user_id})")
     
-    updated_srs = update('srs_state', srs['id'], updates)
+    success, msg, states = submit_reviews([item for item in buffer if item[0] in cards])
+    if not success:
+        return False, msg, []
     
-    review = {
-        'user_id': user_id,
-        'card_id': card_id,
-        'quality': quality,
-        'reviewed_at': datetime.now().isoformat()
-    }
-    insert('reviews', review)
+    buffer.clear()
+    _review_session['flushed_at'] = time.monotonic()
+    journal_path = _session_journal_path(user_id)
+    if journal_path.exists():
+        journal_path.unlink()
     
-    logger.info(f"Review kaydedildi: Card {card_id}, Quality {quality}, Due: {new_due_date}")
+    return True, msg, states
+
+
+def end_review_session() -> tuple[bool, str, list]:
+    """
+    Oturumu kapatır; tampondaki cevaplar kaydedilir.
     
-    return True, f"Güncellendi! Sonraki tekrar: {new_due_date}", updated_srs
+    Returns:
+        tuple: (Başarılı mı, Mesaj, Son flush'ta güncellenen SRS durumları)
+    """
+    if _review_session['user_id'] is None:
+        return True, "Aktif çalışma oturumu yok.", []
+    
+    result = flush_review_session()
+    if result[0]:
+        _review_session['user_id'] = None
+        _review_session['buffer'] = []
+    return result
 
 
 def get_srs_state(card_id: int) -> tuple[bool, str, dict | None]:
@@ -448,9 +505,9 @@ def get_srs_state(card_id: int) -> tuple[bool, str, dict | None]:
     if not user_id:
         return False, "Bu işlem için giriş yapmalısınız.", None
     
-    srs_states = load_json('srs_state')
+    srs_states = find_all_by_field('srs_state', 'user_id', user_id)
     srs = next(
-        (s for s in srs_states if s.get('card_id') == card_id and s.get('user_id') == user_id),
+        (s for s in srs_states if s.get('card_id') == card_id),
         None
     )
     
@@ -479,9 +536,9 @@ def reset_card(card_id: int) -> tuple[bool, str]:
     if not success:
         return False, msg
     
-    srs_states = load_json('srs_state')
+    srs_states = find_all_by_field('srs_state', 'user_id', user_id)
     srs = next(
-        (s for s in srs_states if s.get('card_id') == card_id and s.get('user_id') == user_id),
+        (s for s in srs_states if s.get('card_id') == card_id),
         None
     )
     
@@ -500,4 +557,3 @@ def reset_card(card_id: int) -> tuple[bool, str]:
     logger.info(f"Kart SRS sıfırlandı: {card_id}")
     
     return True, "Kart başarıyla sıfırlandı!"
->>>>>>> 49319f5dfc84fb8c02a88209b4cff51a53bda568
@@ -0,0 +1,240 @@
+"""
+rollups.py - Günlük Review Özetleri
+
+review_rollups koleksiyonu her (user_id, gün, deck_id) için review sayısını,
+kalite toplamını ve kalite histogramını (0-5) tutar. Raporlar review'ları tek
+tek okumak yerine istenen günlerin özet satırlarını okur; koleksiyon reviews
+gibi aylık segmentlere bölündüğü için N günlük rapor sadece o günlerin
+segmentlerini açar.
+
+Özetler review'larla aynı transaction'da güncellenir: submit_review /
+submit_reviews eklenen review'ları add_reviews ile, kart silme silinecek
+review'ları remove_reviews ile bildirir. Deck ve kullanıcı silmede özet
+satırları CASCADES ile silinir.
+
+İlk kurulum (mevcut review geçmişinden): özet koleksiyonu boşken review'lar
+varsa ilk okuma veya yazmada ensure_built ile kendiliğinden yapılır. Elle:
+    python rollups.py rebuild
+"""
+
+import logging
+import sys
+
+from storage import (
+    find_many, find_all_in, iter_collection, insert_many, update_many, delete_where,
+    reserve_ids, save_json, transaction
+)
+from utils import date_to_ordinal
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'review_rollups'
+
+
+def _day_of(review: dict) -> str | None:
+    """Review'un gününü (YYYY-AA-GG) döndürür; zamanı geçersizse None."""
+    reviewed_at = review.get('reviewed_at')
+    if date_to_ordinal(reviewed_at) is None:
+        return None
+    return reviewed_at[:10]
+
+
+def _aggregate(reviews, deck_of: dict) -> dict:
+    """
+    Review'ları (user_id, gün, deck_id) anahtarına göre toplar.
+    
+    Args:
+        reviews: Review kayıtları
+        deck_of: Kart ID -> deck ID (bulunamayan kartlar için deck_id None)
+    
+    Returns:
+        dict: anahtar -> [sayı, kalite toplamı, histogram]
+    """
+    totals = {}
+    for review in reviews:
+        day = _day_of(review)
+        if day is None:
+            continue
+        
+        key = (review.get('user_id'), day, deck_of.get(review.get('card_id')))
+        total = totals.get(key)
+        if total is None:
+            total = totals[key] = [0, 0, [0] * 6]
+        
+        quality = review.get('quality', 0)
+        total[0] += 1
+        total[1] += quality
+        if isinstance(quality, int) and 0 <= quality <= 5:
+            total[2][quality] += 1
+    return totals
+
+
+def _deck_map(reviews: list) -> dict:
+    """Review'ların kartlarının deck'lerini tek sorguda bulur."""
+    cards = find_many('cards', {review.get('card_id') for review in reviews})
+    return {card_id: card.get('deck_id') for card_id, card in cards.items()}
+
+
+def _merge(reviews: list, sign: int):
+    """Review'ları özet satırlarına ekler (sign=1) veya çıkarır (sign=-1)."""
+    if ensure_built() and sign > 0:
+        # Kurulum az önce yazılan review'ları da saydı
+        return
+    
+    totals = _aggregate(reviews, _deck_map(reviews))
+    if not totals:
+        return
+    
+    users = {user_id for user_id, _, _ in totals}
+    first, last = min(day for _, day, _ in totals), max(day for _, day, _ in totals)
+    existing = {
+        (row.get('user_id'), row.get('day'), row.get('deck_id')): row
+        for row in find_all_in(COLLECTION, 'user_id', users)
+        if first <= row.get('day', '') <= last
+    }
+    
+    new_rows = []
+    updates = {}
+    emptied = set()
+    for key, (count, quality_sum, histogram) in totals.items():
+        row = existing.get(key)
+        if row is None:
+            if sign > 0:
+                user_id, day, deck_id = key
+                new_rows.append({
+                    'user_id': user_id,
+                    'day': day,
+                    'deck_id': deck_id,
+                    'count': count,
+                    'quality_sum': quality_sum,
+                    'histogram': histogram
+                })
+            continue
+        
+        if row['count'] + sign * count <= 0:
+            emptied.add(row['id'])
+            continue
+        updates[row['id']] = {
+            'count': row['count'] + sign * count,
+            'quality_sum': row['quality_sum'] + sign * quality_sum,
+            'histogram': [old + sign * new for old, new in zip(row['histogram'], histogram)]
+        }
+    
+    with transaction():
+        insert_many(COLLECTION, new_rows)
+        update_many(COLLECTION, updates)
+        if emptied:
+            delete_where(COLLECTION, field='id', values=emptied)
+
+
+def add_reviews(reviews: list):
+    """
+    Yeni eklenen review'ları günlük özetlere ekler.
+    Review'lar reviews'e yazılırken aynı transaction içinde çağrılmalıdır.
+    
+    Args:
+        reviews: Eklenen review kayıtları
+    """
+    _merge(reviews, 1)
+
+
+def remove_reviews(reviews: list):
+    """
+    Silinecek review'ları günlük özetlerden çıkarır (sayısı sıfıra inen satırlar silinir).
+    Kartlar henüz silinmeden, silme ile aynı transaction içinde çağrılmalıdır.
+    
+    Args:
+        reviews: Silinecek review kayıtları
+    """
+    _merge(reviews, -1)
+
+
+def get_rollups(user_id: int, since: str = None, until: str = None) -> list:
+    """
+    Kullanıcının [since, until) günlerindeki özet satırlarını döndürür.
+    Sadece aralıkla kesişen aylık segmentler okunur.
+    
+    Args:
+        user_id: Kullanıcı ID
+        since: İlk gün (YYYY-AA-GG), dahil (None ise sınırsız)
+        until: Son gün, hariç (None ise sınırsız)
+    
+    Returns:
+        list: Özet satırları (user_id, day, deck_id, count, quality_sum, histogram)
+    """
+    ensure_built()
+    return list(iter_collection(
+        COLLECTION, where=lambda row: row.get('user_id') == user_id, since=since, until=until
+    ))
+
+
+def rebuild() -> int:
+    """
+    Özet tablosunu review geçmişinden baştan kurar. Review'lar akış halinde
+    okunur; mevcut özetlerin yerine yazılır.
+    
+    Returns:
+        int: Oluşturulan özet satırı sayısı
+    """
+    deck_of = {card['id']: card.get('deck_id') for card in iter_collection('cards', fields=['id', 'deck_id'])}
+    totals = _aggregate(
+        iter_collection('reviews', fields=['user_id', 'card_id', 'quality', 'reviewed_at']), deck_of
+    )
+    
+    ids = iter(reserve_ids(COLLECTION, len(totals)))
+    rows = [
+        {
+            'id': next(ids),
+            'user_id': user_id,
+            'day': day,
+            'deck_id': deck_id,
+            'count': count,
+            'quality_sum': quality_sum,
+            'histogram': histogram
+        }
+        for (user_id, day, deck_id), (count, quality_sum, histogram) in sorted(
+            totals.items(), key=lambda item: (item[0][1], str(item[0][0]), str(item[0][2]))
+        )
+    ]
+    
+    save_json(COLLECTION, rows)
+    logger.info(f"Review özetleri yeniden kuruldu: {len(rows)} satır")
+    return len(rows)
+
+
+def ensure_built() -> bool:
+    """
+    Özet koleksiyonu boş ama review geçmişi varsa (özetlerden önceki sürümden
+    gelen veri) özetleri bir kez kurar. Özet satırı varsa sadece ilk kaydı okur.
+    
+    Returns:
+        bool: Kurulum yapıldıysa True
+    """
+    if next(iter_collection(COLLECTION, fields=['id']), None) is not None:
+        return False
+    if next(iter_collection('reviews', fields=['id']), None) is None:
+        return False
+    
+    logger.info("Review özetleri bulunamadı, review geçmişinden kuruluyor")
+    rebuild()
+    return True
+
+
+def main(argv: list) -> int:
+    """
+    Komut satırı girişi.
+    
+    Kullanım:
+        python rollups.py rebuild
+    """
+    if argv[1:] != ['rebuild']:
+        print("Kullanım: python rollups.py rebuild")
+        return 1
+    
+    count = rebuild()
+    print(f"✅ {count} günlük özet satırı oluşturuldu")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
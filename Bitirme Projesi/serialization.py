@@ -0,0 +1,392 @@
+"""
+serialization.py - Koleksiyon Dosya Biçimleri (Codec)
+
+Koleksiyon snapshot dosyalarının diskteki biçimini tanımlar. Dosya adı
+her biçimde aynıdır (ör. reviews.json); biçim okuma sırasında dosyanın
+ilk baytlarından anlaşılır ve sonraki yazmalar aynı biçimle yapılır.
+
+Biçimler:
+    json          Girintili JSON (varsayılan, elle okunabilir)
+    json-compact  Boşluksuz JSON (yaklaşık yarı boyut)
+    pickle        pickle protokol 5 (en hızlı yükleme, sadece güvenilir yerel veri)
+    records       Kayıt bazlı ikili biçim: başlık + (uzunluk, marshal) blokları
+
+Dönüştürme:
+    python serialization.py info
+    python serialization.py convert json-compact reviews srs_state
+"""
+
+import json
+import marshal
+import pickle
+import struct
+import sys
+
+RECORDS_MAGIC = b'SBREC1\n'
+_LENGTH = struct.Struct('<I')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _join_json(parts: list, header: bytes, separator: bytes, footer: bytes) -> tuple[bytes, list]:
+    """Kodlanmış kayıtları JSON dizisi olarak birleştirir, her kaydın (offset, uzunluk) bilgisini döndürür."""
+    if not parts:
+        return b'[]', []
+    
+    offsets = []
+    position = len(header)
+    for part in parts:
+        offsets.append((position, len(part)))
+        position += len(part) + len(separator)
+    return header + separator.join(parts) + footer, offsets
+
+
+def _dump_json(items: list) -> tuple[bytes, list]:
+    """Kayıtları girintili JSON olarak kodlar (json.dump(..., indent=2) ile aynı çıktı)."""
+    parts = [
+        json.dumps(item, ensure_ascii=False, indent=2, default=str).replace('\n', '\n  ').encode('utf-8')
+        for item in items
+    ]
+    return _join_json(parts, b'[\n  ', b',\n  ', b'\n]')
+
+
+def _dump_json_compact(items: list) -> tuple[bytes, list]:
+    """Kayıtları boşluksuz JSON olarak kodlar."""
+    parts = [
+        json.dumps(item, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        for item in items
+    ]
+    return _join_json(parts, b'[', b',', b']')
+
+
+def _load_json(content: bytes) -> list:
+    """JSON içeriği çözer."""
+    return json.loads(content.decode('utf-8'))
+
+
+def _dump_pickle(items: list) -> tuple[bytes, None]:
+    """
+    Kayıtları pickle protokol 5 ile kodlar (salt okunur kayıtlar düz dict'e çevrilir).
+    Tek nesne olarak yazıldığı için kayıt konumu yoktur.
+    """
+    return pickle.dumps([dict(item) for item in items], protocol=5), None
+
+
+def _load_pickle(content: bytes) -> list:
+    """pickle içeriği çözer. Sadece uygulamanın kendi yazdığı dosyalar için kullanılmalıdır."""
+    return pickle.loads(content)
+
+
+def _dump_records(items: list) -> tuple[bytes, list]:
+    """
+    Kayıtları başlık ve ardışık (4 bayt uzunluk, marshal kaydı) blokları olarak kodlar.
+    marshal sadece temel tipleri (dict, list, str, int, float, bool, None) destekler.
+    """
+    parts = [RECORDS_MAGIC]
+    offsets = []
+    position = len(RECORDS_MAGIC)
+    for item in items:
+        data = marshal.dumps(dict(item))
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+        offsets.append((position + _LENGTH.size, len(data)))
+        position += _LENGTH.size + len(data)
+    return b''.join(parts), offsets
+
+
+def _load_records(content: bytes) -> list:
+    """Kayıt bazlı ikili içeriği çözer."""
+    view = memoryview(content)
+    offset = len(RECORDS_MAGIC)
+    items = []
+    while offset < len(view):
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        if offset + length > len(view):
+            raise ValueError("Kayıt dosyası yarım kalmış")
+        items.append(marshal.loads(view[offset:offset + length]))
+        offset += length
+    return items
+
+
+# Biçim adı -> (kodlayıcı, çözücü). Kodlayıcı (içerik, kayıt konumları) döndürür;
+# konumlar her kaydın (offset, uzunluk) bilgisidir, biçim desteklemiyorsa None.
+CODECS = {
+    'json': (_dump_json, _load_json),
+    'json-compact': (_dump_json_compact, _load_json),
+    'pickle': (_dump_pickle, _load_pickle),
+    'records': (_dump_records, _load_records),
+}
+
+
+def detect(content: bytes) -> str:
+    """
+    İçeriğin biçimini ilk baytlarından belirler.
+    
+    Args:
+        content: Dosya içeriği
+    
+    Returns:
+        str: Biçim adı
+    """
+    if content.startswith(RECORDS_MAGIC):
+        return 'records'
+    if content.startswith(b'\x80\x05'):
+        return 'pickle'
+    if content.startswith(b'[{'):
+        return 'json-compact'
+    return 'json'
+
+
+def dumps(items: list, codec: str) -> bytes:
+    """
+    Kayıt listesini verilen biçimde kodlar.
+    
+    Args:
+        items: Kayıt listesi
+        codec: Biçim adı (bkz. CODECS)
+    
+    Returns:
+        bytes: Dosya içeriği
+    
+    Raises:
+        ValueError: Bilinmeyen biçim
+    """
+    return dumps_indexed(items, codec)[0]
+
+
+def dumps_indexed(items: list, codec: str) -> tuple[bytes, list | None]:
+    """
+    Kayıt listesini kodlar ve her kaydın dosyadaki konumunu döndürür.
+    
+    Args:
+        items: Kayıt listesi
+        codec: Biçim adı (bkz. CODECS)
+    
+    Returns:
+        tuple: (Dosya içeriği, [(offset, uzunluk), ...] veya None)
+    
+    Raises:
+        ValueError: Bilinmeyen biçim
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Bilinmeyen biçim: {codec}")
+    return CODECS[codec][0](items)
+
+
+def decode_record(codec: str, data: bytes) -> dict:
+    """
+    Konumu bilinen tek bir kaydı çözer (bkz. dumps_indexed, scan_offsets).
+    
+    Args:
+        codec: Dosyanın biçimi
+        data: Kaydın baytları
+    
+    Returns:
+        dict: Kayıt
+    """
+    if codec == 'records':
+        return marshal.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def scan_offsets(path) -> tuple[str, list | None]:
+    """
+    Mevcut bir dosyadaki kayıtların konumlarını çıkarır (tüm dosya bir kez çözülür).
+    
+    Args:
+        path: Dosya yolu
+    
+    Returns:
+        tuple: (Biçim adı, [(id, offset, uzunluk), ...] veya pickle için None)
+    
+    Raises:
+        ValueError: İçerik çözülemezse
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    codec = detect(content)
+    
+    if codec == 'pickle':
+        return codec, None
+    
+    entries = []
+    if codec == 'records':
+        offset = len(RECORDS_MAGIC)
+        while offset < len(content):
+            (length,) = _LENGTH.unpack_from(content, offset)
+            offset += _LENGTH.size
+            entries.append((marshal.loads(content[offset:offset + length]).get('id'), offset, length))
+            offset += length
+        return codec, entries
+    
+    text = content.decode('utf-8')
+    ascii_only = len(text) == len(content)
+    decoder = json.JSONDecoder()
+    pos = text.index('[') + 1
+    byte_pos = len(text[:pos].encode('utf-8'))
+    
+    while True:
+        start = pos
+        while text[pos] in ' \t\r\n,':
+            pos += 1
+        if text[pos] == ']':
+            return codec, entries
+        
+        item, end = decoder.raw_decode(text, pos)
+        if ascii_only:
+            entries.append((item.get('id'), pos, end - pos))
+        else:
+            byte_pos += len(text[start:pos].encode('utf-8'))
+            length = len(text[pos:end].encode('utf-8'))
+            entries.append((item.get('id'), byte_pos, length))
+            byte_pos += length
+        pos = end
+
+
+def loads(content: bytes) -> tuple[str, list]:
+    """
+    Dosya içeriğinin biçimini belirler ve kayıt listesine çözer.
+    
+    Args:
+        content: Dosya içeriği
+    
+    Returns:
+        tuple: (Biçim adı, Kayıt listesi)
+    
+    Raises:
+        ValueError: İçerik çözülemezse
+    """
+    codec = detect(content)
+    try:
+        items = CODECS[codec][1](content)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"{codec} içeriği çözülemedi: {e}") from e
+    
+    if not isinstance(items, list):
+        raise ValueError(f"{codec} içeriği kayıt listesi değil")
+    return codec, items
+
+
+def _iter_json(f):
+    """
+    Metin modunda açılmış JSON dizisinin elemanlarını tek tek çözer.
+    Bellekte en fazla bir parça (STREAM_CHUNK_SIZE) ve bir kayıt tutulur.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(STREAM_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("JSON dizisi bekleniyordu")
+    pos = 1
+    
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = f.read(STREAM_CHUNK_SIZE), 0
+            if not buffer:
+                raise ValueError("JSON dizisi yarım kalmış")
+            continue
+        if buffer[pos] == ']':
+            return
+        
+        try:
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        
+        yield item
+        if pos > STREAM_CHUNK_SIZE:
+            buffer, pos = buffer[pos:], 0
+
+
+def _iter_records(f):
+    """İkili modda açılmış kayıt bazlı dosyanın kayıtlarını tek tek çözer."""
+    f.seek(len(RECORDS_MAGIC))
+    while True:
+        header = f.read(_LENGTH.size)
+        if not header:
+            return
+        if len(header) < _LENGTH.size:
+            raise ValueError("Kayıt dosyası yarım kalmış")
+        (length,) = _LENGTH.unpack(header)
+        data = f.read(length)
+        if len(data) < length:
+            raise ValueError("Kayıt dosyası yarım kalmış")
+        yield marshal.loads(data)
+
+
+def iter_file(path):
+    """
+    Koleksiyon dosyasının kayıtlarını tüm dosyayı belleğe almadan sırayla döndürür.
+    Biçim dosyanın ilk baytlarından belirlenir; pickle akış halinde okunamadığı
+    için tek seferde yüklenir.
+    
+    Args:
+        path: Dosya yolu
+    
+    Yields:
+        dict: Kayıt
+    
+    Raises:
+        ValueError: İçerik çözülemezse
+    """
+    with open(path, 'rb') as f:
+        codec = detect(f.read(len(RECORDS_MAGIC)))
+        f.seek(0)
+        if codec == 'records':
+            yield from _iter_records(f)
+        elif codec == 'pickle':
+            yield from loads(f.read())[1]
+        else:
+            with open(path, 'r', encoding='utf-8') as text:
+                yield from _iter_json(text)
+
+
+def _collection_size(collection_name: str) -> int | None:
+    """Koleksiyonun tüm bölüm dosyalarının (shard ve segmentler dahil) toplam boyutu; dosyası yoksa None."""
+    import storage
+    
+    paths = [storage.get_file_path(name) for name in storage.list_partitions(collection_name)]
+    sizes = [path.stat().st_size for path in paths if path.exists()]
+    return sum(sizes) if sizes else None
+
+
+def main(argv: list) -> int:
+    """
+    Komut satırı girişi.
+    
+    Kullanım:
+        python serialization.py info
+        python serialization.py convert <biçim> [koleksiyon ...]
+    """
+    import storage
+    
+    if argv[1:2] == ['info']:
+        for collection_name in storage.FILES:
+            size = _collection_size(collection_name)
+            if size is not None:
+                codec = storage.get_codec(collection_name)
+                print(f"{collection_name}: {codec} ({size} bayt)")
+        return 0
+    
+    if argv[1:2] == ['convert'] and len(argv) >= 3 and argv[2] in CODECS:
+        for collection_name in argv[3:] or list(storage.FILES):
+            if not storage.set_codec(collection_name, argv[2]):
+                print(f"❌ {collection_name} dönüştürülemedi")
+                return 1
+            print(f"✅ {collection_name}: {argv[2]} ({_collection_size(collection_name) or 0} bayt)")
+        return 0
+    
+    print("Kullanım: python serialization.py info")
+    print(f"          python serialization.py convert <{'|'.join(CODECS)}> [koleksiyon ...]")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,328 @@
+"""
+simulator.py - Monte Carlo Zamanlama Simülatörü
+
+SM-2 zamanlamasını sentetik veya kayıtlı kart popülasyonları üzerinde aylar
+ya da yıllar boyunca simüle eder. Zamanlama parametreleri (interval çarpanı,
+en uzun interval, yeni kartların ef'i) kullanıcılara açılmadan önce iş yükü
+ve tutma oranı üzerinden karşılaştırılır.
+
+Kalite modeli kullanıcının review geçmişinden çıkarılır: her kartın ardışık
+review'ları arasındaki gün farkı ELAPSED_BUCKETS aralıklarına ayrılır ve her
+aralık için 0-5 kalite dağılımı sayılır. Böylece interval'i uzatan
+parametreler daha çok unutmayla sonuçlanır. Az örnekli aralıklar kullanıcının
+genel dağılımını kullanır.
+
+Her deneme gün gün ilerler: o gün due olan kartlar ve günlük yeni kartlar
+çalışılmış sayılır, kalite kartın beklediği gün sayısına göre modelden
+çekilir, yeni durum sm2_batch.calculate_sm2_batch ile hesaplanır (sonuçlar
+review_service.calculate_sm2 ile aynıdır). Denemeler birbirinden bağımsızdır
+ve ProcessPoolExecutor işçilerine bölünür. Her denemenin tohumu seed + deneme
+numarasıdır, bu yüzden sonuç işçi sayısından bağımsızdır.
+
+Kullanım:
+    python simulator.py compare [interval çarpanı ...] [--user ID] [--cards N]
+                                [--new N] [--days N] [--trials N] [--workers N]
+"""
+
+import os
+import random
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+
+from forecast import DEFAULT_QUALITY_WEIGHTS, user_rows
+from sm2_batch import calculate_sm2_batch
+from storage import iter_collection
+from utils import date_to_ordinal, get_today_ordinal
+
+# Gün farkı aralıklarının alt sınırları; 0. aralık ilk review (ve aynı gün tekrarı)
+ELAPSED_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+MIN_BUCKET_REVIEWS = 20    # Bundan az örnekli aralıklar genel dağılımı kullanır
+
+DEFAULT_PARAMS = {
+    'interval_modifier': 1.0,    # SM-2 interval'i bu çarpanla ölçeklenir
+    'max_interval': 36500,       # En uzun interval (gün)
+    'initial_ef': 2.5            # Yeni kartların ef'i
+}
+
+# Gün farkı -> aralık (son sınırdan büyük farklar son aralıktadır)
+_BUCKET_OF = [bisect_right(ELAPSED_BUCKETS, elapsed) - 1 for elapsed in range(ELAPSED_BUCKETS[-1] + 1)]
+
+
+def _bucket(elapsed: int) -> int:
+    """Gün farkının aralık numarası."""
+    return _BUCKET_OF[elapsed] if elapsed < len(_BUCKET_OF) else len(ELAPSED_BUCKETS) - 1
+
+
+def quality_model(user_id: int = None) -> list:
+    """
+    Kullanıcının review geçmişinden gün farkı aralığı başına kalite dağılımı çıkarır.
+    
+    Args:
+        user_id: Kullanıcı ID (None ise geçmiş kullanılmaz)
+    
+    Returns:
+        list: Her ELAPSED_BUCKETS aralığı için 0-5 kalite olasılıkları; geçmiş
+              yoksa her aralık forecast.DEFAULT_QUALITY_WEIGHTS
+    """
+    histograms = [[0] * 6 for _ in ELAPSED_BUCKETS]
+    
+    if user_id is not None:
+        by_card = {}
+        for review in iter_collection(
+            'reviews', fields=['card_id', 'quality', 'reviewed_at'], where=lambda r: r.get('user_id') == user_id
+        ):
+            day = date_to_ordinal(review.get('reviewed_at'))
+            quality = review.get('quality')
+            if day is not None and isinstance(quality, int) and 0 <= quality <= 5:
+                by_card.setdefault(review.get('card_id'), []).append((review['reviewed_at'], day, quality))
+        
+        for reviews in by_card.values():
+            reviews.sort()
+            previous = None
+            for _, day, quality in reviews:
+                histograms[_bucket(day - previous if previous is not None else 0)][quality] += 1
+                previous = day
+    
+    overall = [sum(counts) for counts in zip(*histograms)]
+    if not sum(overall):
+        overall = list(DEFAULT_QUALITY_WEIGHTS)
+    
+    model = []
+    for histogram in histograms:
+        if sum(histogram) < MIN_BUCKET_REVIEWS:
+            histogram = overall
+        total = sum(histogram)
+        model.append([count / total for count in histogram])
+    return model
+
+
+def synthetic_population(cards: int, ef: float = DEFAULT_PARAMS['initial_ef']) -> list:
+    """
+    Hiç çalışılmamış kartlardan oluşan popülasyon.
+    
+    Args:
+        cards: Kart sayısı
+        ef: Kartların ef'i
+    
+    Returns:
+        list: (due gün farkı, tekrar sayısı, ef, interval) satırları; interval 0 yeni kart demektir
+    """
+    return [(0, 0, ef, 0)] * cards
+
+
+def recorded_population(user_id: int, today: int) -> list:
+    """
+    Kullanıcının kayıtlı SRS durumlarından popülasyon oluşturur.
+    
+    Args:
+        user_id: Kullanıcı ID
+        today: Bugünün gün numarası (gecikmiş kartlar bugün due sayılır)
+    
+    Returns:
+        list: (due gün farkı, tekrar sayısı, ef, interval) satırları
+    """
+    return [
+        (max(due - today, 0), repetition, ef, interval)
+        for _, due, repetition, ef, interval in user_rows(user_id)
+    ]
+
+
+def _run_trial(population: list, model: list, params: dict, days: int, new_per_day: int, seed: int) -> tuple:
+    """
+    Tek bir denemeyi çalıştırır. Yeni kartların ilk review'u hatırlama
+    sayılmaz; unutma, daha önce çalışılmış bir kartın kalite < 3 almasıdır.
+    
+    Returns:
+        tuple: (günlük review sayıları, günlük unutma sayıları, hatırlama review'u sayısı)
+    """
+    rng = random.Random(seed)
+    random_value = rng.random
+    cum_model = [list(accumulate(weights)) for weights in model]
+    modifier = params['interval_modifier']
+    max_interval = params['max_interval']
+    new_card = (0, params['initial_ef'], 0)
+    
+    pending = [[] for _ in range(days)]
+    for offset, repetition, ef, interval in population:
+        if offset < days:
+            pending[offset].append((repetition, ef, interval))
+    
+    reviews = [0] * days
+    lapses = [0] * days
+    recall_reviews = 0
+    
+    for day in range(days):
+        batch = pending[day]
+        pending[day] = None
+        batch.extend(repeat(new_card, new_per_day))
+        if not batch:
+            continue
+        
+        repetitions, efs, intervals = zip(*batch)
+        qualities = []
+        for interval in intervals:
+            cum_weights = cum_model[_bucket(interval)]
+            quality = bisect_right(cum_weights, random_value() * cum_weights[-1])
+            qualities.append(quality)
+            if interval:
+                recall_reviews += 1
+                if quality < 3:
+                    lapses[day] += 1
+        reviews[day] = len(batch)
+        
+        new_repetitions, new_efs, new_intervals = calculate_sm2_batch(qualities, repetitions, efs, intervals)
+        for repetition, ef, interval in zip(new_repetitions, new_efs, new_intervals):
+            if modifier != 1.0 or interval > max_interval:
+                interval = min(max(round(interval * modifier), 1), max_interval)
+            next_day = day + max(interval, 1)
+            if next_day < days:
+                pending[next_day].append((repetition, ef, interval))
+    
+    return reviews, lapses, recall_reviews
+
+
+def _run_trials(population: list, model: list, params: dict, days: int, new_per_day: int, seeds: list) -> dict:
+    """İşçi görevi: verilen tohumlarla denemeleri çalıştırır ve sonuçlarını birleştirir."""
+    reviews = [0] * days
+    lapses = [0] * days
+    peak = [0] * days
+    retention = []
+    
+    for seed in seeds:
+        trial_reviews, trial_lapses, recall_reviews = _run_trial(
+            population, model, params, days, new_per_day, seed
+        )
+        reviews = [a + b for a, b in zip(reviews, trial_reviews)]
+        lapses = [a + b for a, b in zip(lapses, trial_lapses)]
+        peak = [max(a, b) for a, b in zip(peak, trial_reviews)]
+        retention.append((seed, 1 - sum(trial_lapses) / recall_reviews if recall_reviews else 1.0))
+    
+    return {'reviews': reviews, 'lapses': lapses, 'peak': peak, 'retention': retention}
+
+
+def simulate(population: list, model: list, params: dict = None, days: int = 365, trials: int = 20,
+             new_per_day: int = 0, workers: int = None, seed: int = 0) -> dict:
+    """
+    Popülasyonu verilen parametrelerle Monte Carlo yöntemiyle simüle eder.
+    
+    Args:
+        population: (due gün farkı, tekrar sayısı, ef, interval) satırları
+            (bkz. synthetic_population, recorded_population)
+        model: Aralık başına kalite olasılıkları (bkz. quality_model)
+        params: DEFAULT_PARAMS'ın değiştirilecek anahtarları
+        days: Simüle edilecek gün sayısı
+        trials: Deneme sayısı
+        new_per_day: Her gün eklenen yeni kart sayısı
+        workers: İşçi süreç sayısı (None ise CPU sayısı; 1 ise aynı süreçte çalışır)
+        seed: İlk denemenin tohumu
+    
+    Returns:
+        dict: params, days, trials, reviews ve lapses (gün başına deneme
+              ortalaması), reviews_max (gün başına en yüksek review sayısı),
+              total_reviews (deneme başına ortalama) ve retention,
+              retention_min, retention_max (hatırlama review'larında kalite >= 3 oranı)
+    
+    Raises:
+        ValueError: Gün veya deneme sayısı 1'den küçükse ya da bilinmeyen parametre verilirse
+    """
+    if days < 1 or trials < 1:
+        raise ValueError("Gün ve deneme sayısı en az 1 olmalıdır.")
+    unknown = set(params or {}) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen parametre: {', '.join(sorted(unknown))}")
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    
+    seeds = [seed + trial for trial in range(trials)]
+    workers = max(1, min(workers or os.cpu_count() or 1, trials))
+    if workers == 1:
+        parts = [_run_trials(population, model, params, days, new_per_day, seeds)]
+    else:
+        shards = [seeds[worker::workers] for worker in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(
+                _run_trials, repeat(population), repeat(model), repeat(params),
+                repeat(days), repeat(new_per_day), shards
+            ))
+    
+    reviews = [sum(counts) for counts in zip(*(part['reviews'] for part in parts))]
+    lapses = [sum(counts) for counts in zip(*(part['lapses'] for part in parts))]
+    peak = [max(counts) for counts in zip(*(part['peak'] for part in parts))]
+    retention = [value for _, value in sorted(item for part in parts for item in part['retention'])]
+    
+    return {
+        'params': params,
+        'days': days,
+        'trials': trials,
+        'reviews': [count / trials for count in reviews],
+        'lapses': [count / trials for count in lapses],
+        'reviews_max': peak,
+        'total_reviews': sum(reviews) / trials,
+        'retention': sum(retention) / trials,
+        'retention_min': min(retention),
+        'retention_max': max(retention)
+    }
+
+
+def _parse_args(args: list) -> tuple[list, dict] | None:
+    """compare argümanlarını (çarpanlar, seçenekler) olarak ayrıştırır; geçersizse None."""
+    options = {'user': None, 'cards': 1000, 'new': 0, 'days': 365, 'trials': 20, 'workers': None}
+    modifiers = []
+    tokens = iter(args)
+    for token in tokens:
+        if token.startswith('--'):
+            name = token[2:]
+            value = next(tokens, '')
+            if name not in options or not value.isdigit():
+                return None
+            options[name] = int(value)
+            continue
+        try:
+            modifiers.append(float(token))
+        except ValueError:
+            return None
+    if any(modifier <= 0 for modifier in modifiers) or options['days'] < 1 or options['trials'] < 1:
+        return None
+    return modifiers or [DEFAULT_PARAMS['interval_modifier']], options
+
+
+def main(argv: list) -> int:
+    """
+    Komut satırı girişi.
+    
+    Kullanım:
+        python simulator.py compare [interval çarpanı ...] [--user ID] [--cards N]
+                                    [--new N] [--days N] [--trials N] [--workers N]
+    """
+    parsed = _parse_args(argv[2:]) if argv[1:2] == ['compare'] else None
+    if parsed is None:
+        print("Kullanım: python simulator.py compare [interval çarpanı ...] [--user ID] [--cards N]")
+        print("                                      [--new N] [--days N] [--trials N] [--workers N]")
+        return 1
+    modifiers, options = parsed
+    
+    if options['user'] is not None:
+        population = recorded_population(options['user'], get_today_ordinal())
+        source = f"kullanıcı {options['user']}: {len(population)} kart"
+    else:
+        population = synthetic_population(options['cards'])
+        source = f"{options['cards']} yeni kart"
+    model = quality_model(options['user'])
+    
+    print(f"{source}, günde {options['new']} yeni kart, {options['days']} gün, {options['trials']} deneme")
+    print(f"{'Çarpan':>7} {'Toplam review':>14} {'Günlük ort.':>12} {'En yoğun gün':>13} {'Tutma oranı':>12}")
+    for modifier in modifiers:
+        result = simulate(
+            population, model, {'interval_modifier': modifier}, days=options['days'],
+            trials=options['trials'], new_per_day=options['new'], workers=options['workers']
+        )
+        print(
+            f"{modifier:>7.2f} {result['total_reviews']:>14.0f} {result['total_reviews'] / options['days']:>12.1f}"
+            f" {max(result['reviews_max']):>13} {result['retention']:>11.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
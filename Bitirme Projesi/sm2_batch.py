@@ -0,0 +1,173 @@
+"""
+sm2_batch.py - Toplu SM-2 Hesaplama
+
+review_service.calculate_sm2'nin dizi sürümü: (quality, repetition, ef,
+interval) sütunlarının tamamı için yeni SRS durumunu tek çağrıda hesaplar.
+EF formülü değişince planların yeniden hesaplanması, "şu puanı verseydim"
+önizlemeleri ve içe aktarılan review'ların yeniden oynatılması gibi toplu
+işlemler için kullanılır.
+
+Sonuçlar calculate_sm2 ile bit düzeyinde aynıdır: EF artışı aynı ifadeyle
+kalite başına bir kez hesaplanır, yuvarlamalar Python'un round() kuralıyla
+(yarımlarda çifte yuvarlama) yapılır. NumPy kuruluysa hesaplama NumPy ile
+yapılır; değilse stdlib array ve önbellekli tablo kullanılır.
+
+Karşılaştırma:
+    python sm2_batch.py bench [kart sayısı]
+"""
+
+import random
+import sys
+import time
+from array import array
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MIN_EF = 1.3
+
+# Kalite -> EF artışı (calculate_sm2 ile aynı ifade)
+EF_DELTAS = tuple(0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02) for quality in range(6))
+
+
+class _EfTable(dict):
+    """(ef, kalite) -> (alt sınırlı yeni ef, 2 haneye yuvarlanmış yeni ef); ilk erişimde hesaplanır."""
+    
+    def __missing__(self, key):
+        ef, quality = key
+        new_ef = ef + EF_DELTAS[quality]
+        if new_ef < MIN_EF:
+            new_ef = MIN_EF
+        value = self[key] = (new_ef, round(new_ef, 2))
+        return value
+
+
+def _check_qualities(lowest, highest):
+    """Kalite puanlarının 0-5 arasında olduğunu doğrular."""
+    if not 0 <= lowest <= highest <= 5:
+        raise ValueError("Kalite puanı 0-5 arasında olmalıdır.")
+
+
+def _calculate_python(qualities, repetitions, efs, intervals) -> tuple[array, array, array]:
+    """Saf Python yolu: sütun bazlı list comprehension'lar ve (ef, kalite) tablosu."""
+    if len(qualities):
+        _check_qualities(min(qualities), max(qualities))
+    
+    efs_by_key = list(map(_EfTable().__getitem__, zip(efs, qualities)))
+    new_repetitions = array('i', [
+        0 if quality < 3 else repetition + 1
+        for quality, repetition in zip(qualities, repetitions)
+    ])
+    new_intervals = array('q', [
+        1 if quality < 3 or repetition == 1 else 6 if repetition == 2 else round(interval * ef[0])
+        for quality, repetition, interval, ef in zip(qualities, new_repetitions, intervals, efs_by_key)
+    ])
+    new_efs = array('d', map(itemgetter(1), efs_by_key))
+    return new_repetitions, new_efs, new_intervals
+
+
+def _calculate_numpy(qualities, repetitions, efs, intervals) -> tuple[array, array, array]:
+    """NumPy yolu. 2 haneye yuvarlama benzersiz EF değerleri üzerinde round() ile yapılır."""
+    qualities = np.asarray(qualities, dtype=np.int64)
+    repetitions = np.asarray(repetitions, dtype=np.int64)
+    efs = np.asarray(efs, dtype=np.float64)
+    intervals = np.asarray(intervals, dtype=np.int64)
+    if len(qualities):
+        _check_qualities(qualities.min(), qualities.max())
+    
+    new_efs = efs + np.asarray(EF_DELTAS)[qualities]
+    new_efs = np.where(new_efs < MIN_EF, MIN_EF, new_efs)
+    
+    new_repetitions = np.where(qualities < 3, 0, repetitions + 1)
+    grown = np.rint(intervals * new_efs).astype(np.int64)
+    new_intervals = np.where((qualities < 3) | (new_repetitions == 1), 1, np.where(new_repetitions == 2, 6, grown))
+    
+    unique_efs, positions = np.unique(new_efs, return_inverse=True)
+    rounded = np.array([round(ef, 2) for ef in unique_efs.tolist()], dtype=np.float64)
+    
+    return (
+        array('i', new_repetitions.astype(np.int32).tobytes()),
+        array('d', rounded[positions.reshape(-1)].tobytes()),
+        array('q', new_intervals.astype(np.int64).tobytes())
+    )
+
+
+def calculate_sm2_batch(qualities, repetitions, efs, intervals, use_numpy: bool = None) -> tuple[array, array, array]:
+    """
+    calculate_sm2'yi eşit uzunluktaki sütunların her satırı için hesaplar.
+    
+    Args:
+        qualities: 0-5 arası kalite puanları
+        repetitions: Mevcut tekrar sayıları
+        efs: Mevcut Easiness Factor değerleri
+        intervals: Mevcut interval'ler (gün)
+        use_numpy: None ise NumPy kuruluysa kullanılır; False ise her zaman saf Python
+    
+    Returns:
+        tuple: (yeni tekrar sayıları array('i'), yeni ef'ler array('d'), yeni interval'ler array('q'))
+    
+    Raises:
+        ValueError: Sütun uzunlukları farklıysa veya kalite puanı 0-5 dışındaysa
+        RuntimeError: use_numpy=True verildiği halde NumPy kurulu değilse
+    """
+    if not len(qualities) == len(repetitions) == len(efs) == len(intervals):
+        raise ValueError("Sütun uzunlukları aynı olmalıdır.")
+    
+    if use_numpy and np is None:
+        raise RuntimeError("NumPy kurulu değil.")
+    if use_numpy is None:
+        use_numpy = np is not None
+    
+    if use_numpy:
+        return _calculate_numpy(qualities, repetitions, efs, intervals)
+    return _calculate_python(qualities, repetitions, efs, intervals)
+
+
+def _sample(count: int, seed: int = 0) -> tuple[array, array, array, array]:
+    """Karşılaştırma için rastgele (quality, repetition, ef, interval) sütunları üretir."""
+    rng = random.Random(seed)
+    return (
+        array('b', [rng.randrange(6) for _ in range(count)]),
+        array('i', [rng.randrange(10) for _ in range(count)]),
+        array('d', [round(rng.uniform(MIN_EF, 3.0), 2) for _ in range(count)]),
+        array('i', [rng.randrange(1, 365) for _ in range(count)])
+    )
+
+
+def main(argv: list) -> int:
+    """
+    Komut satırı girişi.
+    
+    Kullanım:
+        python sm2_batch.py bench [kart sayısı]
+    """
+    if argv[1:2] != ['bench'] or not all(arg.isdigit() for arg in argv[2:3]):
+        print("Kullanım: python sm2_batch.py bench [kart sayısı]")
+        return 1
+    
+    from review_service import calculate_sm2
+    
+    count = int(argv[2]) if len(argv) > 2 else 1_000_000
+    columns = _sample(count)
+    
+    start = time.perf_counter()
+    expected = [calculate_sm2(*row) for row in zip(*columns)]
+    print(f"calculate_sm2 (tek tek): {time.perf_counter() - start:.3f} sn ({count} kart)")
+    
+    paths = [('saf Python', False)] + ([('NumPy', True)] if np is not None else [])
+    for name, use_numpy in paths:
+        start = time.perf_counter()
+        result = calculate_sm2_batch(*columns, use_numpy=use_numpy)
+        elapsed = time.perf_counter() - start
+        same = list(zip(*result)) == expected
+        print(f"calculate_sm2_batch ({name}): {elapsed:.3f} sn, sonuçlar {'aynı' if same else 'FARKLI'}")
+    if np is None:
+        print("NumPy kurulu değil; NumPy yolu atlandı.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,655 @@
+"""
+sqlite_storage.py - SQLite Depolama Arka Ucu
+
+storage.py ile aynı fonksiyon yüzeyini (load_json, find_by_id, insert, ...)
+tek bir sqlite3 veritabanı üzerinde sunar. storage.set_backend('sqlite')
+ile etkinleştirilir; servis modülleri değişmeden çalışır.
+
+Her koleksiyon ayrı bir tablodur: kayıt JSON olarak 'data' sütununda,
+'id' ayrıca indeksli bir sütunda tutulur. storage.INDEXES içindeki alanlar
+için json_extract ifade indeksleri oluşturulur.
+
+Mevcut JSON verisini aktarmak için:
+    python sqlite_storage.py migrate
+"""
+
+import json
+import re
+import sqlite3
+import sys
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+import storage
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = 'studybuddy.db'
+
+_connections = {}
+_sql_cache = {}
+_transaction_depth = 0
+
+_FIELD_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def get_db_path():
+    """
+    Veritabanı dosyasının yolunu döndürür (storage.DATA_DIR altında).
+    
+    Returns:
+        Path: Veritabanı yolu
+    """
+    return storage.DATA_DIR / DB_FILE
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Veritabanı bağlantısını döndürür, ilk çağrıda açar ve şemayı oluşturur.
+    Bağlantı WAL modunda açılır: okuyucular yazarı beklemez.
+    
+    Returns:
+        sqlite3.Connection: Bağlantı
+    """
+    storage.ensure_data_dir()
+    db_path = get_db_path()
+    
+    conn = _connections.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, cached_statements=256)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        _create_schema(conn)
+        _connections[db_path] = conn
+        logger.info(f"SQLite veritabanı açıldı: {db_path}")
+    return conn
+
+
+def close():
+    """Açık tüm bağlantıları kapatır."""
+    for conn in _connections.values():
+        conn.close()
+    _connections.clear()
+
+
+@contextmanager
+def transaction():
+    """
+    storage.transaction() karşılığı: blok içindeki tüm yazmalar tek bir
+    SQLite transaction'ında commit edilir, hata olursa geri alınır.
+    İç içe çağrılar dıştaki transaction'a katılır.
+    """
+    global _transaction_depth
+    
+    conn = get_connection()
+    _transaction_depth += 1
+    try:
+        if _transaction_depth == 1:
+            with conn:
+                yield
+        else:
+            yield
+    finally:
+        _transaction_depth -= 1
+
+
+@contextmanager
+def _writing(conn: sqlite3.Connection):
+    """Açık transaction yoksa yazmayı kendi transaction'ında commit eder."""
+    if _transaction_depth:
+        yield
+    else:
+        with conn:
+            yield
+
+
+def _check_field(field: str) -> str:
+    """Alan adının SQL ifadesine güvenle yazılabileceğini doğrular."""
+    if not _FIELD_PATTERN.match(field):
+        raise ValueError(f"Geçersiz alan adı: {field}")
+    return field
+
+
+def _create_schema(conn: sqlite3.Connection):
+    """
+    Koleksiyon tablolarını ve indekslerini oluşturur (varsa dokunmaz).
+    
+    Args:
+        conn: Veritabanı bağlantısı
+    """
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, next_id INTEGER NOT NULL)"
+        )
+        for collection_name in storage.FILES:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {collection_name} ("
+                f"id INTEGER, data TEXT NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{collection_name}_id ON {collection_name}(id)"
+            )
+            for field in storage.INDEXES.get(collection_name, []):
+                _check_field(field)
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{collection_name}_{field} "
+                    f"ON {collection_name}(json_extract(data, '$.{field}'))"
+                )
+
+
+def _sql(kind: str, collection_name: str, field: str = None) -> str:
+    """
+    Sorgu metnini üretir ve saklar. Aynı metin tekrar kullanıldığı için
+    sqlite3'ün hazır ifade önbelleği (cached_statements) devreye girer.
+    
+    Args:
+        kind: Sorgu türü
+        collection_name: Koleksiyon adı
+        field: Alan adı (alan sorguları için)
+    
+    Returns:
+        str: SQL metni
+    """
+    key = (kind, collection_name, field)
+    sql = _sql_cache.get(key)
+    if sql is not None:
+        return sql
+    
+    storage.get_file_path(collection_name)
+    if field == 'id':
+        column = 'id'
+    elif field is not None:
+        column = f"json_extract(data, '$.{_check_field(field)}')"
+    
+    templates = {
+        'all': f"SELECT data FROM {collection_name} ORDER BY rowid",
+        'all_rows': f"SELECT rowid, data FROM {collection_name} ORDER BY rowid",
+        'by_id': f"SELECT rowid, data FROM {collection_name} WHERE id = ? ORDER BY rowid LIMIT 1",
+        'max_id': f"SELECT COALESCE(MAX(id), 0) FROM {collection_name}",
+        'insert': f"INSERT INTO {collection_name} (id, data) VALUES (?, ?)",
+        'update': f"UPDATE {collection_name} SET data = ? WHERE rowid = ?",
+        'delete_id': f"DELETE FROM {collection_name} WHERE id = ?",
+        'delete_rowid': f"DELETE FROM {collection_name} WHERE rowid = ?",
+        'clear': f"DELETE FROM {collection_name}",
+    }
+    if field is not None:
+        templates['first_by_field'] = (
+            f"SELECT data FROM {collection_name} WHERE {column} IS ? ORDER BY rowid LIMIT 1"
+        )
+        templates['all_by_field'] = (
+            f"SELECT data FROM {collection_name} WHERE {column} IS ? ORDER BY rowid"
+        )
+        templates['delete_by_field'] = f"DELETE FROM {collection_name} WHERE {column} IS ?"
+    
+    sql = templates[kind]
+    _sql_cache[key] = sql
+    return sql
+
+
+def _encode(item: dict) -> str:
+    """Kaydı 'data' sütunu için JSON metnine çevirir."""
+    return json.dumps(item, ensure_ascii=False, default=str)
+
+
+def _decode(data: str) -> dict:
+    """'data' sütununu salt okunur kayda çevirir."""
+    return storage.ReadOnlyRecord(json.loads(data))
+
+
+def _bindable(value) -> bool:
+    """Değerin SQL parametresi olarak json_extract sonucu ile karşılaştırılabilir olup olmadığı."""
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+def load_json(collection_name: str) -> list:
+    """
+    Koleksiyonun tüm kayıtlarını eklenme sırasıyla döndürür.
+    
+    Args:
+        collection_name: Koleksiyon adı
+    
+    Returns:
+        list: Veri listesi
+    """
+    rows = get_connection().execute(_sql('all', collection_name))
+    return [_decode(data) for (data,) in rows]
+
+
+def iter_collection(collection_name: str, fields: list = None, where=None, since: str = None, until: str = None):
+    """
+    Koleksiyonun kayıtlarını imleç üzerinden sırayla döndürür (generator);
+    sonuç kümesi belleğe alınmaz.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        fields: Sadece bu alanları içeren kayıtlar döndürülür (None ise tüm alanlar)
+        where: Kayıt için True dönen filtre fonksiyonu
+        since: Zaman aralığının başı, dahil (bkz. storage.SEGMENTS)
+        until: Zaman aralığının sonu, hariç
+    
+    Yields:
+        dict: Kayıt (salt okunur)
+    """
+    if since is not None or until is not None:
+        where = storage._range_filter(collection_name, since, until, where)
+    
+    for (data,) in get_connection().execute(_sql('all', collection_name)):
+        item = json.loads(data)
+        if where is not None and not where(item):
+            continue
+        if fields is not None:
+            item = {field: item[field] for field in fields if field in item}
+        yield storage.ReadOnlyRecord(item)
+
+
+def get_collection_signature(collection_name: str) -> tuple:
+    """
+    Veritabanının değişip değişmediğini anlamak için imza döndürür.
+    data_version başka bağlantıların, total_changes bu bağlantının yazmalarıyla
+    değişir. İmza koleksiyon bazında değil, tüm veritabanı içindir.
+    
+    Args:
+        collection_name: Koleksiyon adı
+    
+    Returns:
+        tuple: (veritabanı yolu, data_version, total_changes)
+    """
+    conn = get_connection()
+    (data_version,) = conn.execute('PRAGMA data_version').fetchone()
+    return str(get_db_path()), data_version, conn.total_changes
+
+
+def save_json(collection_name: str, data: list) -> bool:
+    """
+    Koleksiyonun içeriğini verilen liste ile tek transaction'da değiştirir.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        data: Kaydedilecek veri listesi
+    
+    Returns:
+        bool: Başarılı ise True
+    """
+    conn = get_connection()
+    try:
+        with _writing(conn):
+            conn.execute(_sql('clear', collection_name))
+            conn.executemany(
+                _sql('insert', collection_name),
+                ((item.get('id'), _encode(item)) for item in data)
+            )
+        logger.info(f"{collection_name} kaydedildi: {len(data)} kayıt")
+        return True
+    except sqlite3.Error as e:
+        logger.error(f"Kaydetme hatası ({collection_name}): {e}")
+        return False
+
+
+def reserve_ids(collection_name: str, count: int = 1) -> range:
+    """
+    Koleksiyon için ardışık count adet ID ayırır.
+    Dizi 'sequences' tablosunda tutulur ve ayırma ile aynı transaction'da güncellenir;
+    silinen kayıtların ID'leri tekrar verilmez.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        count: Ayrılacak ID sayısı
+    
+    Returns:
+        range: Ayrılan ID'ler
+    """
+    conn = get_connection()
+    with _writing(conn):
+        row = conn.execute(
+            "SELECT next_id FROM sequences WHERE name = ?", (collection_name,)
+        ).fetchone()
+        if row is None:
+            (max_id,) = conn.execute(_sql('max_id', collection_name)).fetchone()
+            next_id = max_id + 1
+        else:
+            next_id = row[0]
+        
+        conn.execute(
+            "INSERT OR REPLACE INTO sequences (name, next_id) VALUES (?, ?)",
+            (collection_name, next_id + count)
+        )
+    return range(next_id, next_id + count)
+
+
+def get_next_id(collection_name: str) -> int:
+    """
+    Koleksiyon için bir sonraki ID'yi ayırır ve döndürür.
+    
+    Args:
+        collection_name: Koleksiyon adı
+    
+    Returns:
+        int: Sonraki ID
+    """
+    return reserve_ids(collection_name).start
+
+
+def find_by_id(collection_name: str, item_id: int) -> dict | None:
+    """
+    ID'ye göre kayıt bulur.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        item_id: Aranacak ID
+    
+    Returns:
+        dict | None: Bulunan kayıt veya None
+    """
+    if not _bindable(item_id):
+        return None
+    row = get_connection().execute(_sql('by_id', collection_name), (item_id,)).fetchone()
+    return _decode(row[1]) if row else None
+
+
+def find_by_field(collection_name: str, field: str, value) -> dict | None:
+    """
+    Belirli bir alana göre ilk kaydı bulur.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        field: Alan adı
+        value: Aranacak değer
+    
+    Returns:
+        dict | None: Bulunan ilk kayıt veya None
+    """
+    if not _bindable(value):
+        return next((item for item in load_json(collection_name) if item.get(field) == value), None)
+    
+    row = get_connection().execute(
+        _sql('first_by_field', collection_name, field), (value,)
+    ).fetchone()
+    return _decode(row[0]) if row else None
+
+
+def find_all_by_field(collection_name: str, field: str, value) -> list:
+    """
+    Belirli bir alana göre tüm kayıtları bulur.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        field: Alan adı
+        value: Aranacak değer
+    
+    Returns:
+        list: Bulunan kayıtlar
+    """
+    if not _bindable(value):
+        return [item for item in load_json(collection_name) if item.get(field) == value]
+    
+    rows = get_connection().execute(_sql('all_by_field', collection_name, field), (value,))
+    return [_decode(data) for (data,) in rows]
+
+
+def insert(collection_name: str, item: dict) -> dict:
+    """
+    Yeni kayıt ekler.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        item: Eklenecek kayıt (id otomatik atanır)
+    
+    Returns:
+        dict: Eklenen kayıt (id ile birlikte)
+    """
+    conn = get_connection()
+    with _writing(conn):
+        if 'id' not in item:
+            item['id'] = get_next_id(collection_name)
+        
+        if 'created_at' not in item:
+            item['created_at'] = datetime.now().isoformat()
+        
+        conn.execute(_sql('insert', collection_name), (item['id'], _encode(item)))
+    
+    logger.info(f"Yeni kayıt eklendi: {collection_name} #{item['id']}")
+    return item
+
+
+def insert_many(collection_name: str, items: list) -> list:
+    """
+    Birden fazla kaydı tek transaction'da ekler.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        items: Eklenecek kayıtlar (id otomatik atanır)
+    
+    Returns:
+        list: Eklenen kayıtlar (id ile birlikte)
+    """
+    if not items:
+        return []
+    
+    conn = get_connection()
+    now = datetime.now().isoformat()
+    with _writing(conn):
+        missing = sum(1 for item in items if 'id' not in item)
+        new_ids = iter(reserve_ids(collection_name, missing)) if missing else iter(())
+        for item in items:
+            if 'id' not in item:
+                item['id'] = next(new_ids)
+            if 'created_at' not in item:
+                item['created_at'] = now
+        
+        conn.executemany(
+            _sql('insert', collection_name),
+            ((item['id'], _encode(item)) for item in items)
+        )
+    
+    logger.info(f"{len(items)} kayıt eklendi: {collection_name}")
+    return items
+
+
+def update(collection_name: str, item_id: int, updates: dict) -> dict | None:
+    """
+    Mevcut kaydı günceller.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        item_id: Güncellenecek kayıt ID'si
+        updates: Güncellenecek alanlar
+    
+    Returns:
+        dict | None: Güncellenen kayıt veya None
+    """
+    conn = get_connection()
+    with _writing(conn):
+        row = conn.execute(_sql('by_id', collection_name), (item_id,)).fetchone() \
+            if _bindable(item_id) else None
+        
+        if row is None:
+            logger.warning(f"Güncellenecek kayıt bulunamadı: {collection_name} #{item_id}")
+            return None
+        
+        rowid, data = row
+        item = {**json.loads(data), **updates, 'updated_at': datetime.now().isoformat()}
+        conn.execute(_sql('update', collection_name), (_encode(item), rowid))
+    
+    logger.info(f"Kayıt güncellendi: {collection_name} #{item_id}")
+    return storage.ReadOnlyRecord(item)
+
+
+def update_many(collection_name: str, updates_by_id: dict) -> list:
+    """
+    Birden fazla kaydı tek transaction'da günceller.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        updates_by_id: {kayıt ID'si: güncellenecek alanlar}
+    
+    Returns:
+        list: Güncellenen kayıtlar (bulunamayan ID'ler atlanır)
+    """
+    conn = get_connection()
+    now = datetime.now().isoformat()
+    updated = []
+    rows = []
+    
+    with _writing(conn):
+        for item_id, updates in updates_by_id.items():
+            row = conn.execute(_sql('by_id', collection_name), (item_id,)).fetchone() \
+                if _bindable(item_id) else None
+            if row is None:
+                logger.warning(f"Güncellenecek kayıt bulunamadı: {collection_name} #{item_id}")
+                continue
+            
+            rowid, data = row
+            item = {**json.loads(data), **updates, 'updated_at': now}
+            rows.append((_encode(item), rowid))
+            updated.append(storage.ReadOnlyRecord(item))
+        
+        conn.executemany(_sql('update', collection_name), rows)
+    
+    if updated:
+        logger.info(f"{len(updated)} kayıt güncellendi: {collection_name}")
+    return updated
+
+
+def delete(collection_name: str, item_id: int) -> bool:
+    """
+    Kaydı siler.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        item_id: Silinecek kayıt ID'si
+    
+    Returns:
+        bool: Başarılı ise True
+    """
+    if not _bindable(item_id):
+        return False
+    
+    conn = get_connection()
+    with _writing(conn):
+        deleted = conn.execute(_sql('delete_id', collection_name), (item_id,)).rowcount
+    
+    if deleted:
+        logger.info(f"Kayıt silindi: {collection_name} #{item_id}")
+        return True
+    
+    logger.warning(f"Silinecek kayıt bulunamadı: {collection_name} #{item_id}")
+    return False
+
+
+def delete_by_field(collection_name: str, field: str, value) -> int:
+    """
+    Belirli bir alana göre tüm kayıtları siler.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        field: Alan adı
+        value: Silinecek değer
+    
+    Returns:
+        int: Silinen kayıt sayısı
+    """
+    if not _bindable(value):
+        data = load_json(collection_name)
+        kept = [item for item in data if item.get(field) != value]
+        if len(kept) < len(data):
+            save_json(collection_name, kept)
+        return len(data) - len(kept)
+    
+    conn = get_connection()
+    with _writing(conn):
+        deleted_count = conn.execute(
+            _sql('delete_by_field', collection_name, field), (value,)
+        ).rowcount
+    
+    if deleted_count > 0:
+        logger.info(f"{deleted_count} kayıt silindi: {collection_name} ({field}={value})")
+    
+    return deleted_count
+
+
+def delete_where(collection_name: str, predicate=None, field: str = None, values=None) -> int:
+    """
+    Koşula uyan tüm kayıtları tek transaction'da siler.
+    Koşul fonksiyon (predicate) veya alan ve değer kümesi (field, values) olabilir.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        predicate: Silinecek kayıtlar için True dönen fonksiyon
+        field: Alan adı (values ile birlikte)
+        values: Silinecek alan değerleri
+    
+    Returns:
+        int: Silinen kayıt sayısı
+    """
+    if (predicate is None) == (field is None):
+        raise ValueError("delete_where için predicate veya field/values verilmelidir.")
+    
+    if field is not None:
+        values = set(values)
+        if not all(_bindable(value) for value in values):
+            predicate = lambda item: item.get(field) in values
+    
+    conn = get_connection()
+    with _writing(conn):
+        if predicate is None:
+            sql = _sql('delete_id', collection_name) if field == 'id' \
+                else _sql('delete_by_field', collection_name, field)
+            deleted_count = conn.executemany(sql, ((value,) for value in values)).rowcount
+        else:
+            rowids = [
+                (rowid,) for rowid, data in conn.execute(_sql('all_rows', collection_name))
+                if predicate(_decode(data))
+            ]
+            deleted_count = conn.executemany(_sql('delete_rowid', collection_name), rowids).rowcount
+    
+    if deleted_count > 0:
+        logger.info(f"{deleted_count} kayıt silindi: {collection_name}")
+    
+    return deleted_count
+
+
+def migrate_from_json() -> dict:
+    """
+    data/ altındaki JSON koleksiyonlarını (journal, kullanıcı shard'ları ve
+    zaman segmentleri dahil) veritabanına aktarır. Veritabanındaki mevcut
+    içerik koleksiyon bazında değiştirilir.
+    
+    Returns:
+        dict: Koleksiyon -> aktarılan kayıt sayısı
+    """
+    backend = storage.get_backend()
+    storage.set_backend('json')
+    try:
+        collections = {collection_name: storage.load_json(collection_name) for collection_name in storage.FILES}
+    finally:
+        storage.set_backend(backend)
+    
+    counts = {}
+    for collection_name, items in collections.items():
+        if not save_json(collection_name, items):
+            raise RuntimeError(f"Aktarım başarısız: {collection_name}")
+        counts[collection_name] = len(items)
+        logger.info(f"SQLite'a aktarıldı: {collection_name} ({len(items)} kayıt)")
+    return counts
+
+
+def main(argv: list) -> int:
+    """
+    Komut satırı girişi.
+    
+    Kullanım: python sqlite_storage.py migrate
+    """
+    if argv[1:] != ['migrate']:
+        print("Kullanım: python sqlite_storage.py migrate")
+        return 1
+    
+    counts = migrate_from_json()
+    for collection_name, count in counts.items():
+        print(f"✅ {collection_name}: {count} kayıt aktarıldı")
+    print(f"Veritabanı: {get_db_path()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
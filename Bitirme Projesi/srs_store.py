@@ -0,0 +1,448 @@
+"""
+srs_store.py - Sütun Bazlı SRS Durum Deposu
+
+srs_state kayıtlarını satır başına bir dict yerine alan başına bir stdlib
+array (sütun) olarak tutar. Alan adları her satırda tekrarlanmadığı için
+bellek kullanımı birkaç kat azalır; due taraması ve deck istatistikleri
+bitişik tipli diziler üzerinde çalışır.
+
+Satırlar user_id'ye göre sıralanır; her kullanıcının satırları tek bir
+aralıktır ve kullanıcı bazlı taramalar sadece o aralığın dilimlerini okur.
+
+get_store(user_id) kullanıcı başına bir depo tutar; depo kullanıcının
+kayıtlarından (user_id indeksiyle) ilk erişimde kurulur. srs_state
+yazmaları storage dinleyicisiyle izlenir: güncellenen ve eklenen kayıtlar
+önbellekteki depoya yerinde yazılır, silmeler sadece ilgili kullanıcının
+deposunu atar. Başka bir süreç koleksiyonu değiştirdiyse (imza uyuşmazsa)
+tüm depolar atılır. Depo salt okunurdur; yazmalar her zamanki gibi storage
+üzerinden yapılır.
+
+Kullanım:
+    store = get_store(user_id)
+    due = store.due_rows(user_id, get_today_ordinal())
+    due[0]['due_date']   # dict gibi okunur
+"""
+
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from itertools import compress
+
+import storage
+from utils import date_to_ordinal, ordinal_to_date
+
+COLLECTION = 'srs_state'
+
+# Sütunlar: alan -> (array tipi, kayıtta alan yoksa kullanılan değer)
+COLUMNS = {
+    'id': ('i', 0),
+    'card_id': ('i', 0),
+    'user_id': ('i', 0),
+    'due_date': ('i', 0),          # gün numarası (date.toordinal), 0: tarih yok
+    'ef': ('d', 2.5),
+    'interval_days': ('i', 1),
+    'repetition': ('h', 0),
+    'last_quality': ('b', -1),     # -1: henüz çalışılmadı (None)
+    'last_reviewed': ('q', 0)      # gün numarası * gün başına mikrosaniye + gün içi mikrosaniye, 0: yok
+}
+NO_DATE = 0
+NO_QUALITY = -1
+NO_TIME = 0
+MICROS_PER_DAY = 86_400_000_000
+
+_state = {
+    'signature': None,    # JSON: {bölüm adı: imza}, SQLite: imza; None ise depolar geçersiz
+    'stores': {},         # user_id -> SRSStore
+    'owners': {}          # srs id -> user_id (önbellekteki depolar için)
+}
+
+
+def _pack_time(value) -> int | None:
+    """
+    ISO tarih/saati gün numarası tabanlı mikrosaniyeye çevirir. Değer
+    birebir geri üretilemiyorsa (saat dilimi, farklı biçim) None döner.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None or moment.isoformat() != value:
+        return None
+    seconds = moment.hour * 3600 + moment.minute * 60 + moment.second
+    return moment.toordinal() * MICROS_PER_DAY + seconds * 1_000_000 + moment.microsecond
+
+
+def _unpack_time(value: int) -> str:
+    """_pack_time değerini ISO tarih/saate geri çevirir."""
+    day, micros = divmod(value, MICROS_PER_DAY)
+    return (datetime.fromordinal(day) + timedelta(microseconds=micros)).isoformat()
+
+
+class SRSRow(Mapping):
+    """
+    Depodaki tek bir satırın salt okunur, dict uyumlu görünümü.
+    Alanlar okunurken kayıttaki biçime çevrilir (due_date -> 'YYYY-AA-GG').
+    """
+    
+    __slots__ = ('_store', '_row')
+    
+    def __init__(self, store: 'SRSStore', row: int):
+        self._store = store
+        self._row = row
+    
+    def __getitem__(self, key):
+        return self._store.value(self._row, key)
+    
+    def __iter__(self):
+        return iter(self._store.keys(self._row))
+    
+    def __len__(self):
+        return len(self._store.keys(self._row))
+    
+    def __repr__(self):
+        return f"SRSRow({dict(self)!r})"
+    
+    def copy(self) -> dict:
+        """Satırın değiştirilebilir dict kopyasını döndürür."""
+        return dict(self)
+
+
+def _encode(record: dict) -> tuple[list, dict | None]:
+    """
+    Kaydı sütun değerlerine çevirir.
+    
+    Returns:
+        tuple: (COLUMNS sırasıyla değerler, sütunlara sığmayan alanlar veya None)
+    """
+    extra = {key: value for key, value in record.items() if key not in COLUMNS}
+    values = []
+    for field, (_, default) in COLUMNS.items():
+        value = record.get(field, default)
+        if field == 'due_date':
+            value = date_to_ordinal(value) or NO_DATE
+        elif field == 'last_reviewed' and value != NO_TIME and value is not None:
+            packed = _pack_time(value)
+            if packed is None:
+                extra[field] = value
+            value = packed
+        if value is None:
+            value = default
+        values.append(value)
+    return values, extra or None
+
+
+class SRSStore:
+    """
+    srs_state kayıtlarının sütun bazlı kopyası.
+    
+    Args:
+        records: srs_state kayıtları (herhangi bir sırada)
+    
+    Raises:
+        OverflowError: Bir değer sütun tipine sığmazsa (ör. int32 dışı ID)
+        TypeError: Sayısal alanlarda sayı olmayan değer varsa
+    """
+    
+    def __init__(self, records=()):
+        columns = {field: array(code) for field, (code, _) in COLUMNS.items()}
+        extras = []
+        
+        for record in records:
+            values, extra = _encode(record)
+            for field, value in zip(COLUMNS, values):
+                columns[field].append(value)
+            extras.append(extra)
+        
+        order = sorted(range(len(columns['id'])), key=columns['user_id'].__getitem__)
+        for field, (code, _) in COLUMNS.items():
+            column = columns[field]
+            setattr(self, field, array(code, [column[row] for row in order]))
+        self.extras = {row: extras[old] for row, old in enumerate(order) if extras[old] is not None}
+        
+        self._users = {}
+        for row, user_id in enumerate(self.user_id):
+            start, _ = self._users.get(user_id, (row, row))
+            self._users[user_id] = (start, row + 1)
+        self._cards = None
+        self._rows = None
+    
+    def __len__(self) -> int:
+        return len(self.id)
+    
+    def keys(self, row: int) -> list:
+        """Satırın kayıttaki alan adları."""
+        keys = [field for field in COLUMNS if field != 'last_reviewed' or self.last_reviewed[row] != NO_TIME]
+        extra = self.extras.get(row)
+        if extra:
+            keys.extend(extra)
+        return keys
+    
+    def value(self, row: int, key: str):
+        """
+        Satırdaki alanın değerini kayıttaki biçimde döndürür.
+        
+        Raises:
+            KeyError: Satırda alan yoksa
+        """
+        if key == 'due_date':
+            ordinal = self.due_date[row]
+            return ordinal_to_date(ordinal) if ordinal != NO_DATE else ''
+        if key == 'last_quality':
+            quality = self.last_quality[row]
+            return None if quality == NO_QUALITY else quality
+        if key == 'last_reviewed' and self.last_reviewed[row] != NO_TIME:
+            return _unpack_time(self.last_reviewed[row])
+        if key in COLUMNS and key != 'last_reviewed':
+            return getattr(self, key)[row]
+        return self.extras.get(row, {})[key]
+    
+    def put(self, record: dict) -> bool:
+        """
+        Kaydı depoya yazar: ID'si depoda varsa satırı yerinde güncellenir,
+        yoksa son kullanıcının satırlarının sonuna eklenir.
+        
+        Args:
+            record: srs_state kaydı
+        
+        Returns:
+            bool: Yazıldıysa True; kayıt satırın kullanıcısını veya kartını
+                  değiştiriyorsa ya da sıralamayı bozacaksa False (depo yeniden kurulmalı)
+        
+        Raises:
+            OverflowError: Bir değer sütun tipine sığmazsa
+            TypeError: Sayısal alanlarda sayı olmayan değer varsa
+        """
+        if self._rows is None:
+            self._rows = {srs_id: row for row, srs_id in enumerate(self.id)}
+        values, extra = _encode(record)
+        user_id = values[2]
+        row = self._rows.get(values[0])
+        
+        if row is None:
+            if len(self) and self.user_id[-1] != user_id:
+                return False
+            row = len(self)
+            for field, value in zip(COLUMNS, values):
+                getattr(self, field).append(value)
+            start, _ = self._users.get(user_id, (row, row))
+            self._users[user_id] = (start, row + 1)
+            self._rows[values[0]] = row
+            if self._cards is not None:
+                self._cards.setdefault((user_id, values[1]), row)
+        elif self.user_id[row] != user_id or self.card_id[row] != values[1]:
+            return False
+        else:
+            for field, value in zip(COLUMNS, values):
+                getattr(self, field)[row] = value
+        
+        if extra:
+            self.extras[row] = extra
+        else:
+            self.extras.pop(row, None)
+        return True
+    
+    def row(self, row: int) -> SRSRow:
+        """Satırın dict uyumlu görünümünü döndürür."""
+        return SRSRow(self, row)
+    
+    def user_range(self, user_id: int) -> tuple[int, int]:
+        """Kullanıcının satırlarının [başlangıç, bitiş) aralığı."""
+        return self._users.get(user_id, (0, 0))
+    
+    def _mask(self, start: int, end: int, card_ids) -> list | None:
+        """Aralıktaki satırlardan card_ids içinde olanlar için seçim maskesi (card_ids None ise None)."""
+        if card_ids is None:
+            return None
+        return [card_id in card_ids for card_id in self.card_id[start:end]]
+    
+    def find(self, user_id: int, card_id: int) -> SRSRow | None:
+        """
+        Kullanıcının karta ait satırını bulur.
+        
+        Returns:
+            SRSRow | None: Satır veya None
+        """
+        if self._cards is None:
+            self._cards = {}
+            for row, key in enumerate(zip(self.user_id, self.card_id)):
+                self._cards.setdefault(key, row)
+        row = self._cards.get((user_id, card_id))
+        return None if row is None else SRSRow(self, row)
+    
+    def due_rows(self, user_id: int, today: int, card_ids=None) -> list:
+        """
+        Kullanıcının due olan satırları.
+        
+        Args:
+            user_id: Kullanıcı ID
+            today: Bugünün gün numarası (date.toordinal)
+            card_ids: Verilirse sadece bu kartlar (set)
+        
+        Returns:
+            list: SRSRow listesi, depo sırasıyla
+        """
+        start, end = self.user_range(user_id)
+        mask = self._mask(start, end, card_ids)
+        rows = range(start, end) if mask is None else compress(range(start, end), mask)
+        due_date = self.due_date
+        return [SRSRow(self, row) for row in rows if due_date[row] <= today]
+    
+    def count_due(self, user_id: int, today: int, card_ids=None) -> int:
+        """Kullanıcının due olan satır sayısı (bkz. due_rows)."""
+        start, end = self.user_range(user_id)
+        due_dates = self.due_date[start:end]
+        mask = self._mask(start, end, card_ids)
+        if mask is not None:
+            due_dates = compress(due_dates, mask)
+        return sum(1 for due in due_dates if due <= today)
+    
+    def ef_values(self, user_id: int, card_ids=None) -> array:
+        """
+        Kullanıcının satırlarının ef değerleri.
+        
+        Args:
+            user_id: Kullanıcı ID
+            card_ids: Verilirse sadece bu kartlar (set)
+        
+        Returns:
+            array: ef dizisi array('d')
+        """
+        start, end = self.user_range(user_id)
+        values = self.ef[start:end]
+        mask = self._mask(start, end, card_ids)
+        if mask is not None:
+            values = array('d', compress(values, mask))
+        return values
+    
+    def deck_groups(self, user_id: int, today: int, card_decks: dict) -> dict:
+        """
+        Kullanıcının satırlarını kartların deck'lerine göre tek geçişte gruplar.
+        Her deck için sonuç, count_due ve ef_values'un o deck'in kartlarıyla
+        verdiği sonuçla aynıdır.
+        
+        Args:
+            user_id: Kullanıcı ID
+            today: Bugünün gün numarası
+            card_decks: Kart ID -> deck ID (burada olmayan kartlar atlanır)
+        
+        Returns:
+            dict: deck ID -> [due sayısı, ef dizisi array('d') depo sırasıyla]
+        """
+        start, end = self.user_range(user_id)
+        groups = {}
+        deck_of = card_decks.get
+        
+        for card_id, due, ef in zip(self.card_id[start:end], self.due_date[start:end], self.ef[start:end]):
+            deck_id = deck_of(card_id)
+            if deck_id is None:
+                continue
+            group = groups.get(deck_id)
+            if group is None:
+                group = groups[deck_id] = [0, array('d')]
+            if due <= today:
+                group[0] += 1
+            group[1].append(ef)
+        return groups
+    
+    def last_reviewed_day(self, row: int) -> int | None:
+        """Satırın son çalışıldığı günün numarası (hiç çalışılmadıysa None)."""
+        value = self.last_reviewed[row]
+        return value // MICROS_PER_DAY if value != NO_TIME else None
+    
+    def memory_usage(self) -> int:
+        """Sütun dizilerinin bayt cinsinden boyutu (ek alanlar hariç)."""
+        return sum(getattr(self, field).itemsize * len(self) for field in COLUMNS)
+
+
+def _drop(user_id):
+    """Kullanıcının deposunu atar; sonraki erişimde yeniden kurulur."""
+    store = _state['stores'].pop(user_id, None)
+    if store is not None:
+        for srs_id in store.id:
+            _state['owners'].pop(srs_id, None)
+
+
+def _sync() -> bool:
+    """
+    Depoların koleksiyonla uyumlu olduğunu doğrular, değilse hepsini atar.
+    
+    Returns:
+        bool: Depolar kullanılabilir ise True (açık transaction'da kaydedilmemiş
+              değişiklik varsa False)
+    """
+    signature = storage.get_collection_signature(COLLECTION)
+    if signature is None:
+        return False
+    if storage.get_backend() == 'json':
+        signature = dict(signature)
+    
+    if _state['signature'] != signature:
+        clear()
+        _state['signature'] = signature
+    return True
+
+
+def _on_change(collection_name: str, old_signature, new_signature, ops: list | None):
+    """storage değişiklik dinleyicisi: yazmaları önbellekteki depolara uygular veya depoları atar."""
+    known = _state['signature']
+    if known is None:
+        return
+    if ops is None or not isinstance(known, dict) or known.get(collection_name) != old_signature:
+        clear()
+        return
+    known[collection_name] = new_signature
+    
+    owners = _state['owners']
+    for op, value in ops:
+        if op == 'del':
+            _drop(owners.get(value))
+            continue
+        
+        user_id = value.get('user_id')
+        previous = owners.get(value['id'])
+        if previous is not None and previous != user_id:
+            _drop(previous)
+        store = _state['stores'].get(user_id)
+        if store is None:
+            continue
+        try:
+            written = store.put(value)
+        except (OverflowError, TypeError):
+            written = False
+        if written:
+            owners[value['id']] = user_id
+        else:
+            _drop(user_id)
+
+
+def get_store(user_id: int) -> SRSStore:
+    """
+    Kullanıcının srs_state kayıtlarının güncel sütun bazlı kopyasını döndürür.
+    Kullanıcının kayıtları son kurulumdan beri sadece bu süreçte değiştiyse
+    depo yeniden kurulmaz; yazmalar depoya yerinde uygulanmıştır.
+    
+    Args:
+        user_id: Kullanıcı ID
+    
+    Returns:
+        SRSStore: Depo (sadece bu kullanıcının satırları)
+    """
+    if not _sync():
+        return SRSStore(storage.find_all_by_field(COLLECTION, 'user_id', user_id))
+    
+    store = _state['stores'].get(user_id)
+    if store is None:
+        store = SRSStore(storage.find_all_by_field(COLLECTION, 'user_id', user_id))
+        _state['stores'][user_id] = store
+        _state['owners'].update(dict.fromkeys(store.id, user_id))
+    return store
+
+
+def clear():
+    """Önbellekteki depoları atar."""
+    _state['signature'] = None
+    _state['stores'].clear()
+    _state['owners'].clear()
+
+
+storage.add_listener(COLLECTION, _on_change)
@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 """
 storage.py - Veri Erişim Katmanı
 
@@ -8,11 +7,16 @@ Tüm veri işlemleri bu modül üzerinden gerçekleştirilir.
 
 import json
 import os
+import re
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 import uuid
 import logging
 
+import offset_index
+import serialization
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -30,8 +34,80 @@ FILES = {
     'decks': 'decks.json',
     'cards': 'cards.json',
     'srs_state': 'srs_state.json',
-    'reviews': 'reviews.json'
+    'reviews': 'reviews.json',
+    'review_rollups': 'review_rollups.json'
+}
+
+# Koleksiyon -> ikincil indeks tanımlı alanlar.
+# find_by_field / find_all_by_field / delete_by_field bu alanlarda tarama yapmaz.
+INDEXES = {
+    'users': ['email'],
+    'decks': ['user_id'],
+    'cards': ['deck_id'],
+    'srs_state': ['user_id', 'card_id'],
+    'reviews': ['user_id', 'card_id'],
+    'review_rollups': ['user_id']
+}
+
+# Üst koleksiyon -> [(alt koleksiyon, üst kayda işaret eden alan)].
+# cascade_delete bir kaydı silerken bu ilişkilerdeki alt kayıtları da siler.
+CASCADES = {
+    'users': [('decks', 'user_id'), ('srs_state', 'user_id'), ('reviews', 'user_id'), ('review_rollups', 'user_id')],
+    'decks': [('cards', 'deck_id'), ('review_rollups', 'deck_id')],
+    'cards': [('srs_state', 'card_id'), ('reviews', 'card_id')]
+}
+
+# Kullanıcıya ait koleksiyonlar -> shard anahtarı. Sharding açıkken bu koleksiyonlar
+# data/users/<user_id>/ altında kullanıcı başına ayrı dosyalarda tutulur (bkz. set_sharding).
+# Kartların kullanıcısı, deck_id ile bağlı oldukları deck'in sahibidir.
+SHARD_KEYS = {
+    'decks': 'user_id',
+    'cards': 'deck_id',
+    'srs_state': 'user_id',
+    'reviews': 'user_id',
+    'review_rollups': 'user_id'
+}
+SHARD_DIR = 'users'
+_sharding = False
+
+# Zamana göre bölünen koleksiyonlar -> zaman alanı. Kayıtlar alanın ayına göre
+# <koleksiyon>/<YYYY-AA>.json segmentlerine yazılır; alanı olmayan eski kayıtlar
+# koleksiyonun ana dosyasında kalır. Zaman aralıklı okumalar (iter_collection
+# since/until) sadece aralıkla kesişen segmentleri açar.
+SEGMENTS = {
+    'reviews': 'reviewed_at',
+    'review_rollups': 'day'
 }
+SEGMENT_META_FILE = 'segments.json'
+_SEGMENT_PATTERN = re.compile(r'\d{4}-\d{2}')
+_segment_meta = None   # bölüm adı -> {signature, min, max, count}; bkz. get_segments
+
+_partition_routes = {}     # (koleksiyon, id) -> bölüm adı; find_by_id/update/delete yönlendirmesi
+
+# Yeni oluşturulan dosyaların biçimi. Mevcut dosyalar okundukları biçimde
+# yazılmaya devam eder (bkz. serialization.py, set_codec).
+DEFAULT_CODEC = 'json'
+
+# Journal modundaki koleksiyonlar: yazmalar tüm dosyayı yeniden yazmak yerine
+# <koleksiyon>.journal dosyasına eklenir, eşik aşılınca snapshot'a katlanır.
+JOURNAL_COLLECTIONS = set()
+JOURNAL_MIN_BYTES = 64 * 1024          # Bu boyutun altında compaction yapılmaz
+JOURNAL_MAX_BYTES = 8 * 1024 * 1024    # Bu boyutu aşan journal her durumda katlanır
+JOURNAL_MAX_RATIO = 0.5                # journal / snapshot oranı eşiği
+
+# Etkin depolama arka ucu: None ise JSON dosyaları, aksi halde aynı
+# fonksiyonları sunan modül (bkz. set_backend, sqlite_storage.py)
+_backend = None
+
+# Açık transaction: None veya {'entries': {koleksiyon: girdi}, 'ops': {koleksiyon: ops | None}}
+_transaction = None
+TRANSACTION_FILE = 'transaction.pending'
+
+# Kalıcı ID dizileri: koleksiyon -> dosyaya yazılmış üst sınır (bu sınırın altındaki
+# ID'ler kullanılmış sayılır). Her yazmada SEQUENCE_PREFETCH kadar ID önceden ayrılır.
+SEQUENCE_FILE = 'sequences.json'
+SEQUENCE_PREFETCH = 32
+_sequences = {}
 
 
 def ensure_data_dir():
@@ -48,53 +124,313 @@ def get_file_path(collection_name: str) -> Path:
     """
     Koleksiyon adına göre dosya yolunu döndürür.
     
+    Bölüm adları da çözülür: 'cards@7' -> data/users/7/cards.json,
+    'reviews#2026-10' -> data/reviews/2026-10.json,
+    'reviews@7#2026-10' -> data/users/7/reviews/2026-10.json
+    
     Args:
         collection_name: Koleksiyon adı (users, decks, cards, srs_state, reviews)
     
     Returns:
         Path: Dosya yolu
     """
-    if collection_name not in FILES:
+    base_name, shard, segment = _split_name(collection_name)
+    if base_name not in FILES:
         raise ValueError(f"Bilinmeyen koleksiyon: {collection_name}")
-    return DATA_DIR / FILES[collection_name]
+    
+    directory = DATA_DIR if shard is None else DATA_DIR / SHARD_DIR / shard
+    if segment is None:
+        return directory / FILES[base_name]
+    return directory / base_name / f"{segment}{Path(FILES[base_name]).suffix}"
 
 
-def load_json(collection_name: str) -> list:
+def _split_name(collection_name: str) -> tuple[str, str | None, str | None]:
+    """'reviews@7#2026-10' biçimindeki bölüm adını (koleksiyon, shard, segment) olarak ayırır."""
+    name, _, segment = collection_name.partition('#')
+    base_name, _, shard = name.partition('@')
+    return base_name, shard or None, segment or None
+
+
+def _base_name(collection_name: str) -> str:
+    """Bölüm adından koleksiyon adını döndürür ('reviews@7#2026-10' -> 'reviews')."""
+    return _split_name(collection_name)[0]
+
+
+class ReadOnlyRecord(dict):
     """
-    JSON dosyasını okur ve liste olarak döndürür.
-    Dosya yoksa boş liste döndürür.
+    Önbellekte tutulan kayıtların salt okunur görünümü.
+    
+    dict gibi okunur ve JSON'a yazılabilir; değiştirmek için
+    dict(kayit) veya kayit.copy() ile kopya alınmalıdır.
+    """
+    
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Kayıt salt okunurdur; değiştirmek için dict(kayit) ile kopyalayın.")
+    
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    update = pop = popitem = setdefault = clear = _readonly
+    
+    def __reduce__(self):
+        return (ReadOnlyRecord, (dict(self),))
+
+
+_cache = {}
+_cache_stats = {
+    'hits': 0,
+    'misses': 0
+}
+
+# Koleksiyon -> değişiklik dinleyicileri (bkz. add_listener)
+_listeners = {}
+
+
+def _freeze(item: dict) -> ReadOnlyRecord:
+    """Kaydı salt okunur görünüme çevirir (zaten öyleyse aynen döner)."""
+    if isinstance(item, ReadOnlyRecord):
+        return item
+    return ReadOnlyRecord(item)
+
+
+def _file_signature(file_path: Path) -> tuple | None:
+    """
+    Dosyanın değişip değişmediğini anlamak için (mtime_ns, size, inode) döndürür.
+    Dosya yoksa None döner.
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def get_journal_path(collection_name: str) -> Path:
+    """
+    Koleksiyonun journal dosyasının yolunu döndürür.
     
     Args:
         collection_name: Koleksiyon adı
     
     Returns:
-        list: Veri listesi
+        Path: Journal dosya yolu
+    """
+    return get_file_path(collection_name).with_suffix('.journal')
+
+
+def _collection_signature(file_path: Path) -> tuple | None:
+    """
+    Snapshot ve journal dosyalarının birleşik imzasını döndürür.
+    İkisi de yoksa None döner.
+    """
+    signature = (_file_signature(file_path), _file_signature(file_path.with_suffix('.journal')))
+    if signature == (None, None):
+        return None
+    return signature
+
+
+def _build_entry(signature: tuple | None, items: list, codec: str = None) -> dict:
+    """
+    Kayıt listesinden önbellek girdisi oluşturur.
+    
+    Kayıtlar eklenme sırasını koruyan bir dict içinde 'id' ile anahtarlanır
+    (birincil anahtar indeksi). id'si olmayan veya tekrar eden kayıtlar
+    benzersiz bir object() anahtarıyla saklanır.
+    
+    Args:
+        signature: Dosya imzası
+        items: Kayıt listesi
+        codec: Dosyanın biçimi (None ise DEFAULT_CODEC)
+    
+    Returns:
+        dict: signature, records, has_duplicates, indexes ve codec alanlarını içeren girdi
+    """
+    records = {}
+    has_duplicates = False
+    
+    for item in items:
+        item_id = item.get('id')
+        if isinstance(item_id, (int, str)) and item_id not in records:
+            records[item_id] = _freeze(item)
+        else:
+            has_duplicates = has_duplicates or item_id is not None
+            records[object()] = _freeze(item)
+    
+    return {
+        'signature': signature,
+        'records': records,
+        'has_duplicates': has_duplicates,
+        'indexes': {},
+        'codec': codec or DEFAULT_CODEC
+    }
+
+
+def _get_entry(collection_name: str) -> dict:
+    """
+    Koleksiyonun önbellek girdisini döndürür.
+    Dosya değişmişse (mtime/size/inode) snapshot'ı okur ve journal'ı üzerine uygular.
+    
+    Dönen girdi önbelleğin kendisidir, kayıtları dışarıya kopyalanarak verilmelidir.
+    
+    Args:
+        collection_name: Koleksiyon adı
+    
+    Returns:
+        dict: Önbellek girdisi (bkz. _build_entry)
     """
+    if _transaction is not None and collection_name in _transaction['entries']:
+        return _transaction['entries'][collection_name]
+    
     ensure_data_dir()
     file_path = get_file_path(collection_name)
+    signature = _collection_signature(file_path)
     
-    if not file_path.exists():
+    if signature is None:
+        _cache.pop(file_path, None)
         logger.debug(f"Dosya bulunamadı, boş liste döndürülüyor: {file_path}")
-        return []
+        return _build_entry(None, [])
+    
+    entry = _cache.get(file_path)
+    if entry is not None and entry['signature'] == signature:
+        _cache_stats['hits'] += 1
+        return entry
+    
+    _cache_stats['misses'] += 1
+    data = []
+    codec = None
+    if signature[0] is not None:
+        try:
+            codec, data = serialization.loads(file_path.read_bytes())
+        except ValueError as e:
+            _cache.pop(file_path, None)
+            logger.error(f"Dosya okuma hatası ({file_path}): {e}")
+            return _build_entry(None, [])
+    
+    entry = _build_entry(signature, data, codec)
+    if signature[1] is not None and _replay_journal(file_path.with_suffix('.journal'), entry):
+        entry['signature'] = _collection_signature(file_path)
+    
+    _cache[file_path] = entry
+    logger.debug(f"{collection_name} yüklendi: {len(entry['records'])} kayıt")
+    return entry
+
+
+def _replay_journal(journal_path: Path, entry: dict) -> bool:
+    """
+    Journal kayıtlarını önbellek girdisine sırayla uygular.
+    
+    Her satır {"ops": [["put", kayıt] | ["del", id], ...]} biçiminde, tek seferde
+    eklenmiş bir işlem grubudur. Yarım kalmış son satır (çökme sırasında kesilmiş
+    yazma) yok sayılır ve dosyadan kırpılır; böylece grup ya tamamen uygulanır ya hiç.
+    
+    Args:
+        journal_path: Journal dosya yolu
+        entry: Üzerine uygulanacak önbellek girdisi
+    
+    Returns:
+        bool: Journal kırpıldıysa True
+    """
+    records = entry['records']
+    good_offset = 0
+    
+    with open(journal_path, 'rb') as f:
+        content = f.read()
+    
+    for line in content.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break
+        good_offset += len(line)
+        try:
+            ops = [(op, value) for op, value in json.loads(line)['ops']]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Bozuk journal satırı atlandı ({journal_path}): {e}")
+            continue
+        
+        for op, value in ops:
+            if op == 'put':
+                records[value['id']] = _freeze(value)
+            elif op == 'del':
+                records.pop(value, None)
+    
+    if good_offset < len(content):
+        logger.warning(f"Yarım kalmış journal kaydı kırpıldı: {journal_path}")
+        os.truncate(journal_path, good_offset)
+        return True
+    return False
+
+
+def _dump_snapshot(path: Path, records: dict, codec: str) -> list | None:
+    """
+    Kayıtları verilen biçimde snapshot olarak dosyaya yazar.
+    
+    Returns:
+        list | None: Konum indeksi için (id, offset, uzunluk) listesi (biçim desteklemiyorsa None)
+    """
+    items = list(records.values())
+    content, offsets = serialization.dumps_indexed(items, codec)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    
+    if offsets is None:
+        return None
+    return [(item.get('id'), offset, length) for item, (offset, length) in zip(items, offsets)]
+
+
+def get_index_path(collection_name: str) -> Path:
+    """
+    Koleksiyonun konum indeksi (id -> dosyadaki yer) dosya yolunu döndürür.
+    
+    Args:
+        collection_name: Koleksiyon adı
     
+    Returns:
+        Path: İndeks dosya yolu (ör. reviews.idx)
+    """
+    return get_file_path(collection_name).with_suffix('.idx')
+
+
+def _write_offset_index(collection_name: str, codec: str, entries: list | None):
+    """
+    Yeni yazılmış snapshot için konum indeksini yazar.
+    İndeks sadece hızlandırma amaçlıdır; yazılamazsa hata verilmez.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            logger.debug(f"{collection_name} yüklendi: {len(data)} kayıt")
-            return data
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON okuma hatası ({file_path}): {e}")
-        return []
+        offset_index.write(get_index_path(collection_name), get_file_path(collection_name), codec, entries or [])
+    except OSError as e:
+        logger.warning(f"Konum indeksi yazılamadı ({collection_name}): {e}")
 
 
-def save_json(collection_name: str, data: list) -> bool:
+def append_line(journal_path: Path, line: str):
     """
-    Veriyi JSON dosyasına atomic write ile kaydeder.
-    Önce geçici dosyaya yazar, sonra asıl dosyanın üstüne geçer.
+    Dosyaya tek satır ekler ve diske indirir (fsync). Koleksiyon journal'ları
+    dışında servislerin kendi journal dosyaları için de kullanılır.
+    
+    Args:
+        journal_path: Dosya yolu (klasörü yoksa oluşturulur)
+        line: Satır sonu dahil eklenecek metin
+    """
+    journal_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(journal_path, 'a', encoding='utf-8') as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _journal_line(ops: list) -> str:
+    """İşlem grubunu tek journal satırına çevirir."""
+    return json.dumps({'ops': ops}, ensure_ascii=False, default=str) + '\n'
+
+
+def _write_entry(collection_name: str, entry: dict) -> bool:
+    """
+    Önbellek girdisindeki kayıtları atomic write ile dosyaya yazar
+    ve girdiyi yeni dosya imzasıyla önbelleğe koyar.
+    Varsa journal, yeni snapshot'a katıldığı için silinir.
+    
+    Yazma başarısız olursa girdi önbellekten atılır; sonraki okuma diskten yapılır.
     
     Args:
         collection_name: Koleksiyon adı
-        data: Kaydedilecek veri listesi
+        entry: Yazılacak önbellek girdisi
     
     Returns:
         bool: Başarılı ise True
@@ -102,285 +438,552 @@ def save_json(collection_name: str, data: list) -> bool:
     ensure_data_dir()
     file_path = get_file_path(collection_name)
     temp_path = file_path.with_suffix('.tmp')
+    journal_path = file_path.with_suffix('.journal')
+    records = entry['records']
     
     try:
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+        offsets = _dump_snapshot(temp_path, records, entry['codec'])
         
         os.replace(temp_path, file_path)
-        logger.info(f"{collection_name} kaydedildi: {len(data)} kayıt")
+        _write_offset_index(collection_name, entry['codec'], offsets)
+        # Snapshot journal'ı içeriyor; silinmeden çökerse journal tekrar uygulanır (idempotent)
+        if journal_path.exists():
+            journal_path.unlink()
+        entry['signature'] = _collection_signature(file_path)
+        _cache[file_path] = entry
+        logger.info(f"{collection_name} kaydedildi: {len(records)} kayıt")
         return True
     except Exception as e:
         logger.error(f"Kaydetme hatası ({file_path}): {e}")
+        _cache.pop(file_path, None)
         if temp_path.exists():
             temp_path.unlink()
         return False
 
 
-def generate_id() -> int:
+def _append_journal(collection_name: str, entry: dict, ops: list) -> bool:
     """
-    Benzersiz ID üretir (UUID tabanlı, integer'a çevrilmiş).
+    İşlem grubunu journal'a tek satır olarak ekler (fsync ile).
+    Journal eşikleri aşarsa koleksiyonu compaction ile yeni snapshot'a katlar.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        entry: Güncellenmiş önbellek girdisi
+        ops: ["put", kayıt] / ["del", id] listesi
     
     Returns:
-        int: Benzersiz ID
+        bool: Başarılı ise True
     """
-    return int(uuid.uuid4().hex[:8], 16)
+    file_path = get_file_path(collection_name)
+    journal_path = file_path.with_suffix('.journal')
+    
+    try:
+        append_line(journal_path, _journal_line(ops))
+        entry['signature'] = _collection_signature(file_path)
+        _cache[file_path] = entry
+    except Exception as e:
+        logger.error(f"Journal yazma hatası ({journal_path}): {e}")
+        _cache.pop(file_path, None)
+        return False
+    
+    return _maybe_compact(collection_name, entry)
 
 
-def get_next_id(collection_name: str) -> int:
+def _maybe_compact(collection_name: str, entry: dict) -> bool:
     """
-    Koleksiyon için bir sonraki ID'yi döndürür.
-    Mevcut en yüksek ID + 1 veya 1 döner.
+    Journal eşikleri aşıldıysa koleksiyonu yeni snapshot'a katlar.
     
     Args:
         collection_name: Koleksiyon adı
+        entry: Güncel önbellek girdisi
     
     Returns:
-        int: Sonraki ID
+        bool: Başarılı ise (veya gerek yoksa) True
     """
-    data = load_json(collection_name)
-    if not data:
-        return 1
-    
-    max_id = max(item.get('id', 0) for item in data)
-    return max_id + 1
-
-
-def find_by_id(collection_name: str, item_id: int) -> dict | None:
+    snapshot_sig, journal_sig = entry['signature'] or (None, None)
+    journal_size = journal_sig[1] if journal_sig else 0
+    snapshot_size = snapshot_sig[1] if snapshot_sig else 0
+    if journal_size > JOURNAL_MAX_BYTES or (
+        journal_size > JOURNAL_MIN_BYTES and journal_size > snapshot_size * JOURNAL_MAX_RATIO
+    ):
+        logger.info(f"Journal eşiği aşıldı, compaction: {collection_name} ({journal_size} bayt)")
+        return _write_entry(collection_name, entry)
+    return True
+
+
+def _commit(collection_name: str, entry: dict, ops: list | None) -> bool:
     """
-    ID'ye göre kayıt bulur.
+    Değiştirilmiş önbellek girdisini kalıcı hale getirir.
+    Koleksiyon journal modundaysa sadece değişiklikleri ekler, değilse
+    (veya ops None ise) tüm koleksiyonu atomic write ile yazar.
+    Açık bir transaction varsa değişiklik sadece biriktirilir.
     
     Args:
         collection_name: Koleksiyon adı
-        item_id: Aranacak ID
+        entry: Güncellenmiş önbellek girdisi
+        ops: Journal işlemleri; id ile ifade edilemeyen değişikliklerde None
     
     Returns:
-        dict | None: Bulunan kayıt veya None
+        bool: Başarılı ise True
     """
-    data = load_json(collection_name)
-    for item in data:
-        if item.get('id') == item_id:
-            return item
-    return None
+    if _transaction is not None:
+        _transaction['entries'][collection_name] = entry
+        staged_ops = _transaction['ops'].get(collection_name, [])
+        if staged_ops is None or ops is None:
+            _transaction['ops'][collection_name] = None
+        else:
+            _transaction['ops'][collection_name] = staged_ops + ops
+        return True
+    
+    old_signature = entry['signature']
+    if _base_name(collection_name) in JOURNAL_COLLECTIONS and ops is not None:
+        success = _append_journal(collection_name, entry, ops)
+    else:
+        success = _write_entry(collection_name, entry)
+    if success:
+        _notify(collection_name, old_signature, entry['signature'], ops)
+    return success
 
 
-def find_by_field(collection_name: str, field: str, value) -> dict | None:
+def add_listener(collection_name: str, callback):
     """
-    Belirli bir alana göre kayıt bulur.
+    Koleksiyona yapılan yazmalardan sonra çağrılacak fonksiyonu kaydeder.
+    Türetilmiş yapılar (ör. due_index) kendilerini her yazmada yeniden
+    kurmak yerine değişiklikleri uygulayabilir.
+    
+    Fonksiyon callback(bölüm adı, eski imza, yeni imza, ops) ile çağrılır;
+    ops ["put", kayıt] / ["del", id] listesidir, değişiklik id ile ifade
+    edilemiyorsa None. Dinleyicinin bildiği imza eski imzayla aynı değilse
+    aradaki yazmalar kaçırılmıştır ve yapı yeniden kurulmalıdır. Sadece
+    JSON arka ucu bildirim yapar.
     
     Args:
         collection_name: Koleksiyon adı
-        field: Alan adı
-        value: Aranacak değer
-    
-    Returns:
-        dict | None: Bulunan ilk kayıt veya None
+        callback: Dinleyici fonksiyon
     """
-    data = load_json(collection_name)
-    for item in data:
-        if item.get(field) == value:
-            return item
-    return None
+    _listeners.setdefault(collection_name, []).append(callback)
 
 
-def find_all_by_field(collection_name: str, field: str, value) -> list:
+def _notify(collection_name: str, old_signature, new_signature, ops: list | None):
+    """Kaydedilen bir değişikliği koleksiyonun dinleyicilerine bildirir."""
+    for callback in _listeners.get(_base_name(collection_name), []):
+        try:
+            callback(collection_name, old_signature, new_signature, ops)
+        except Exception as e:
+            logger.error(f"Değişiklik dinleyicisi hatası ({collection_name}): {e}")
+
+
+def _get_entry_for_write(collection_name: str) -> dict:
     """
-    Belirli bir alana göre tüm kayıtları bulur.
+    Yazma yapılacak önbellek girdisini döndürür.
+    Transaction içinde girdinin kopyası alınır; commit edilene kadar
+    önbellekteki asıl girdi değişmez, transaction içindeki okumalar kopyayı görür.
     
     Args:
         collection_name: Koleksiyon adı
-        field: Alan adı
-        value: Aranacak değer
     
     Returns:
-        list: Bulunan kayıtlar
+        dict: Değiştirilebilir önbellek girdisi
+    """
+    entry = _get_entry(collection_name)
+    if _transaction is None or collection_name in _transaction['entries']:
+        return entry
+    
+    staged = {
+        'signature': entry['signature'],
+        'records': dict(entry['records']),
+        'has_duplicates': entry['has_duplicates'],
+        'indexes': {
+            field: {value: dict(bucket) for value, bucket in index.items()}
+            for field, index in entry['indexes'].items()
+        },
+        'codec': entry['codec']
+    }
+    _transaction['entries'][collection_name] = staged
+    _transaction['ops'].setdefault(collection_name, [])
+    return staged
+
+
+@contextmanager
+def transaction():
+    """
+    Birden fazla koleksiyondaki değişiklikleri tek seferde, ya hep ya hiç
+    mantığıyla kaydeder. Blok içindeki insert/update/delete çağrıları bellekte
+    biriktirilir; blok bitince her koleksiyon için tek yazma yapılır.
+    Blok hata ile biterse hiçbir değişiklik kaydedilmez.
+    
+    Birden fazla dosya yazılacaksa önce data/transaction.pending dosyasına
+    commit planı yazılır; commit yarıda kalırsa sonraki açılışta tamamlanır.
+    İç içe çağrılar dıştaki transaction'a katılır.
+    
+    Kullanım:
+        with transaction():
+            insert('cards', card)
+            insert('srs_state', srs)
     """
-    data = load_json(collection_name)
-    return [item for item in data if item.get(field) == value]
+    global _transaction
+    
+    if _backend is not None:
+        with _backend.transaction():
+            yield
+        return
+    
+    if _transaction is not None:
+        yield
+        return
+    
+    recover_transaction()
+    tx = {'entries': {}, 'ops': {}}
+    _transaction = tx
+    try:
+        yield
+    finally:
+        _transaction = None
+    
+    _commit_transaction(tx)
 
 
-def insert(collection_name: str, item: dict) -> dict:
+def _commit_transaction(tx: dict):
     """
-    Yeni kayıt ekler.
+    Biriktirilen transaction değişikliklerini diske yazar.
+    
+    Snapshot'lar önce geçici dosyalara yazılır, journal satırları hazırlanır.
+    Birden fazla dosya etkileniyorsa plan atomik olarak transaction.pending
+    dosyasına yazılır, sonra uygulanır ve plan dosyası silinir.
     
     Args:
-        collection_name: Koleksiyon adı
-        item: Eklenecek kayıt (id otomatik atanır)
+        tx: Transaction durumu
     
-    Returns:
-        dict: Eklenen kayıt (id ile birlikte)
+    Raises:
+        OSError: Plan yazılamazsa (hiçbir değişiklik uygulanmaz)
     """
-    data = load_json(collection_name)
+    ensure_data_dir()
+    plan_path = DATA_DIR / TRANSACTION_FILE
+    replaces = []
+    appends = []
+    offsets = {}
     
-    if 'id' not in item:
-        item['id'] = get_next_id(collection_name)
+    try:
+        for collection_name, entry in tx['entries'].items():
+            file_path = get_file_path(collection_name)
+            ops = tx['ops'].get(collection_name)
+            
+            if _base_name(collection_name) in JOURNAL_COLLECTIONS and ops is not None:
+                if ops:
+                    appends.append((collection_name, _journal_line(ops)))
+            elif ops != []:
+                temp_path = file_path.with_suffix('.txn')
+                offsets[collection_name] = _dump_snapshot(temp_path, entry['records'], entry['codec'])
+                replaces.append((collection_name, temp_path.relative_to(DATA_DIR).as_posix()))
+        
+        if len(replaces) + len(appends) > 1:
+            plan_temp = plan_path.with_suffix('.tmp')
+            with open(plan_temp, 'w', encoding='utf-8') as f:
+                json.dump({'replace': replaces, 'append': appends}, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(plan_temp, plan_path)
+    except Exception as e:
+        logger.error(f"Transaction hazırlanamadı, değişiklikler kaydedilmedi: {e}")
+        for collection_name, temp_name in replaces:
+            (DATA_DIR / temp_name).unlink(missing_ok=True)
+        for collection_name in tx['entries']:
+            _cache.pop(get_file_path(collection_name), None)
+        raise
     
-    if 'created_at' not in item:
-        item['created_at'] = datetime.now().isoformat()
+    _apply_transaction_plan(replaces, appends)
+    plan_path.unlink(missing_ok=True)
     
-    data.append(item)
-    save_json(collection_name, data)
+    for collection_name, entries in offsets.items():
+        _write_offset_index(collection_name, tx['entries'][collection_name]['codec'], entries)
     
-    logger.info(f"Yeni kayıt eklendi: {collection_name} #{item['id']}")
-    return item
+    for collection_name, entry in tx['entries'].items():
+        file_path = get_file_path(collection_name)
+        old_signature = entry['signature']
+        entry['signature'] = _collection_signature(file_path)
+        _cache[file_path] = entry
+        if _base_name(collection_name) in JOURNAL_COLLECTIONS:
+            _maybe_compact(collection_name, entry)
+        _notify(collection_name, old_signature, entry['signature'], tx['ops'].get(collection_name))
+    
+    if replaces or appends:
+        logger.info(f"Transaction kaydedildi: {len(replaces)} snapshot, {len(appends)} journal yazması")
 
 
-def update(collection_name: str, item_id: int, updates: dict) -> dict | None:
+def _apply_transaction_plan(replaces: list, appends: list):
     """
-    Mevcut kaydı günceller.
+    Transaction planını uygular: geçici snapshot'ları yerine taşır ve
+    journal satırlarını ekler. Kurtarma sırasında tekrar çağrılabilir.
     
     Args:
-        collection_name: Koleksiyon adı
-        item_id: Güncellenecek kayıt ID'si
-        updates: Güncellenecek alanlar
+        replaces: (koleksiyon, DATA_DIR'e göre geçici dosya yolu) listesi
+        appends: (koleksiyon, journal satırı) listesi
+    """
+    for collection_name, temp_name in replaces:
+        file_path = get_file_path(collection_name)
+        temp_path = DATA_DIR / temp_name
+        if temp_path.exists():
+            os.replace(temp_path, file_path)
+        file_path.with_suffix('.journal').unlink(missing_ok=True)
+    
+    for collection_name, line in appends:
+        journal_path = get_journal_path(collection_name)
+        _truncate_torn_tail(journal_path)
+        append_line(journal_path, line)
+
+
+def _truncate_torn_tail(journal_path: Path):
+    """Journal yarım kalmış bir satırla bitiyorsa o satırı kırpar."""
+    if not journal_path.exists():
+        return
+    content = journal_path.read_bytes()
+    if content and not content.endswith(b'\n'):
+        os.truncate(journal_path, content.rfind(b'\n') + 1)
+
+
+def recover_transaction() -> bool:
+    """
+    Yarıda kalmış bir transaction commit'i varsa tamamlar (roll-forward).
+    Journal satırlarının tekrar eklenmesi zararsızdır, çünkü uygulanmaları idempotenttir.
     
     Returns:
-        dict | None: Güncellenen kayıt veya None
+        bool: Kurtarma yapıldıysa True
     """
-    data = load_json(collection_name)
+    plan_path = DATA_DIR / TRANSACTION_FILE
+    if not plan_path.exists():
+        return False
     
-    for i, item in enumerate(data):
-        if item.get('id') == item_id:
-            data[i].update(updates)
-            data[i]['updated_at'] = datetime.now().isoformat()
-            save_json(collection_name, data)
-            logger.info(f"Kayıt güncellendi: {collection_name} #{item_id}")
-            return data[i]
+    with open(plan_path, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
     
-    logger.warning(f"Güncellenecek kayıt bulunamadı: {collection_name} #{item_id}")
-    return None
+    _apply_transaction_plan(plan['replace'], plan['append'])
+    plan_path.unlink()
+    _cache.clear()
+    logger.warning("Yarıda kalmış transaction tamamlandı.")
+    return True
 
 
-def delete(collection_name: str, item_id: int) -> bool:
+def set_journal_mode(collection_name: str, enabled: bool = True):
     """
-    Kaydı siler.
+    Koleksiyon için journal (append-only) yazma modunu açar/kapatır.
+    Kapatırken bekleyen journal snapshot'a katlanır.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        enabled: True ise journal modu açılır
+    """
+    get_file_path(collection_name)
+    if enabled:
+        JOURNAL_COLLECTIONS.add(collection_name)
+    else:
+        JOURNAL_COLLECTIONS.discard(collection_name)
+        compact(collection_name)
+    logger.info(f"Journal modu {'açıldı' if enabled else 'kapatıldı'}: {collection_name}")
+
+
+def compact(collection_name: str) -> bool:
+    """
+    Koleksiyonun journal'ını yeni bir snapshot'a katlar ve journal'ı siler.
+    Journal yoksa bir şey yapmaz.
     
     Args:
         collection_name: Koleksiyon adı
-        item_id: Silinecek kayıt ID'si
     
     Returns:
-        bool: Başarılı ise True
+        bool: Başarılı ise (veya gerek yoksa) True
     """
-    data = load_json(collection_name)
-    original_length = len(data)
+    if _is_partitioned(collection_name):
+        return all([compact(name) for name in list_partitions(collection_name)])
     
-    data = [item for item in data if item.get('id') != item_id]
-    
-    if len(data) < original_length:
-        save_json(collection_name, data)
-        logger.info(f"Kayıt silindi: {collection_name} #{item_id}")
+    if not get_journal_path(collection_name).exists():
         return True
-    
-    logger.warning(f"Silinecek kayıt bulunamadı: {collection_name} #{item_id}")
-    return False
+    return _write_entry(collection_name, _get_entry(collection_name))
 
 
-def delete_by_field(collection_name: str, field: str, value) -> int:
+def get_codec(collection_name: str) -> str:
     """
-    Belirli bir alana göre tüm kayıtları siler.
+    Koleksiyon dosyasının biçimini döndürür (bkz. serialization.py).
     
     Args:
         collection_name: Koleksiyon adı
-        field: Alan adı
-        value: Silinecek değer
     
     Returns:
-        int: Silinen kayıt sayısı
+        str: Biçim adı
     """
-    data = load_json(collection_name)
-    original_length = len(data)
-    
-    data = [item for item in data if item.get(field) != value]
-    deleted_count = original_length - len(data)
-    
-    if deleted_count > 0:
-        save_json(collection_name, data)
-        logger.info(f"{deleted_count} kayıt silindi: {collection_name} ({field}={value})")
-    
-    return deleted_count
+    if _is_partitioned(collection_name):
+        names = list_partitions(collection_name)
+        return get_codec(names[0]) if names else DEFAULT_CODEC
+    return _get_entry(collection_name)['codec']
 
 
-def get_current_datetime() -> str:
+def set_codec(collection_name: str, codec: str) -> bool:
     """
-    Şu anki tarih/saati ISO formatında döndürür.
+    Koleksiyon dosyasını verilen biçimde yeniden yazar; sonraki yazmalar da
+    bu biçimle yapılır. Varsa journal yeni snapshot'a katlanır.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        codec: Biçim adı (json, json-compact, pickle, records)
     
     Returns:
-        str: ISO format datetime
+        bool: Başarılı ise True
+    
+    Raises:
+        ValueError: Bilinmeyen biçim
     """
-    return datetime.now().isoformat()
+    if codec not in serialization.CODECS:
+        raise ValueError(f"Bilinmeyen biçim: {codec}")
+    
+    if _is_partitioned(collection_name):
+        return all([set_codec(name, codec) for name in list_partitions(collection_name)])
+    
+    entry = _get_entry_for_write(collection_name)
+    entry['codec'] = codec
+    logger.info(f"Biçim değiştiriliyor: {collection_name} -> {codec}")
+    return _commit(collection_name, entry, None)
 
 
-def get_current_date() -> str:
+def _get_index(collection_name: str, entry: dict, field: str) -> dict | None:
     """
-    Şu anki tarihi YYYY-MM-DD formatında döndürür.
+    Alan için ikincil indeksi döndürür, ilk kullanımda oluşturur.
+    
+    İndeks değer -> {kayıt anahtarı: None} eşlemesidir; iç dict kayıtların
+    dosyadaki sırasını korur ve O(1) silmeye izin verir.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        entry: Önbellek girdisi
+        field: Alan adı
     
     Returns:
-        str: YYYY-MM-DD format tarih
+        dict | None: İndeks, alan indeksli değilse None
     """
-    return datetime.now().strftime('%Y-%m-%d')
+    if field not in INDEXES.get(_base_name(collection_name), []):
+        return None
+    
+    index = entry['indexes'].get(field)
+    if index is None:
+        index = {}
+        for key, item in entry['records'].items():
+            _index_add(index, key, item.get(field))
+        entry['indexes'][field] = index
+        logger.debug(f"İndeks oluşturuldu: {collection_name}.{field} ({len(index)} değer)")
+    return index
 
 
-ensure_data_dir()
-=======
-"""
-storage.py - Veri Erişim Katmanı
+def _index_add(index: dict, key, value):
+    """Kayıt anahtarını indeksteki değerin kovasına ekler."""
+    try:
+        index.setdefault(value, {})[key] = None
+    except TypeError:
+        pass  # Hashlenemeyen değerler indekslenmez, sorguları taramaya düşer
 
-JSON dosyalarını okuma/yazma, atomic write ve ID üretimi işlemlerini yapar.
-Tüm veri işlemleri bu modül üzerinden gerçekleştirilir.
-"""
 
-import json
-import os
-from pathlib import Path
-from datetime import datetime
-import uuid
-import logging
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('studybuddy.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
+def _index_remove(index: dict, key, value):
+    """Kayıt anahtarını indeksteki değerin kovasından çıkarır."""
+    try:
+        bucket = index.get(value)
+    except TypeError:
+        return
+    if bucket is not None:
+        bucket.pop(key, None)
+        if not bucket:
+            del index[value]
 
-DATA_DIR = Path(__file__).parent / "data"
 
-FILES = {
-    'users': 'users.json',
-    'decks': 'decks.json',
-    'cards': 'cards.json',
-    'srs_state': 'srs_state.json',
-    'reviews': 'reviews.json'
-}
+def _reindex(entry: dict, key, old: dict | None, new: dict | None):
+    """
+    Bir kaydın eklenmesi/güncellenmesi/silinmesi sonrası oluşturulmuş indeksleri günceller.
+    Değeri değişmeyen alanlara dokunulmaz (kova sırası korunur).
+    
+    Args:
+        entry: Önbellek girdisi
+        key: Kayıt anahtarı
+        old: Eski kayıt (ekleme ise None)
+        new: Yeni kayıt (silme ise None)
+    """
+    for field, index in entry['indexes'].items():
+        old_value = old.get(field) if old is not None else None
+        new_value = new.get(field) if new is not None else None
+        if old is not None and new is not None and old_value == new_value:
+            continue
+        if old is not None:
+            _index_remove(index, key, old_value)
+        if new is not None:
+            _index_add(index, key, new_value)
+
+
+def _lookup_keys(collection_name: str, entry: dict, field: str, value) -> list | None:
+    """
+    İndeks varsa alan=değer olan kayıtların anahtarlarını döndürür.
+    İndeks yoksa veya değer hashlenemiyorsa None döner (tarama yapılmalı).
+    """
+    index = _get_index(collection_name, entry, field)
+    if index is None:
+        return None
+    try:
+        return list(index.get(value, ()))
+    except TypeError:
+        return None
 
 
-def ensure_data_dir():
+def create_index(collection_name: str, field: str):
     """
-    data/ klasörünün var olduğundan emin olur.
-    Yoksa oluşturur.
+    Koleksiyona ikincil indeks tanımlar. İndeks ilk sorguda oluşturulur
+    ve sonraki yazmalarda artımlı olarak güncellenir.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        field: İndekslenecek alan
     """
-    if not DATA_DIR.exists():
-        DATA_DIR.mkdir(parents=True)
-        logger.info(f"Veri klasörü oluşturuldu: {DATA_DIR}")
+    get_file_path(collection_name)
+    fields = INDEXES.setdefault(collection_name, [])
+    if field not in fields:
+        fields.append(field)
+        logger.info(f"İndeks tanımlandı: {collection_name}.{field}")
 
 
-def get_file_path(collection_name: str) -> Path:
+def drop_index(collection_name: str, field: str):
     """
-    Koleksiyon adına göre dosya yolunu döndürür.
+    Koleksiyondaki ikincil indeksi kaldırır.
     
     Args:
-        collection_name: Koleksiyon adı (users, decks, cards, srs_state, reviews)
+        collection_name: Koleksiyon adı
+        field: Alan adı
+    """
+    fields = INDEXES.get(collection_name, [])
+    if field in fields:
+        fields.remove(field)
+    for name in _physical_names(collection_name):
+        entry = _cache.get(get_file_path(name))
+        if entry is not None:
+            entry['indexes'].pop(field, None)
+
+
+def list_indexes() -> list:
+    """
+    Tanımlı ikincil indeksleri ve boyutlarını listeler.
+    Henüz oluşturulmamış indeksler bu çağrıda oluşturulur.
     
     Returns:
-        Path: Dosya yolu
+        list: collection, field, keys (farklı değer sayısı) ve entries (kayıt sayısı) içeren sözlükler
     """
-    if collection_name not in FILES:
-        raise ValueError(f"Bilinmeyen koleksiyon: {collection_name}")
-    return DATA_DIR / FILES[collection_name]
+    result = []
+    for collection_name, fields in INDEXES.items():
+        names = _physical_names(collection_name)
+        for field in fields:
+            keys = entries = 0
+            for name in names:
+                index = _get_index(name, _get_entry(name), field)
+                keys += len(index)
+                entries += sum(len(bucket) for bucket in index.values())
+            result.append({
+                'collection': collection_name,
+                'field': field,
+                'keys': keys,
+                'entries': entries
+            })
+    return result
 
 
 def load_json(collection_name: str) -> list:
@@ -388,33 +991,29 @@ def load_json(collection_name: str) -> list:
     JSON dosyasını okur ve liste olarak döndürür.
     Dosya yoksa boş liste döndürür.
     
+    Dosya değişmediği sürece önbellekten döner; kayıtlar salt okunurdur
+    (bkz. ReadOnlyRecord), listenin kendisi ise çağırana ait bir kopyadır.
+    
     Args:
         collection_name: Koleksiyon adı
     
     Returns:
         list: Veri listesi
     """
-    ensure_data_dir()
-    file_path = get_file_path(collection_name)
+    if _backend is not None:
+        return _backend.load_json(collection_name)
     
-    if not file_path.exists():
-        logger.debug(f"Dosya bulunamadı, boş liste döndürülüyor: {file_path}")
-        return []
+    if _is_partitioned(collection_name):
+        return [item for name in list_partitions(collection_name) for item in load_json(name)]
     
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            logger.debug(f"{collection_name} yüklendi: {len(data)} kayıt")
-            return data
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON okuma hatası ({file_path}): {e}")
-        return []
+    return list(_get_entry(collection_name)['records'].values())
 
 
 def save_json(collection_name: str, data: list) -> bool:
     """
     Veriyi JSON dosyasına atomic write ile kaydeder.
     Önce geçici dosyaya yazar, sonra asıl dosyanın üstüne geçer.
+    Yazılan veri önbelleğe de aktarılır (write-through).
     
     Args:
         collection_name: Koleksiyon adı
@@ -423,22 +1022,203 @@ def save_json(collection_name: str, data: list) -> bool:
     Returns:
         bool: Başarılı ise True
     """
-    ensure_data_dir()
-    file_path = get_file_path(collection_name)
-    temp_path = file_path.with_suffix('.tmp')
+    if _backend is not None:
+        return _backend.save_json(collection_name, data)
+    
+    if _is_partitioned(collection_name):
+        groups = _group_by_partition(collection_name, data)
+        with transaction():
+            return all([
+                save_json(name, groups.get(name, []))
+                for name in sorted(set(list_partitions(collection_name)) | set(groups), key=_partition_sort_key)
+            ])
     
+    entry = _build_entry(None, data, _current_codec(collection_name))
+    if _transaction is not None:
+        return _commit(collection_name, entry, None)
+    return _write_entry(collection_name, entry)
+
+
+def _current_codec(collection_name: str) -> str:
+    """Koleksiyon dosyasının biçimini, dosyayı çözmeden (önbellekten veya ilk baytlardan) bulur."""
+    file_path = get_file_path(collection_name)
+    if _transaction is not None and collection_name in _transaction['entries']:
+        return _transaction['entries'][collection_name]['codec']
+    if file_path in _cache:
+        return _cache[file_path]['codec']
     try:
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-        
-        os.replace(temp_path, file_path)
-        logger.info(f"{collection_name} kaydedildi: {len(data)} kayıt")
-        return True
-    except Exception as e:
-        logger.error(f"Kaydetme hatası ({file_path}): {e}")
-        if temp_path.exists():
-            temp_path.unlink()
-        return False
+        with open(file_path, 'rb') as f:
+            return serialization.detect(f.read(len(serialization.RECORDS_MAGIC)))
+    except FileNotFoundError:
+        return DEFAULT_CODEC
+
+
+def iter_collection(collection_name: str, fields: list = None, where=None, since: str = None, until: str = None):
+    """
+    Koleksiyonun kayıtlarını sırayla döndürür (generator).
+    
+    Önbellekte güncel bir kopya varsa ondan okunur. Yoksa dosya, tamamı belleğe
+    alınmadan kayıt kayıt çözülür ve önbelleğe konmaz; bellek kullanımı koleksiyon
+    boyutundan bağımsızdır. Journal varsa değişiklikleri akış sırasında uygulanır.
+    
+    since/until verilirse sadece SEGMENTS zaman alanı [since, until) aralığında
+    olan kayıtlar döndürülür; aralıkla kesişmeyen segment dosyaları hiç açılmaz.
+    
+    Kullanım:
+        for r in iter_collection('reviews', fields=['quality'], where=lambda r: r['user_id'] == 1):
+            ...
+        for r in iter_collection('reviews', since='2026-10-12'):
+            ...
+    
+    Args:
+        collection_name: Koleksiyon adı
+        fields: Sadece bu alanları içeren kayıtlar döndürülür (None ise tüm alanlar)
+        where: Kayıt için True dönen filtre fonksiyonu (projeksiyondan önce uygulanır)
+        since: Zaman aralığının başı, dahil (ISO tarih veya tarih/saat)
+        until: Zaman aralığının sonu, hariç
+    
+    Yields:
+        dict: Kayıt (salt okunur)
+    
+    Raises:
+        ValueError: Zaman aralığı, zamana göre bölünmeyen bir koleksiyon için verilirse
+    """
+    if _backend is not None:
+        yield from _backend.iter_collection(collection_name, fields, where, since, until)
+        return
+    
+    if since is not None or until is not None:
+        where = _range_filter(collection_name, since, until, where)
+    
+    if _is_partitioned(collection_name):
+        if since is None and until is None:
+            names = list_partitions(collection_name)
+        else:
+            names = _segments_in_range(collection_name, since, until)
+        for name in names:
+            yield from iter_collection(name, fields, where)
+        return
+    
+    entry = None
+    file_path = get_file_path(collection_name)
+    if _transaction is not None and collection_name in _transaction['entries']:
+        entry = _transaction['entries'][collection_name]
+    else:
+        signature = _collection_signature(file_path)
+        if signature is None:
+            return
+        cached = _cache.get(file_path)
+        if cached is not None and cached['signature'] == signature:
+            entry = cached
+    
+    if entry is not None:
+        items = list(entry['records'].values())
+    else:
+        items = _stream_records(file_path, signature)
+    
+    for item in items:
+        if where is not None and not where(item):
+            continue
+        if fields is None:
+            yield item if isinstance(item, ReadOnlyRecord) else _freeze(item)
+        else:
+            yield _freeze({field: item[field] for field in fields if field in item})
+
+
+def _stream_records(file_path: Path, signature: tuple):
+    """
+    Snapshot'ı akış halinde okur ve journal değişikliklerini üzerine uygular.
+    Journal (en fazla JOURNAL_MAX_BYTES) belleğe alınır; güncellenen kayıtlar
+    snapshot'taki yerlerinde, yeni kayıtlar sonda döndürülür.
+    """
+    overlay = {}
+    if signature[1] is not None:
+        with open(file_path.with_suffix('.journal'), 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    for op, value in json.loads(line)['ops']:
+                        if op == 'put':
+                            overlay[value['id']] = value
+                        elif op == 'del':
+                            overlay[value] = None
+                except (ValueError, KeyError, TypeError):
+                    continue
+    
+    if signature[0] is not None:
+        try:
+            for item in serialization.iter_file(file_path):
+                item_id = item.get('id')
+                if overlay and isinstance(item_id, (int, str)) and item_id in overlay:
+                    item = overlay.pop(item_id)
+                    if item is None:
+                        continue
+                yield item
+        except ValueError as e:
+            logger.error(f"Dosya okuma hatası ({file_path}): {e}")
+            return
+    
+    for item in overlay.values():
+        if item is not None:
+            yield item
+
+
+def get_collection_signature(collection_name: str) -> tuple | None:
+    """
+    Koleksiyonun değişip değişmediğini anlamak için imza döndürür. İmza,
+    koleksiyon diske her yazıldığında (başka bir süreç yazsa da) değişir;
+    türetilmiş yapılar (ör. srs_store) bununla önbelleklenir.
+    
+    Args:
+        collection_name: Koleksiyon adı
+    
+    Returns:
+        tuple | None: İmza; açık transaction'da kaydedilmemiş değişiklik varsa None
+    """
+    if _backend is not None:
+        return _backend.get_collection_signature(collection_name)
+    
+    names = _physical_names(collection_name)
+    if _transaction is not None and any(name in _transaction['entries'] for name in names):
+        return None
+    return tuple((name, _collection_signature(get_file_path(name))) for name in names)
+
+
+def get_cache_stats() -> dict:
+    """
+    Koleksiyon önbelleğinin isabet istatistiklerini döndürür.
+    
+    Returns:
+        dict: hits, misses, hit_ratio ve önbellekteki koleksiyon sayısı
+    """
+    total = _cache_stats['hits'] + _cache_stats['misses']
+    return {
+        'hits': _cache_stats['hits'],
+        'misses': _cache_stats['misses'],
+        'hit_ratio': round(_cache_stats['hits'] / total, 4) if total else 0.0,
+        'entries': len(_cache)
+    }
+
+
+def clear_cache(collection_name: str = None):
+    """
+    Önbelleği temizler. Koleksiyon verilmezse tamamı, verilirse sadece o koleksiyon.
+    
+    Args:
+        collection_name: Koleksiyon adı (opsiyonel)
+    """
+    if collection_name is None:
+        _cache.clear()
+        _partition_routes.clear()
+        _cache_stats['hits'] = 0
+        _cache_stats['misses'] = 0
+    else:
+        for name in _physical_names(collection_name):
+            _cache.pop(get_file_path(name), None)
+    
+    global _segment_meta
+    _segment_meta = None
 
 
 def generate_id() -> int:
@@ -451,10 +1231,108 @@ def generate_id() -> int:
     return int(uuid.uuid4().hex[:8], 16)
 
 
+def _max_id(records: dict) -> int:
+    """Kayıtlardaki en büyük tamsayı ID'yi döndürür (yoksa 0)."""
+    return max((item['id'] for item in records.values() if isinstance(item.get('id'), int)), default=0)
+
+
+def _get_sequence_state() -> dict:
+    """
+    ID dizisi durumunu döndürür; sequences.json değişmişse yeniden okur.
+    
+    Dosyadan okunan üst sınırlar 'limits', bu süreçte dağıtılacak sıradaki
+    ID'ler 'values' içinde tutulur. Yeniden okumada 'values' sıfırlanır ve dağıtım
+    üst sınırdan devam eder; önceden ayrılmış ama kullanılmamış ID'ler atlanır.
+    
+    Returns:
+        dict: path, signature, limits ve values alanları
+    """
+    ensure_data_dir()
+    path = DATA_DIR / SEQUENCE_FILE
+    signature = _file_signature(path)
+    
+    state = _sequences.get(path)
+    if state is not None and state['signature'] == signature:
+        return state
+    
+    limits = {}
+    if signature is not None:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                limits = json.load(f)
+        except json.JSONDecodeError as e:
+            logger.error(f"ID dizisi okunamadı, veriden yeniden hesaplanacak ({path}): {e}")
+    
+    state = {'path': path, 'signature': signature, 'limits': limits, 'values': {}}
+    _sequences[path] = state
+    return state
+
+
+def _write_sequences(state: dict):
+    """ID dizisi üst sınırlarını atomic write ile sequences.json'a yazar."""
+    path = state['path']
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state['limits'], f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    state['signature'] = _file_signature(path)
+
+
+def reserve_ids(collection_name: str, count: int = 1) -> range:
+    """
+    Koleksiyon için ardışık count adet ID ayırır (toplu eklemeler için).
+    
+    Dizi kalıcıdır: silinen kayıtların ID'leri ve çökmeden önce ayrılmış
+    ID'ler tekrar verilmez. Üst sınır, ID'ler dağıtılmadan önce diske yazılır.
+    Dizi ilk kez kullanıldığında koleksiyondaki en büyük ID'den başlatılır.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        count: Ayrılacak ID sayısı
+    
+    Returns:
+        range: Ayrılan ID'ler
+    """
+    if _backend is not None:
+        return _backend.reserve_ids(collection_name, count)
+    
+    state = _get_sequence_state()
+    next_id = state['values'].get(collection_name)
+    if next_id is None:
+        next_id = state['limits'].get(collection_name)
+    if next_id is None:
+        next_id = max(
+            (_max_id(_get_entry(name)['records']) for name in _physical_names(collection_name)),
+            default=0
+        ) + 1
+    
+    end = next_id + count
+    if end > state['limits'].get(collection_name, 0):
+        state['limits'][collection_name] = end + SEQUENCE_PREFETCH
+        _write_sequences(state)
+    state['values'][collection_name] = end
+    return range(next_id, end)
+
+
+def _skip_used_ids(collection_name: str, records: dict) -> int:
+    """
+    Dizi dışarıdan eklenmiş kayıtların gerisinde kaldıysa en büyük ID'nin
+    ötesine taşır ve yeni bir ID ayırır.
+    """
+    state = _get_sequence_state()
+    state['values'][collection_name] = max(
+        state['values'].get(collection_name, 0), _max_id(records) + 1
+    )
+    logger.warning(f"ID dizisi mevcut kayıtların gerisindeydi, ileri alındı: {collection_name}")
+    return reserve_ids(collection_name).start
+
+
 def get_next_id(collection_name: str) -> int:
     """
-    Koleksiyon için bir sonraki ID'yi döndürür.
-    Mevcut en yüksek ID + 1 veya 1 döner.
+    Koleksiyon için bir sonraki ID'yi ayırır ve döndürür.
+    Kalıcı ID dizisini kullanır (bkz. reserve_ids); koleksiyonu taramaz.
     
     Args:
         collection_name: Koleksiyon adı
@@ -462,30 +1340,109 @@ def get_next_id(collection_name: str) -> int:
     Returns:
         int: Sonraki ID
     """
-    data = load_json(collection_name)
-    if not data:
-        return 1
-    
-    max_id = max(item.get('id', 0) for item in data)
-    return max_id + 1
+    return reserve_ids(collection_name).start
 
 
 def find_by_id(collection_name: str, item_id: int) -> dict | None:
     """
     ID'ye göre kayıt bulur.
+    Birincil anahtar indeksi kullanıldığı için koleksiyon boyutundan bağımsızdır.
+    Koleksiyon henüz önbellekte değilse kayıt, konum indeksiyle dosyadan tek başına okunur
+    (koleksiyonun tamamı çözülmez ve önbelleğe alınmaz).
     
     Args:
         collection_name: Koleksiyon adı
         item_id: Aranacak ID
     
     Returns:
-        dict | None: Bulunan kayıt veya None
+        dict | None: Bulunan kayıt (salt okunur) veya None
     """
-    data = load_json(collection_name)
-    for item in data:
-        if item.get('id') == item_id:
-            return item
-    return None
+    if _backend is not None:
+        return _backend.find_by_id(collection_name, item_id)
+    
+    if _is_partitioned(collection_name):
+        return _locate(collection_name, item_id)[1]
+    
+    found, item = _find_by_offset(collection_name, item_id)
+    if found:
+        return item
+    
+    try:
+        return _get_entry(collection_name)['records'].get(item_id)
+    except TypeError:
+        return None
+
+
+def _find_by_offset(collection_name: str, item_id) -> tuple[bool, dict | None]:
+    """
+    Koleksiyon hiç önbelleğe alınmamışsa kaydı konum indeksiyle okur.
+    Journal varsa önce journal'daki son işleme bakılır. İndeks yoksa veya eskiyse snapshot
+    bir kez taranıp yeniden oluşturulur.
+    
+    Returns:
+        tuple: (Sonuç kesin mi, Kayıt veya None). Kesin değilse normal yoldan aranmalıdır.
+    """
+    if type(item_id) is not int:
+        return False, None
+    if _transaction is not None and collection_name in _transaction['entries']:
+        return False, None
+    
+    file_path = get_file_path(collection_name)
+    if file_path in _cache:
+        return False, None
+    signature = _collection_signature(file_path)
+    if signature is None or signature[0] is None:
+        return False, None
+    
+    if signature[1] is not None:
+        found, item = _find_in_journal(file_path.with_suffix('.journal'), item_id)
+        if found:
+            return True, item
+    
+    index_path = get_index_path(collection_name)
+    result = offset_index.read_record(index_path, file_path, item_id)
+    if result is None:
+        try:
+            codec, entries = serialization.scan_offsets(file_path)
+        except (ValueError, IndexError) as e:
+            logger.error(f"Konum indeksi oluşturulamadı ({file_path}): {e}")
+            return False, None
+        if entries is None:
+            return False, None
+        _write_offset_index(collection_name, codec, entries)
+        logger.info(f"Konum indeksi yeniden oluşturuldu: {collection_name} ({len(entries)} kayıt)")
+        result = offset_index.read_record(index_path, file_path, item_id)
+        if result is None:
+            return False, None
+    
+    codec, data = result
+    if data is None:
+        return True, None
+    return True, _freeze(serialization.decode_record(codec, data))
+
+
+def _find_in_journal(journal_path: Path, item_id: int) -> tuple[bool, dict | None]:
+    """
+    Journal'daki kayda ait son işlemi bulur.
+    
+    Returns:
+        tuple: (Journal'da geçiyor mu, Son 'put' kaydı veya silindiyse None)
+    """
+    found, item = False, None
+    with open(journal_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                ops = json.loads(line)['ops']
+            except (ValueError, KeyError, TypeError):
+                continue
+            for op, value in ops:
+                if op == 'put' and value.get('id') == item_id:
+                    found, item = True, _freeze(value)
+                elif op == 'del' and value == item_id:
+                    found, item = True, None
+    return found, item
 
 
 def find_by_field(collection_name: str, field: str, value) -> dict | None:
@@ -500,8 +1457,24 @@ def find_by_field(collection_name: str, field: str, value) -> dict | None:
     Returns:
         dict | None: Bulunan ilk kayıt veya None
     """
-    data = load_json(collection_name)
-    for item in data:
+    if _backend is not None:
+        return _backend.find_by_field(collection_name, field, value)
+    
+    if _is_partitioned(collection_name):
+        for name in _query_partitions(collection_name, field, value):
+            item = find_by_field(name, field, value)
+            if item is not None:
+                return item
+        return None
+    
+    entry = _get_entry(collection_name)
+    records = entry['records']
+    
+    keys = _lookup_keys(collection_name, entry, field, value)
+    if keys is not None:
+        return records[keys[0]] if keys else None
+    
+    for item in records.values():
         if item.get(field) == value:
             return item
     return None
@@ -517,10 +1490,122 @@ def find_all_by_field(collection_name: str, field: str, value) -> list:
         value: Aranacak değer
     
     Returns:
-        list: Bulunan kayıtlar
+        list: Bulunan kayıtlar (salt okunur)
+    """
+    if _backend is not None:
+        return _backend.find_all_by_field(collection_name, field, value)
+    
+    if _is_partitioned(collection_name):
+        return [
+            item for name in _query_partitions(collection_name, field, value)
+            for item in find_all_by_field(name, field, value)
+        ]
+    
+    entry = _get_entry(collection_name)
+    records = entry['records']
+    
+    keys = _lookup_keys(collection_name, entry, field, value)
+    if keys is not None:
+        return [records[key] for key in keys]
+    
+    return [item for item in records.values() if item.get(field) == value]
+
+
+def find_many(collection_name: str, ids) -> dict:
+    """
+    Birden fazla ID'yi tek seferde bulur (ID başına find_by_id yerine).
+    
+    Args:
+        collection_name: Koleksiyon adı
+        ids: Aranacak ID'ler (tekrar edebilir)
+    
+    Returns:
+        dict: ID -> kayıt (salt okunur); bulunamayan ID'ler sonuçta yer almaz
+    """
+    ids = dict.fromkeys(ids)
+    
+    if _backend is not None or _is_partitioned(collection_name):
+        found = ((item_id, find_by_id(collection_name, item_id)) for item_id in ids)
+        return {item_id: item for item_id, item in found if item is not None}
+    
+    records = _get_entry(collection_name)['records']
+    return {item_id: records[item_id] for item_id in ids if item_id in records}
+
+
+def find_all_in(collection_name: str, field: str, values) -> list:
+    """
+    field değeri values içinde olan tüm kayıtları bulur (semi-join).
+    Alan indeksliyse değer başına indeksten, değilse koleksiyonun tek taramasıyla
+    ve set üyeliğiyle bulunur; maliyet kayıt sayısı + değer sayısı kadardır.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        field: Alan adı
+        values: Aranacak değerler
+    
+    Returns:
+        list: Bulunan kayıtlar (salt okunur)
+    """
+    values = set(values)
+    if not values:
+        return []
+    
+    if field in INDEXES.get(collection_name, []):
+        return [item for value in values for item in find_all_by_field(collection_name, field, value)]
+    return [item for item in load_json(collection_name) if item.get(field) in values]
+
+
+def index_by(items, field: str = 'id') -> dict:
+    """
+    Kayıtları alan değerine göre dict'e koyar (hash join'in kurulum tarafı).
+    Aynı değere sahip birden fazla kayıt varsa ilki tutulur.
+    
+    Args:
+        items: Kayıtlar
+        field: Anahtar alan
+    
+    Returns:
+        dict: Alan değeri -> kayıt
+    """
+    index = {}
+    for item in items:
+        index.setdefault(item.get(field), item)
+    return index
+
+
+def group_by(items, field: str) -> dict:
+    """
+    Kayıtları alan değerine göre gruplar.
+    
+    Args:
+        items: Kayıtlar
+        field: Gruplama alanı
+    
+    Returns:
+        dict: Alan değeri -> kayıt listesi (kayıtların sırası korunur)
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(item.get(field), []).append(item)
+    return groups
+
+
+def count_by(items, field: str) -> dict:
+    """
+    Kayıtları alan değerine göre sayar.
+    
+    Args:
+        items: Kayıtlar
+        field: Sayım alanı
+    
+    Returns:
+        dict: Alan değeri -> kayıt sayısı
     """
-    data = load_json(collection_name)
-    return [item for item in data if item.get(field) == value]
+    counts = {}
+    for item in items:
+        key = item.get(field)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
 
 
 def insert(collection_name: str, item: dict) -> dict:
@@ -534,21 +1619,97 @@ def insert(collection_name: str, item: dict) -> dict:
     Returns:
         dict: Eklenen kayıt (id ile birlikte)
     """
-    data = load_json(collection_name)
+    if _backend is not None:
+        return _backend.insert(collection_name, item)
+    
+    if _is_partitioned(collection_name):
+        name = _partition_of_item(collection_name, item)
+        saved = insert(name, item)
+        _partition_routes[(collection_name, saved['id'])] = name
+        return saved
+    
+    entry = _get_entry_for_write(collection_name)
+    records = entry['records']
     
     if 'id' not in item:
-        item['id'] = get_next_id(collection_name)
+        item['id'] = get_next_id(_base_name(collection_name))
+        if item['id'] in records:
+            item['id'] = _skip_used_ids(_base_name(collection_name), records)
     
     if 'created_at' not in item:
         item['created_at'] = datetime.now().isoformat()
     
-    data.append(item)
-    save_json(collection_name, data)
+    key = item['id']
+    if key in records:
+        entry['has_duplicates'] = True
+        key = object()
+    records[key] = _freeze(dict(item))
+    _reindex(entry, key, None, records[key])
+    _commit(collection_name, entry, [['put', records[key]]] if key == item['id'] else None)
     
     logger.info(f"Yeni kayıt eklendi: {collection_name} #{item['id']}")
     return item
 
 
+def insert_many(collection_name: str, items: list) -> list:
+    """
+    Birden fazla kaydı tek yükleme ve tek yazma ile ekler.
+    ID'siz kayıtlar için ID bloğu tek seferde ayrılır (bkz. reserve_ids).
+    
+    Args:
+        collection_name: Koleksiyon adı
+        items: Eklenecek kayıtlar (id otomatik atanır)
+    
+    Returns:
+        list: Eklenen kayıtlar (id ile birlikte)
+    """
+    if _backend is not None:
+        return _backend.insert_many(collection_name, items)
+    
+    if _is_partitioned(collection_name):
+        with transaction():
+            for name, group in _group_by_partition(collection_name, items).items():
+                insert_many(name, group)
+                _partition_routes.update(((collection_name, item['id']), name) for item in group)
+        return items
+    
+    if not items:
+        return []
+    
+    entry = _get_entry_for_write(collection_name)
+    records = entry['records']
+    
+    missing = sum(1 for item in items if 'id' not in item)
+    new_ids = iter(reserve_ids(_base_name(collection_name), missing)) if missing else iter(())
+    now = datetime.now().isoformat()
+    ops = []
+    
+    for item in items:
+        if 'id' not in item:
+            item['id'] = next(new_ids)
+            if item['id'] in records:
+                item['id'] = _skip_used_ids(_base_name(collection_name), records)
+        
+        if 'created_at' not in item:
+            item['created_at'] = now
+        
+        key = item['id']
+        if key in records:
+            entry['has_duplicates'] = True
+            key = object()
+        records[key] = _freeze(dict(item))
+        _reindex(entry, key, None, records[key])
+        if ops is not None and key == item['id']:
+            ops.append(['put', records[key]])
+        else:
+            ops = None
+    
+    _commit(collection_name, entry, ops)
+    
+    logger.info(f"{len(items)} kayıt eklendi: {collection_name}")
+    return items
+
+
 def update(collection_name: str, item_id: int, updates: dict) -> dict | None:
     """
     Mevcut kaydı günceller.
@@ -561,20 +1722,79 @@ def update(collection_name: str, item_id: int, updates: dict) -> dict | None:
     Returns:
         dict | None: Güncellenen kayıt veya None
     """
-    data = load_json(collection_name)
-    
-    for i, item in enumerate(data):
-        if item.get('id') == item_id:
-            data[i].update(updates)
-            data[i]['updated_at'] = datetime.now().isoformat()
-            save_json(collection_name, data)
-            logger.info(f"Kayıt güncellendi: {collection_name} #{item_id}")
-            return data[i]
+    if _backend is not None:
+        return _backend.update(collection_name, item_id, updates)
+    
+    if _is_partitioned(collection_name):
+        name, item = _locate(collection_name, item_id)
+        if item is None:
+            logger.warning(f"Güncellenecek kayıt bulunamadı: {collection_name} #{item_id}")
+            return None
+        _check_partition(collection_name, name, item, updates)
+        return update(name, item_id, updates)
+    
+    entry = _get_entry_for_write(collection_name)
+    records = entry['records']
+    item = find_by_id(collection_name, item_id)
+    
+    if item is not None:
+        records[item_id] = _freeze({**item, **updates, 'updated_at': datetime.now().isoformat()})
+        _reindex(entry, item_id, item, records[item_id])
+        _commit(collection_name, entry, [['put', records[item_id]]])
+        logger.info(f"Kayıt güncellendi: {collection_name} #{item_id}")
+        return records[item_id]
     
     logger.warning(f"Güncellenecek kayıt bulunamadı: {collection_name} #{item_id}")
     return None
 
 
+def update_many(collection_name: str, updates_by_id: dict) -> list:
+    """
+    Birden fazla kaydı tek yükleme ve tek yazma ile günceller.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        updates_by_id: {kayıt ID'si: güncellenecek alanlar}
+    
+    Returns:
+        list: Güncellenen kayıtlar (bulunamayan ID'ler atlanır)
+    """
+    if _backend is not None:
+        return _backend.update_many(collection_name, updates_by_id)
+    
+    if _is_partitioned(collection_name):
+        groups = {}
+        for item_id, updates in updates_by_id.items():
+            name, item = _locate(collection_name, item_id)
+            if item is None:
+                logger.warning(f"Güncellenecek kayıt bulunamadı: {collection_name} #{item_id}")
+                continue
+            _check_partition(collection_name, name, item, updates)
+            groups.setdefault(name, {})[item_id] = updates
+        with transaction():
+            return [record for name, group in groups.items() for record in update_many(name, group)]
+    
+    entry = _get_entry_for_write(collection_name)
+    records = entry['records']
+    now = datetime.now().isoformat()
+    ops = []
+    
+    for item_id, updates in updates_by_id.items():
+        item = records.get(item_id)
+        if item is None:
+            logger.warning(f"Güncellenecek kayıt bulunamadı: {collection_name} #{item_id}")
+            continue
+        records[item_id] = _freeze({**item, **updates, 'updated_at': now})
+        _reindex(entry, item_id, item, records[item_id])
+        ops.append(['put', records[item_id]])
+    
+    if ops:
+        _commit(collection_name, entry, ops)
+        logger.info(f"{len(ops)} kayıt güncellendi: {collection_name}")
+    
+    return [record for _, record in ops]
+
+
 def delete(collection_name: str, item_id: int) -> bool:
     """
     Kaydı siler.
@@ -586,13 +1806,27 @@ def delete(collection_name: str, item_id: int) -> bool:
     Returns:
         bool: Başarılı ise True
     """
-    data = load_json(collection_name)
-    original_length = len(data)
-    
-    data = [item for item in data if item.get('id') != item_id]
-    
-    if len(data) < original_length:
-        save_json(collection_name, data)
+    if _backend is not None:
+        return _backend.delete(collection_name, item_id)
+    
+    if _is_partitioned(collection_name):
+        name, item = _locate(collection_name, item_id)
+        if item is None:
+            logger.warning(f"Silinecek kayıt bulunamadı: {collection_name} #{item_id}")
+            return False
+        _partition_routes.pop((collection_name, item_id), None)
+        return delete(name, item_id)
+    
+    entry = _get_entry_for_write(collection_name)
+    
+    if entry['has_duplicates']:
+        return delete_by_field(collection_name, 'id', item_id) > 0
+    
+    item = find_by_id(collection_name, item_id)
+    if item is not None:
+        del entry['records'][item_id]
+        _reindex(entry, item_id, item, None)
+        _commit(collection_name, entry, [['del', item_id]])
         logger.info(f"Kayıt silindi: {collection_name} #{item_id}")
         return True
     
@@ -612,19 +1846,575 @@ def delete_by_field(collection_name: str, field: str, value) -> int:
     Returns:
         int: Silinen kayıt sayısı
     """
-    data = load_json(collection_name)
-    original_length = len(data)
+    if _backend is not None:
+        return _backend.delete_by_field(collection_name, field, value)
+    
+    if _is_partitioned(collection_name):
+        with transaction():
+            return sum(delete_by_field(name, field, value) for name in _query_partitions(collection_name, field, value))
+    
+    entry = _get_entry_for_write(collection_name)
+    records = entry['records']
     
-    data = [item for item in data if item.get(field) != value]
-    deleted_count = original_length - len(data)
+    keys = _lookup_keys(collection_name, entry, field, value)
+    if keys is None:
+        keys = [key for key, item in records.items() if item.get(field) == value]
+    
+    ops = []
+    for key in keys:
+        _reindex(entry, key, records.pop(key), None)
+        if ops is not None and isinstance(key, (int, str)):
+            ops.append(['del', key])
+        else:
+            ops = None
+    deleted_count = len(keys)
     
     if deleted_count > 0:
-        save_json(collection_name, data)
+        _commit(collection_name, entry, ops)
         logger.info(f"{deleted_count} kayıt silindi: {collection_name} ({field}={value})")
     
     return deleted_count
 
 
+def delete_where(collection_name: str, predicate=None, field: str = None, values=None) -> int:
+    """
+    Koşula uyan tüm kayıtları tek yükleme ve tek yazma ile siler.
+    
+    Koşul ya bir fonksiyon (predicate(kayıt) -> bool) ya da alan ve değer
+    kümesi (field, values) olarak verilir. Alan indeksliyse kayıtlar
+    taranmadan indeksten bulunur.
+    
+    Kullanım:
+        delete_where('reviews', lambda r: r['quality'] < 2)
+        delete_where('srs_state', field='card_id', values={3, 5, 8})
+    
+    Args:
+        collection_name: Koleksiyon adı
+        predicate: Silinecek kayıtlar için True dönen fonksiyon
+        field: Alan adı (values ile birlikte)
+        values: Silinecek alan değerleri
+    
+    Returns:
+        int: Silinen kayıt sayısı
+    """
+    if _backend is not None:
+        return _backend.delete_where(collection_name, predicate, field, values)
+    
+    if (predicate is None) == (field is None):
+        raise ValueError("delete_where için predicate veya field/values verilmelidir.")
+    
+    if _is_partitioned(collection_name):
+        with transaction():
+            return sum(delete_where(name, predicate, field, values) for name in list_partitions(collection_name))
+    
+    entry = _get_entry_for_write(collection_name)
+    records = entry['records']
+    
+    keys = None
+    if field is not None:
+        values = set(values)
+        if field == 'id' and not entry['has_duplicates']:
+            keys = [value for value in values if value in records]
+        else:
+            index = _get_index(collection_name, entry, field)
+            if index is not None:
+                keys = {key: None for value in values for key in index.get(value, ())}
+        if keys is None:
+            keys = [key for key, item in records.items() if item.get(field) in values]
+    else:
+        keys = [key for key, item in records.items() if predicate(item)]
+    
+    ops = []
+    for key in keys:
+        _reindex(entry, key, records.pop(key), None)
+        if ops is not None and isinstance(key, (int, str)):
+            ops.append(['del', key])
+        else:
+            ops = None
+    deleted_count = len(keys)
+    
+    if deleted_count > 0:
+        _commit(collection_name, entry, ops)
+        logger.info(f"{deleted_count} kayıt silindi: {collection_name}")
+    
+    return deleted_count
+
+
+def _child_ids(collection_name: str, field: str, parent_ids: set) -> set:
+    """
+    field değeri parent_ids içinde olan kayıtların ID'lerini döndürür.
+    Alan indeksliyse indeksten, değilse koleksiyonun tek taramasıyla bulunur.
+    """
+    return {item['id'] for item in find_all_in(collection_name, field, parent_ids)}
+
+
+def cascade_delete(collection_name: str, ids, dry_run: bool = False) -> dict:
+    """
+    Kayıtları ve CASCADES ilişkileriyle bağlı tüm alt kayıtları siler.
+    
+    Alt kayıtlar her seviyede üst ID kümesiyle toplu olarak bulunur; silme
+    tek transaction içinde koleksiyon başına tek delete_where ile yapılır.
+    Bir kayda birden fazla yoldan ulaşılsa da (ör. users -> srs_state ve
+    users -> decks -> cards -> srs_state) bir kez sayılır.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        ids: Silinecek kayıt ID'leri
+        dry_run: True ise hiçbir şey silinmez, sadece sayılar döner
+    
+    Returns:
+        dict: {koleksiyon: silinen (dry_run'da silinecek) kayıt sayısı}
+    """
+    targets = {}
+    queue = [(collection_name, {i for i in ids if find_by_id(collection_name, i) is not None})]
+    
+    while queue:
+        name, new_ids = queue.pop(0)
+        new_ids -= targets.setdefault(name, set())
+        if not new_ids:
+            continue
+        targets[name] |= new_ids
+        for child_name, field in CASCADES.get(name, []):
+            queue.append((child_name, _child_ids(child_name, field, new_ids)))
+    
+    if dry_run:
+        return {name: len(target_ids) for name, target_ids in targets.items()}
+    
+    counts = {}
+    with transaction():
+        for name, target_ids in targets.items():
+            counts[name] = delete_where(name, field='id', values=target_ids) if target_ids else 0
+    
+    logger.info(f"Cascade silme ({collection_name} {sorted(targets[collection_name])}): {counts}")
+    return counts
+
+
+def _is_partitioned(collection_name: str) -> bool:
+    """Koleksiyon birden fazla dosyaya (kullanıcı shard'ı ve/veya zaman segmenti) bölünüyor mu."""
+    return collection_name in SEGMENTS or (_sharding and collection_name in SHARD_KEYS)
+
+
+def _partition_name(collection_name: str, shard=None, segment: str = None) -> str:
+    """
+    Bölüm adını oluşturur ('reviews', 7, '2026-10' -> 'reviews@7#2026-10').
+    Shard'sız ve segmentsiz bölüm (koleksiyonun ana dosyası) 'reviews#' olarak
+    adlandırılır; böylece bölünmüş koleksiyonun adından ayrılır.
+    """
+    if shard is None and segment is None:
+        return f"{collection_name}#"
+    name = collection_name
+    if shard is not None:
+        name += f"@{shard}"
+    if segment is not None:
+        name += f"#{segment}"
+    return name
+
+
+def _shard_sort_key(shard: str) -> tuple:
+    """Shard'ları sayısal sırayla dolaşmak için anahtar."""
+    return (0, int(shard), '') if shard.isdigit() else (1, 0, shard)
+
+
+def _partition_sort_key(name: str) -> tuple:
+    """Bölümleri shard'a, sonra zamana göre sıralamak için anahtar (segmentsiz dosya önce)."""
+    _, shard, segment = _split_name(name)
+    return _shard_sort_key(shard or ''), segment or ''
+
+
+def list_partitions(collection_name: str, shard=None) -> list:
+    """
+    Koleksiyonun diskte (veya açık transaction'da) bulunan bölümlerini listeler.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        shard: Verilirse sadece bu kullanıcının bölümleri
+    
+    Returns:
+        list: Bölüm adları ('reviews@7#2026-10'), shard ve zaman sırasıyla
+    """
+    file_name = FILES[collection_name]
+    sharded = _sharding and collection_name in SHARD_KEYS
+    
+    if not sharded:
+        roots = [(None, DATA_DIR)]
+    elif shard is not None:
+        roots = [(str(shard), DATA_DIR / SHARD_DIR / str(shard))]
+    else:
+        shard_root = DATA_DIR / SHARD_DIR
+        roots = [(path.name, path) for path in shard_root.iterdir()] if shard_root.is_dir() else []
+    
+    names = set()
+    for root_shard, root in roots:
+        file_path = root / file_name
+        if file_path.exists() or file_path.with_suffix('.journal').exists():
+            names.add(_partition_name(collection_name, root_shard))
+        
+        segment_dir = root / collection_name
+        if collection_name in SEGMENTS and segment_dir.is_dir():
+            for path in segment_dir.iterdir():
+                if path.suffix in (file_path.suffix, '.journal') and _SEGMENT_PATTERN.fullmatch(path.stem):
+                    names.add(_partition_name(collection_name, root_shard, path.stem))
+    
+    if _transaction is not None:
+        for name in _transaction['entries']:
+            base_name, name_shard, _ = _split_name(name)
+            if base_name == collection_name and (name_shard is not None) == sharded:
+                if shard is None or name_shard == str(shard):
+                    names.add(name)
+    
+    return sorted(names, key=_partition_sort_key)
+
+
+def list_shards(collection_name: str) -> list:
+    """
+    Koleksiyonun verisi bulunan kullanıcı shard'larını listeler.
+    
+    Args:
+        collection_name: Koleksiyon adı
+    
+    Returns:
+        list: Shard adları (kullanıcı ID'leri, metin olarak)
+    """
+    shards = {_split_name(name)[1] for name in list_partitions(collection_name)}
+    return sorted(shards - {None}, key=_shard_sort_key)
+
+
+def _physical_names(collection_name: str) -> list:
+    """Koleksiyonun okunacak dosyalarına karşılık gelen adlar (bölünmüyorsa kendisi)."""
+    if _is_partitioned(collection_name):
+        return list_partitions(collection_name)
+    return [collection_name]
+
+
+def _deck_owner(deck_id) -> int | None:
+    """Deck'in sahibinin ID'sini döndürür (kartların shard'ı)."""
+    deck = find_by_id('decks', deck_id)
+    return deck.get('user_id') if deck is not None else None
+
+
+def _shard_of_item(collection_name: str, item: dict, owners: dict = None) -> str:
+    """
+    Kaydın yazılacağı shard'ı belirler.
+    
+    Args:
+        collection_name: Koleksiyon adı
+        item: Kayıt
+        owners: deck_id -> sahip önbelleği (toplu işlemler için)
+    
+    Returns:
+        str: Shard adı
+    
+    Raises:
+        ValueError: Kayıtta shard anahtarı yoksa veya deck bulunamazsa
+    """
+    key = SHARD_KEYS[collection_name]
+    if collection_name == 'cards':
+        deck_id = item.get(key)
+        if owners is None or deck_id not in owners:
+            owner = _deck_owner(deck_id)
+            if owners is not None:
+                owners[deck_id] = owner
+        else:
+            owner = owners[deck_id]
+    else:
+        owner = item.get(key)
+    
+    if owner is None:
+        raise ValueError(f"Shard belirlenemedi: {collection_name} kaydında geçerli {key} yok")
+    return str(owner)
+
+
+def _segment_of(collection_name: str, item: dict) -> str | None:
+    """Kaydın zaman segmentini (YYYY-AA) döndürür; zaman alanı yoksa None."""
+    value = item.get(SEGMENTS[collection_name])
+    if isinstance(value, str) and _SEGMENT_PATTERN.match(value):
+        return value[:7]
+    return None
+
+
+def _partition_of_item(collection_name: str, item: dict, owners: dict = None) -> str:
+    """Kaydın yazılacağı bölümün adını döndürür (bkz. _shard_of_item, _segment_of)."""
+    shard = _shard_of_item(collection_name, item, owners) if _sharding and collection_name in SHARD_KEYS else None
+    segment = _segment_of(collection_name, item) if collection_name in SEGMENTS else None
+    return _partition_name(collection_name, shard, segment)
+
+
+def _group_by_partition(collection_name: str, items: list) -> dict:
+    """Kayıtları bölümlerine göre gruplar: {bölüm adı: [kayıt, ...]}."""
+    owners = {}
+    groups = {}
+    for item in items:
+        groups.setdefault(_partition_of_item(collection_name, item, owners), []).append(item)
+    return groups
+
+
+def _query_partitions(collection_name: str, field: str, value) -> list:
+    """
+    Alan sorgusunun bakması gereken bölümleri döndürür. Sharding açıkken sorgu
+    shard anahtarı üzerindeyse (user_id, kartlar için deck_id) sadece o kullanıcının
+    bölümlerine gider, değilse tüm bölümler taranır.
+    """
+    if _sharding and field == SHARD_KEYS.get(collection_name):
+        owner = _deck_owner(value) if collection_name == 'cards' else value
+        if owner is None:
+            return []
+        return list_partitions(collection_name, owner)
+    return list_partitions(collection_name)
+
+
+def _locate(collection_name: str, item_id) -> tuple[str | None, dict | None]:
+    """
+    ID'si verilen kaydın bölümünü bulur. Önce yönlendirme önbelleğine,
+    bulunamazsa tüm bölümlere bakılır.
+    
+    Returns:
+        tuple: (Bölüm adı, Kayıt) veya (None, None)
+    """
+    try:
+        name = _partition_routes.get((collection_name, item_id))
+    except TypeError:
+        return None, None
+    
+    if name is not None:
+        item = find_by_id(name, item_id)
+        if item is not None:
+            return name, item
+    
+    for name in list_partitions(collection_name):
+        item = find_by_id(name, item_id)
+        if item is not None:
+            _partition_routes[(collection_name, item_id)] = name
+            return name, item
+    return None, None
+
+
+def _check_partition(collection_name: str, name: str, item: dict, updates: dict):
+    """Güncelleme kaydı başka bir bölüme (kullanıcı veya ay) taşıyacaksa hata verir."""
+    keys = [SHARD_KEYS.get(collection_name), SEGMENTS.get(collection_name)]
+    if any(key in updates and updates[key] != item.get(key) for key in keys if key):
+        if _partition_of_item(collection_name, {**item, **updates}) != name:
+            raise ValueError(f"Kayıt başka bir bölüme taşınamaz: {collection_name} #{item['id']}")
+
+
+def _range_filter(collection_name: str, since: str | None, until: str | None, where=None):
+    """Zaman alanı [since, until) aralığında olan kayıtları seçen filtreyi döndürür."""
+    field = SEGMENTS.get(_base_name(collection_name))
+    if field is None:
+        raise ValueError(f"Zaman aralığı desteklenmiyor: {collection_name}")
+    
+    def in_range(item):
+        value = item.get(field)
+        if not isinstance(value, str):
+            return False
+        if (since is not None and value < since) or (until is not None and value >= until):
+            return False
+        return where is None or where(item)
+    
+    return in_range
+
+
+def _segment_bounds(segment: str) -> tuple[str, str]:
+    """Segmentin kapsadığı [başlangıç, bitiş) aralığı ('2026-12' -> ('2026-12', '2027-01'))."""
+    year, month = int(segment[:4]), int(segment[5:7])
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return segment, f"{year:04d}-{month:02d}"
+
+
+def _segments_in_range(collection_name: str, since: str | None, until: str | None) -> list:
+    """
+    Zaman aralığıyla kesişebilecek bölümleri döndürür. Segmentler önce ay
+    sınırlarına, güncel min/max bilgisi varsa ona göre elenir; segmentsiz
+    (eski) dosya her zaman dahildir.
+    """
+    names = []
+    for name in list_partitions(collection_name):
+        segment = _split_name(name)[2]
+        if segment is not None:
+            start, end = _segment_bounds(segment)
+            if (since is not None and since >= end) or (until is not None and until <= start):
+                continue
+            info = _segment_info(name, compute=False)
+            if info is not None and (
+                info['min'] is None
+                or (since is not None and info['max'] < since)
+                or (until is not None and info['min'] >= until)
+            ):
+                continue
+        names.append(name)
+    return names
+
+
+def _load_segment_meta() -> dict:
+    """Segment bilgi dosyasını (bir kez) yükler."""
+    global _segment_meta
+    
+    if _segment_meta is None:
+        try:
+            with open(DATA_DIR / SEGMENT_META_FILE, 'r', encoding='utf-8') as f:
+                _segment_meta = json.load(f)
+        except (OSError, ValueError):
+            _segment_meta = {}
+    return _segment_meta
+
+
+def _save_segment_meta():
+    """Segment bilgi dosyasını atomic write ile yazar."""
+    meta_path = DATA_DIR / SEGMENT_META_FILE
+    temp_path = meta_path.with_suffix('.tmp')
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(_segment_meta, f, ensure_ascii=False)
+        os.replace(temp_path, meta_path)
+    except OSError as e:
+        logger.warning(f"Segment bilgisi yazılamadı: {e}")
+
+
+def _segment_info(name: str, compute: bool = True) -> dict | None:
+    """
+    Segmentin {signature, min, max, count} bilgisini döndürür.
+    
+    Bilgi dosya imzasıyla birlikte data/segments.json'da tutulur ve segment
+    değiştiyse yeniden hesaplanır. compute=False iken segment önbellekte değilse
+    hesaplanmaz (None döner); sorgu zaten segmenti okuyacağı için iki kez okunmaz.
+    """
+    meta = _load_segment_meta()
+    file_path = get_file_path(name)
+    if _transaction is not None and name in _transaction['entries']:
+        return None
+    
+    signature = _collection_signature(file_path)
+    if signature is None:
+        return None
+    signature = json.loads(json.dumps(signature))
+    info = meta.get(name)
+    if info is not None and info['signature'] == signature:
+        return info
+    
+    cached = _cache.get(file_path)
+    if cached is not None and json.loads(json.dumps(cached['signature'])) == signature:
+        items = cached['records'].values()
+    elif compute:
+        items = iter_collection(name)
+    else:
+        return None
+    
+    field = SEGMENTS[_base_name(name)]
+    values = [item.get(field) for item in items]
+    timestamps = [value for value in values if isinstance(value, str)]
+    info = {
+        'signature': signature,
+        'min': min(timestamps) if timestamps else None,
+        'max': max(timestamps) if timestamps else None,
+        'count': len(values)
+    }
+    meta[name] = info
+    _save_segment_meta()
+    return info
+
+
+def get_segments(collection_name: str) -> list:
+    """
+    Koleksiyonun zaman segmentlerini ve min/max zaman bilgilerini döndürür.
+    
+    Args:
+        collection_name: Koleksiyon adı (SEGMENTS içinde olmalı)
+    
+    Returns:
+        list: [{'name', 'segment', 'min', 'max', 'count'}, ...] zaman sırasıyla
+    """
+    result = []
+    for name in list_partitions(collection_name):
+        segment = _split_name(name)[2]
+        if segment is None:
+            continue
+        info = _segment_info(name)
+        if info is not None:
+            result.append({
+                'name': name,
+                'segment': segment,
+                'min': info['min'],
+                'max': info['max'],
+                'count': info['count']
+            })
+    return result
+
+
+def set_sharding(enabled: bool = True):
+    """
+    Kullanıcı bazlı sharding modunu açar/kapatır.
+    
+    Açıkken SHARD_KEYS içindeki koleksiyonlar data/users/<user_id>/ altında
+    ayrı dosyalarda tutulur; bir kullanıcının yazması sadece kendi dosyasını
+    yeniden yazar. Kayıtlar user_id (kartlar için deck'in sahibi) ile yönlendirilir,
+    shard anahtarı içermeyen sorgular tüm shard'ları tarar. Mevcut tek dosyalı
+    veriyi taşımak için migrate_to_shards() kullanılır.
+    
+    Args:
+        enabled: True ise sharding açılır
+    """
+    global _sharding
+    
+    _sharding = enabled
+    _partition_routes.clear()
+    logger.debug(f"Sharding {'açıldı' if enabled else 'kapatıldı'}")
+
+
+def migrate_to_shards() -> dict:
+    """
+    Tek dosyadaki kullanıcı koleksiyonlarını shard'lara dağıtır ve tek dosyaları siler.
+    Kartların yönlendirmesi deck'lere dayandığı için deck'ler önce taşınır.
+    
+    Returns:
+        dict: Koleksiyon -> taşınan kayıt sayısı
+    """
+    counts = {}
+    set_sharding(False)
+    sources = {collection_name: _physical_names(collection_name) for collection_name in SHARD_KEYS}
+    set_sharding(True)
+    for collection_name, names in sources.items():
+        items = [item for name in names for item in _get_entry(name)['records'].values()]
+        if not save_json(collection_name, items):
+            raise RuntimeError(f"Shard'lara taşıma başarısız: {collection_name}")
+        
+        for name in names:
+            file_path = get_file_path(name)
+            for path in [file_path, file_path.with_suffix('.journal'), file_path.with_suffix('.idx')]:
+                path.unlink(missing_ok=True)
+            _cache.pop(file_path, None)
+        counts[collection_name] = len(items)
+        logger.info(f"Shard'lara taşındı: {collection_name} ({len(items)} kayıt)")
+    return counts
+
+
+def set_backend(name: str):
+    """
+    Depolama arka ucunu seçer.
+    
+    Args:
+        name: 'json' (varsayılan, data/*.json dosyaları) veya 'sqlite' (data/studybuddy.db)
+    """
+    global _backend
+    
+    if name == 'json':
+        _backend = None
+    elif name == 'sqlite':
+        import sqlite_storage
+        _backend = sqlite_storage
+    else:
+        raise ValueError(f"Bilinmeyen depolama arka ucu: {name}")
+    logger.debug(f"Depolama arka ucu: {name}")
+
+
+def get_backend() -> str:
+    """
+    Etkin depolama arka ucunun adını döndürür.
+    
+    Returns:
+        str: 'json' veya 'sqlite'
+    """
+    return 'json' if _backend is None else 'sqlite'
+
+
 def get_current_datetime() -> str:
     """
     Şu anki tarih/saati ISO formatında döndürür.
@@ -646,4 +2436,6 @@ def get_current_date() -> str:
 
 
 ensure_data_dir()
->>>>>>> 49319f5dfc84fb8c02a88209b4cff51a53bda568
+recover_transaction()
+set_backend(os.environ.get('STUDYBUDDY_BACKEND', 'json'))
+set_sharding(os.environ.get('STUDYBUDDY_SHARDED') == '1')
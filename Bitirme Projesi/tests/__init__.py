@@ -1,5 +1 @@
-<<<<<<< HEAD
 
-=======
-
->>>>>>> 49319f5dfc84fb8c02a88209b4cff51a53bda568
@@ -113,7 +113,7 @@ class TestDeck(unittest.TestCase):
         """Her test öncesi kullanıcı oluştur ve giriş yap."""
         from auth import register, login, logout, _current_session
         import storage
-                
+        
         _current_session['user_id'] = None
         _current_session['email'] = None
         _current_session['logged_in'] = False
@@ -398,45 +398,67 @@ class TestAtomicWrite(unittest.TestCase):
         self.assertEqual(loaded_data[2]['name'], "Türkçe karakterler: ğüşıöç")
 
 
-class TestSM2Algorithm(unittest.TestCase):
-    """SM-2 algoritması testi."""
+
+class TestStorageCache(unittest.TestCase):
+    """Koleksiyon önbelleği testleri."""
     
-    def test_sm2_quality_zero(self):
-        """Kalite 0 ise repetition sıfırlanır."""
-        from review_service import calculate_sm2
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.clear_cache()
+        storage.save_json('decks', [{"id": 1, "user_id": 1, "name": "Cache"}])
+    
+    def test_cache_hit_after_write_through(self):
+        """save_json sonrası okuma dosyayı yeniden parse etmez."""
+        import storage
         
-        rep, ef, interval = calculate_sm2(0, 3, 2.5, 10)
+        storage.load_json('decks')
+        storage.find_by_id('decks', 1)
         
-        self.assertEqual(rep, 0)
-        self.assertEqual(interval, 1)
+        stats = storage.get_cache_stats()
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['hits'], 2)
     
-    def test_sm2_quality_five(self):
-        """Kalite 5 ise interval artar."""
-        from review_service import calculate_sm2
+    def test_external_change_invalidates(self):
+        """Dosya dışarıdan değişirse önbellek yenilenir."""
+        import storage
         
-        rep, ef, interval = calculate_sm2(5, 0, 2.5, 1)
-        self.assertEqual(rep, 1)
-        self.assertEqual(interval, 1)
+        storage.load_json('decks')
         
-        rep, ef, interval = calculate_sm2(5, 1, ef, 1)
-        self.assertEqual(rep, 2)
-        self.assertEqual(interval, 6)
+        file_path = storage.get_file_path('decks')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump([{"id": 1, "user_id": 1, "name": "Dışarıdan değişti"}], f)
         
-        rep, ef, interval = calculate_sm2(5, 2, ef, 6)
-        self.assertEqual(rep, 3)
-        self.assertGreater(interval, 6)
+        deck = storage.find_by_id('decks', 1)
+        self.assertEqual(deck['name'], "Dışarıdan değişti")
+        self.assertEqual(storage.get_cache_stats()['misses'], 1)
     
-    def test_sm2_ef_minimum(self):
-        """EF minimum 1.3 olmalı."""
-        from review_service import calculate_sm2
+    def test_records_are_read_only(self):
+        """Dönen kayıtlar değiştirilemez, önbellek bozulmaz."""
+        import storage
         
-        rep, ef, interval = calculate_sm2(0, 3, 1.5, 10)
+        decks = storage.load_json('decks')
+        with self.assertRaises(TypeError):
+            decks[0]['name'] = "Bozuk"
         
-        self.assertGreaterEqual(ef, 1.3)
+        decks.append({"id": 2})
+        copy = dict(decks[0])
+        copy['name'] = "Kopya"
+        
+        self.assertEqual(len(storage.load_json('decks')), 1)
+        self.assertEqual(storage.find_by_id('decks', 1)['name'], "Cache")
 
 
-class TestBackupService(unittest.TestCase):
-    """Yedekleme servisi testleri."""
+
+class TestPrimaryKeyIndex(unittest.TestCase):
+    """id indeksi üzerinden yapılan nokta okuma/yazma testleri."""
     
     @classmethod
     def setUpClass(cls):
@@ -445,52 +467,2097 @@ class TestBackupService(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         cleanup_test_environment()
-        backup_dir = Path(__file__).parent / "test_backups"
-        if backup_dir.exists():
-            shutil.rmtree(backup_dir)
     
     def setUp(self):
-        """Test ortamını hazırla."""
         import storage
-        import backup_service
+        storage.save_json('cards', [
+            {"id": 1, "deck_id": 1, "front": "Q1"},
+            {"id": 2, "deck_id": 1, "front": "Q2"},
+            {"id": 3, "deck_id": 2, "front": "Q3"}
+        ])
+    
+    def test_point_operations_keep_order(self):
+        """insert/update/delete sonrası id araması ve kayıt sırası doğru kalır."""
+        import storage
         
-        backup_service.DATA_DIR = TEST_DATA_DIR
-        backup_service.BACKUP_DIR = Path(__file__).parent / "test_backups"
+        new_id = storage.insert('cards', {"deck_id": 2, "front": "Q4"})['id']
+        storage.update('cards', 2, {"front": "Q2 yeni"})
+        self.assertTrue(storage.delete('cards', 1))
+        
+        self.assertIsNone(storage.find_by_id('cards', 1))
+        self.assertEqual(storage.find_by_id('cards', 2)['front'], "Q2 yeni")
+        self.assertEqual(storage.find_by_id('cards', new_id)['front'], "Q4")
+        self.assertEqual([c['id'] for c in storage.load_json('cards')], [2, 3, new_id])
+        
+        storage.clear_cache()
+        self.assertEqual([c['id'] for c in storage.load_json('cards')], [2, 3, new_id])
+    
+    def test_duplicate_ids(self):
+        """Tekrarlanan id'lerde ilk kayıt bulunur, silme hepsini kaldırır."""
+        import storage
         
         storage.save_json('cards', [
-            {"id": 1, "front": "Test", "back": "Answer"}
+            {"id": 7, "front": "ilk"},
+            {"id": 7, "front": "ikinci"}
+        ])
+        
+        self.assertEqual(storage.find_by_id('cards', 7)['front'], "ilk")
+        self.assertTrue(storage.delete('cards', 7))
+        self.assertEqual(storage.load_json('cards'), [])
+
+
+
+class TestSecondaryIndex(unittest.TestCase):
+    """İkincil indeks testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.save_json('cards', [
+            {"id": 1, "deck_id": 1, "front": "Q1"},
+            {"id": 2, "deck_id": 2, "front": "Q2"},
+            {"id": 3, "deck_id": 1, "front": "Q3"}
         ])
     
-    def test_create_backup(self):
-        """Yedek oluşturma testi."""
-        from backup_service import create_backup, BACKUP_DIR
+    def test_index_maintained_on_writes(self):
+        """Yazmalardan sonra indeksli sorgular taramayla aynı sonucu verir."""
+        import storage
         
-        success, msg = create_backup()
+        self.assertEqual([c['id'] for c in storage.find_all_by_field('cards', 'deck_id', 1)], [1, 3])
         
-        self.assertTrue(success)
-        self.assertIn("Yedek oluşturuldu", msg)
+        new_id = storage.insert('cards', {"deck_id": 1, "front": "Q4"})['id']
+        storage.update('cards', 2, {"deck_id": 1})
+        storage.delete('cards', 1)
         
-        self.assertTrue(BACKUP_DIR.exists())
+        self.assertEqual(
+            sorted(c['id'] for c in storage.find_all_by_field('cards', 'deck_id', 1)),
+            [2, 3, new_id]
+        )
+        self.assertIsNone(storage.find_by_field('cards', 'deck_id', 2))
+        
+        self.assertEqual(storage.delete_by_field('cards', 'deck_id', 1), 3)
+        self.assertEqual(storage.find_all_by_field('cards', 'deck_id', 1), [])
+        self.assertEqual(storage.load_json('cards'), [])
     
-    def test_list_backups(self):
-        """Yedek listeleme testi."""
-        from backup_service import create_backup, list_backups
+    def test_list_and_create_index(self):
+        """Yeni indeks tanımlanabilir ve boyutu listelenir."""
+        import storage
         
-        create_backup()
+        storage.create_index('cards', 'front')
+        try:
+            self.assertEqual(storage.find_by_field('cards', 'front', "Q2")['id'], 2)
+            
+            info = next(i for i in storage.list_indexes()
+                        if i['collection'] == 'cards' and i['field'] == 'front')
+            self.assertEqual(info['keys'], 3)
+            self.assertEqual(info['entries'], 3)
+        finally:
+            storage.drop_index('cards', 'front')
+
+
+
+class TestJournal(unittest.TestCase):
+    """Append-only journal modu testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        import storage
+        storage.set_journal_mode('reviews', False)
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.set_journal_mode('reviews', False)
+        storage.save_json('reviews', [{"id": 1, "user_id": 1, "card_id": 1, "quality": 3}])
+        storage.set_journal_mode('reviews', True)
+    
+    def test_writes_append_to_journal(self):
+        """Yazmalar snapshot'ı değiştirmez, okuma snapshot + journal'ı birleştirir."""
+        import storage
         
-        success, msg, backups = list_backups()
+        snapshot_before = storage.get_file_path('reviews').read_bytes()
+        
+        kept = storage.insert('reviews', {"user_id": 1, "card_id": 2, "quality": 5})
+        storage.update('reviews', 1, {"quality": 4})
+        removed = storage.insert('reviews', {"user_id": 2, "card_id": 3, "quality": 1})
+        storage.delete('reviews', removed['id'])
+        
+        self.assertEqual(storage.get_file_path('reviews').read_bytes(), snapshot_before)
+        self.assertTrue(storage.get_journal_path('reviews').exists())
+        
+        storage.clear_cache()
+        reviews = storage.load_json('reviews')
+        self.assertEqual([r['id'] for r in reviews], [1, kept['id']])
+        self.assertEqual(reviews[0]['quality'], 4)
+        
+        self.assertTrue(storage.compact('reviews'))
+        self.assertFalse(storage.get_journal_path('reviews').exists())
+        with open(storage.get_file_path('reviews'), encoding='utf-8') as f:
+            self.assertEqual([r['id'] for r in json.load(f)], [1, kept['id']])
+    
+    def test_torn_tail_is_discarded(self):
+        """Çökme ile yarım kalan son journal satırı yok sayılır ve kırpılır."""
+        import storage
+        
+        first = storage.insert('reviews', {"user_id": 1, "card_id": 2, "quality": 5})
+        with open(storage.get_journal_path('reviews'), 'a', encoding='utf-8') as f:
+            f.write('{"ops": [["put", {"id": 9')
+        
+        storage.clear_cache()
+        self.assertEqual([r['id'] for r in storage.load_json('reviews')], [1, first['id']])
+        
+        second = storage.insert('reviews', {"user_id": 1, "card_id": 4, "quality": 2})
+        storage.clear_cache()
+        self.assertEqual(
+            [r['id'] for r in storage.load_json('reviews')],
+            [1, first['id'], second['id']]
+        )
+
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    """SQLite arka ucu testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        from auth import _current_session
+        import storage
+        
+        _current_session['user_id'] = None
+        _current_session['email'] = None
+        _current_session['logged_in'] = False
+        
+        storage.set_backend('json')
+        for name in storage.FILES:
+            storage.save_json(name, [])
+        storage.save_json('decks', [{"id": 5, "user_id": 99, "name": "Eski Deck"}])
+    
+    def tearDown(self):
+        import storage
+        import sqlite_storage
+        
+        storage.set_backend('json')
+        sqlite_storage.close()
+        if sqlite_storage.get_db_path().exists():
+            sqlite_storage.get_db_path().unlink()
+    
+    def test_migrate_and_services(self):
+        """JSON verisi aktarılır ve servisler SQLite üzerinde değişmeden çalışır."""
+        import storage
+        import sqlite_storage
+        from auth import register, login
+        from deck_service import create_deck, list_decks, delete_deck
+        from card_service import create_card, list_cards
+        from review_service import submit_review, get_srs_state
+        
+        counts = sqlite_storage.migrate_from_json()
+        self.assertEqual(counts['decks'], 1)
+        
+        storage.set_backend('sqlite')
+        self.assertEqual(storage.find_by_id('decks', 5)['name'], "Eski Deck")
         
+        register("sqlite@example.com", "password123")
+        login("sqlite@example.com", "password123")
+        
+        success, msg, deck = create_deck("SQL Deck", "")
         self.assertTrue(success)
-        self.assertGreater(len(backups), 0)
+        self.assertEqual(deck['id'], 6)
+        
+        success, msg, card = create_card(deck['id'], "Q", "A")
+        self.assertTrue(success)
+        
+        success, msg, srs = submit_review(card['id'], 5)
+        self.assertTrue(success)
+        success, msg, state = get_srs_state(card['id'])
+        self.assertEqual(state['repetition'], 1)
+        
+        success, msg, cards = list_cards(deck['id'])
+        self.assertEqual(len(cards), 1)
+        
+        success, msg, decks = list_decks()
+        self.assertEqual(len(decks), 1)
+        
+        self.assertTrue(delete_deck(deck['id'])[0])
+        self.assertEqual(storage.find_all_by_field('srs_state', 'card_id', card['id']), [])
+        self.assertEqual(storage.find_all_by_field('reviews', 'card_id', card['id']), [])
+        
+        storage.set_backend('json')
+        self.assertEqual(len(storage.load_json('decks')), 1)
     
-    def test_export_csv(self):
-        """CSV dışa aktarma testi."""
-        from backup_service import export_to_csv, BACKUP_DIR
+    def test_migrate_partitioned(self):
+        """Kullanıcı shard'larındaki ve aylık segmentlerdeki kayıtlar da aktarılır."""
+        import storage
+        import sqlite_storage
+        
+        storage.set_sharding(True)
+        try:
+            storage.save_json('decks', [{"id": 1, "user_id": 1, "name": "D1"}, {"id": 2, "user_id": 2, "name": "D2"}])
+            storage.save_json('cards', [{"id": 1, "deck_id": 1, "front": "Q1"}, {"id": 2, "deck_id": 2, "front": "Q2"}])
+            storage.save_json('reviews', [
+                {"id": 1, "user_id": 1, "card_id": 1, "quality": 4, "reviewed_at": "2026-09-15T10:00:00"},
+                {"id": 2, "user_id": 2, "card_id": 2, "quality": 2, "reviewed_at": "2026-10-02T10:00:00"}
+            ])
+            self.assertGreater(len(storage.list_partitions('reviews')), 1)
+            
+            storage.set_backend('sqlite')
+            counts = sqlite_storage.migrate_from_json()
+            self.assertEqual(storage.get_backend(), 'sqlite')
+        finally:
+            storage.set_sharding(False)
+            shutil.rmtree(TEST_DATA_DIR / storage.SHARD_DIR, ignore_errors=True)
+            shutil.rmtree(TEST_DATA_DIR / 'reviews', ignore_errors=True)
+            storage.clear_cache()
+        
+        self.assertEqual((counts['decks'], counts['cards'], counts['reviews']), (2, 2, 2))
+        self.assertEqual([r['quality'] for r in storage.find_all_by_field('reviews', 'user_id', 2)], [2])
+        self.assertEqual(len(storage.load_json('cards')), 2)
+
+
+
+class TestTransaction(unittest.TestCase):
+    """Çoklu koleksiyon transaction testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.save_json('cards', [{"id": 1, "deck_id": 1, "front": "Q1"}])
+        storage.save_json('srs_state', [{"id": 1, "user_id": 1, "card_id": 1}])
+    
+    def test_commit_writes_each_collection_once(self):
+        """Blok içindeki tüm yazmalar koleksiyon başına tek yazmaya iner."""
+        import storage
+        from unittest import mock
+        
+        with mock.patch('storage._dump_snapshot', wraps=storage._dump_snapshot) as dump:
+            with storage.transaction():
+                card = storage.insert('cards', {"deck_id": 1, "front": "Q2"})
+                storage.insert('srs_state', {"user_id": 1, "card_id": card['id']})
+                storage.update('srs_state', 1, {"ef": 2.6})
+                self.assertEqual(storage.find_by_id('cards', card['id'])['front'], "Q2")
+        
+        self.assertEqual(dump.call_count, 2)
+        storage.clear_cache()
+        self.assertEqual(len(storage.load_json('cards')), 2)
+        self.assertEqual(storage.find_by_id('srs_state', 1)['ef'], 2.6)
+    
+    def test_rollback_on_error(self):
+        """Blok hata ile biterse hiçbir değişiklik kaydedilmez."""
+        import storage
         
-        success, msg = export_to_csv()
+        with self.assertRaises(RuntimeError):
+            with storage.transaction():
+                storage.insert('cards', {"deck_id": 1, "front": "Q2"})
+                storage.delete('srs_state', 1)
+                raise RuntimeError("iptal")
+        
+        self.assertEqual(len(storage.load_json('cards')), 1)
+        self.assertIsNotNone(storage.find_by_id('srs_state', 1))
+    
+    def test_recover_interrupted_commit(self):
+        """Commit planı yazıldıktan sonra kesilen transaction kurtarılır."""
+        import storage
+        from unittest import mock
+        
+        with mock.patch('storage._apply_transaction_plan', side_effect=OSError("çökme")):
+            with self.assertRaises(OSError):
+                with storage.transaction():
+                    storage.insert('cards', {"deck_id": 1, "front": "Q2"})
+                    storage.delete('srs_state', 1)
+        
+        storage.clear_cache()
+        self.assertEqual(len(storage.load_json('cards')), 1)
+        
+        self.assertTrue(storage.recover_transaction())
+        self.assertEqual(len(storage.load_json('cards')), 2)
+        self.assertIsNone(storage.find_by_id('srs_state', 1))
+
+
+
+class TestIdSequence(unittest.TestCase):
+    """Kalıcı ID dizisi testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.save_json('decks', [{"id": 10, "user_id": 1, "name": "D"}])
+        (TEST_DATA_DIR / storage.SEQUENCE_FILE).unlink(missing_ok=True)
+        storage._sequences.clear()
+    
+    def test_ids_not_reused_after_delete(self):
+        """Silinen en büyük ID tekrar verilmez, dizi diskte kalıcıdır."""
+        import storage
+        
+        first = storage.insert('decks', {"user_id": 1, "name": "A"})
+        self.assertEqual(first['id'], 11)
+        storage.delete('decks', first['id'])
+        
+        second = storage.insert('decks', {"user_id": 1, "name": "B"})
+        self.assertEqual(second['id'], 12)
+        
+        storage._sequences.clear()
+        third = storage.insert('decks', {"user_id": 1, "name": "C"})
+        self.assertGreater(third['id'], second['id'])
+    
+    def test_reserve_block(self):
+        """Toplu ekleme için ardışık ID bloğu ayrılır."""
+        import storage
+        
+        block = storage.reserve_ids('decks', 100)
+        self.assertEqual(len(block), 100)
+        self.assertEqual(block.start, 11)
+        self.assertEqual(storage.get_next_id('decks'), 111)
+    
+    def test_sequence_skips_external_ids(self):
+        """Dışarıdan eklenmiş daha büyük ID'ler atlanır."""
+        import storage
+        
+        storage.get_next_id('decks')
+        storage.save_json('decks', [{"id": 11, "name": "x"}, {"id": 12, "name": "y"}])
+        
+        deck = storage.insert('decks', {"user_id": 1, "name": "z"})
+        self.assertEqual(deck['id'], 13)
+
+
+
+class TestBulkOperations(unittest.TestCase):
+    """Toplu insert/update/delete testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        from auth import _current_session
+        import storage
+        
+        _current_session['user_id'] = None
+        _current_session['email'] = None
+        _current_session['logged_in'] = False
+        
+        for name in storage.FILES:
+            storage.save_json(name, [])
+    
+    def test_bulk_primitives_write_once(self):
+        """Her toplu işlem koleksiyonu tek seferde yazar."""
+        import storage
+        from unittest import mock
+        
+        with mock.patch('storage._dump_snapshot', wraps=storage._dump_snapshot) as dump:
+            cards = storage.insert_many('cards', [
+                {"deck_id": i % 3, "front": f"Q{i}"} for i in range(100)
+            ])
+            updated = storage.update_many('cards', {
+                cards[2]['id']: {"front": "ilk"}, cards[1]['id']: {"deck_id": 7}, -1: {}
+            })
+            deleted = storage.delete_where('cards', field='deck_id', values={0, 7})
+            deleted += storage.delete_where('cards', lambda c: c['front'] == "ilk")
+        
+        self.assertEqual(dump.call_count, 4)
+        self.assertEqual(len({c['id'] for c in cards}), 100)
+        self.assertEqual(len(updated), 2)
+        self.assertEqual(deleted, 34 + 1 + 1)
+        self.assertEqual(storage.find_all_by_field('cards', 'deck_id', 7), [])
+        
+        storage.clear_cache()
+        self.assertEqual(len(storage.load_json('cards')), 64)
+        with self.assertRaises(ValueError):
+            storage.delete_where('cards')
+    
+    def test_csv_import_uses_bulk_insert(self):
+        """CSV içe aktarma kartları ve SRS state'lerini toplu ekler."""
+        import storage
+        from auth import register, login
+        from deck_service import create_deck
+        from backup_service import import_from_csv
+        
+        register("bulk@example.com", "password123")
+        login("bulk@example.com", "password123")
+        success, msg, deck = create_deck("CSV Deck", "")
+        
+        csv_path = TEST_DATA_DIR / "import.csv"
+        rows = ["front,back"] + [f"Soru {i},Cevap {i}" for i in range(50)] + [" ,boş"]
+        csv_path.write_text("\n".join(rows), encoding='utf-8')
+        
+        success, msg, count = import_from_csv(str(csv_path), deck['id'])
         
         self.assertTrue(success)
-        self.assertIn("CSV", msg)
+        self.assertEqual(count, 50)
+        cards = storage.find_all_by_field('cards', 'deck_id', deck['id'])
+        self.assertEqual(len(cards), 50)
+        self.assertEqual(len(storage.load_json('srs_state')), 50)
+        self.assertEqual(storage.find_by_field('srs_state', 'card_id', cards[-1]['id'])['repetition'], 0)
+    
+    def test_sqlite_bulk_primitives(self):
+        """Toplu işlemler SQLite arka ucunda da aynı sonucu verir."""
+        import storage
+        import sqlite_storage
+        
+        storage.set_backend('sqlite')
+        try:
+            cards = storage.insert_many('cards', [{"deck_id": i % 2, "front": f"Q{i}"} for i in range(10)])
+            storage.update_many('cards', {cards[0]['id']: {"deck_id": 5}})
+            self.assertEqual(storage.delete_where('cards', field='deck_id', values=[1, 5]), 6)
+            self.assertEqual(storage.delete_where('cards', lambda c: c['front'] == "Q2"), 1)
+            self.assertEqual([c['front'] for c in storage.load_json('cards')], ["Q4", "Q6", "Q8"])
+        finally:
+            storage.set_backend('json')
+            sqlite_storage.close()
+            sqlite_storage.get_db_path().unlink(missing_ok=True)
+
+
+
+class TestCascadeEngine(unittest.TestCase):
+    """Küme tabanlı cascade silme testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        
+        storage.save_json('users', [{"id": 1, "email": "a@x.com"}, {"id": 2, "email": "b@x.com"}])
+        storage.save_json('decks', [
+            {"id": 1, "user_id": 1, "name": "D1"}, {"id": 2, "user_id": 2, "name": "D2"}
+        ])
+        storage.save_json('cards', [
+            {"id": i, "deck_id": 1 if i <= 300 else 2, "front": f"Q{i}"} for i in range(1, 401)
+        ])
+        storage.save_json('srs_state', [
+            {"id": i, "user_id": 1 if i <= 300 else 2, "card_id": i} for i in range(1, 401)
+        ])
+        storage.save_json('reviews', [
+            {"id": i, "user_id": 1 if i % 400 <= 300 else 2, "card_id": i % 400 or 400}
+            for i in range(1, 801)
+        ])
+    
+    def test_dry_run_reports_counts(self):
+        """dry_run hiçbir şey silmeden sayıları döndürür."""
+        import storage
+        
+        counts = storage.cascade_delete('decks', [1, 99], dry_run=True)
+        
+        self.assertEqual(counts, {'decks': 1, 'cards': 300, 'srs_state': 300, 'reviews': 600, 'review_rollups': 0})
+        self.assertEqual(len(storage.load_json('cards')), 400)
+    
+    def test_one_write_per_collection(self):
+        """Her koleksiyon kart sayısından bağımsız olarak bir kez yazılır."""
+        import storage
+        from unittest import mock
+        
+        with mock.patch('storage._dump_snapshot', wraps=storage._dump_snapshot) as dump:
+            counts = storage.cascade_delete('decks', [1])
+        
+        self.assertEqual(dump.call_count, 4)
+        self.assertEqual(counts['reviews'], 600)
+        self.assertEqual({c['deck_id'] for c in storage.load_json('cards')}, {2})
+        self.assertEqual({r['card_id'] > 300 for r in storage.load_json('reviews')}, {True})
+    
+    def test_user_cascade(self):
+        """Kullanıcı silinince deck'leri, kartları ve tüm SRS/review kayıtları silinir."""
+        import storage
+        
+        counts = storage.cascade_delete('users', [2])
+        
+        self.assertEqual(counts, {'users': 1, 'decks': 1, 'srs_state': 100, 'reviews': 200, 'review_rollups': 0, 'cards': 100})
+        self.assertEqual(len(storage.load_json('users')), 1)
+        self.assertEqual(storage.find_all_by_field('reviews', 'user_id', 2), [])
+
+
+
+class TestCodecs(unittest.TestCase):
+    """Dosya biçimi (codec) testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.set_journal_mode('reviews', False)
+        storage.save_json('reviews', [
+            {"id": i, "user_id": 1, "card_id": i, "quality": i % 6, "note": "ğüş"} for i in range(1, 51)
+        ])
+    
+    def tearDown(self):
+        import storage
+        storage.set_journal_mode('reviews', False)
+    
+    def test_convert_round_trip(self):
+        """Her biçime dönüştürülen koleksiyon aynı kayıtlarla geri okunur."""
+        import storage
+        
+        expected = [dict(r) for r in storage.load_json('reviews')]
+        pretty_size = storage.get_file_path('reviews').stat().st_size
+        
+        for codec in ['json-compact', 'pickle', 'records', 'json']:
+            self.assertTrue(storage.set_codec('reviews', codec))
+            storage.clear_cache()
+            self.assertEqual(storage.get_codec('reviews'), codec)
+            self.assertEqual([dict(r) for r in storage.load_json('reviews')], expected)
+            if codec != 'json':
+                self.assertLess(storage.get_file_path('reviews').stat().st_size, pretty_size)
+        
+        with self.assertRaises(ValueError):
+            storage.set_codec('reviews', 'xml')
+    
+    def test_writes_keep_detected_codec(self):
+        """Okunan biçim sonraki yazmalarda ve journal ile korunur."""
+        import storage
+        import serialization
+        
+        storage.set_codec('reviews', 'records')
+        storage.set_journal_mode('reviews')
+        new = storage.insert('reviews', {"user_id": 2, "card_id": 1, "quality": 5})
+        storage.clear_cache()
+        self.assertEqual(storage.find_by_id('reviews', new['id'])['quality'], 5)
+        
+        storage.set_journal_mode('reviews', False)
+        storage.update('reviews', 1, {"quality": 0})
+        content = storage.get_file_path('reviews').read_bytes()
+        self.assertEqual(serialization.detect(content), 'records')
+        self.assertEqual(len(serialization.loads(content)[1]), 51)
+        
+        storage.clear_cache()
+        storage.save_json('reviews', storage.load_json('reviews')[:10])
+        self.assertEqual(serialization.detect(storage.get_file_path('reviews').read_bytes()), 'records')
+    
+    def test_converter_command(self):
+        """python serialization.py convert komutu koleksiyonları dönüştürür."""
+        import storage
+        import serialization
+        
+        self.assertEqual(serialization.main(['serialization.py', 'convert', 'pickle', 'reviews']), 0)
+        self.assertEqual(storage.get_codec('reviews'), 'pickle')
+        self.assertEqual(serialization.main(['serialization.py', 'convert', 'yaml']), 1)
+
+
+
+class TestIterCollection(unittest.TestCase):
+    """Akış halinde koleksiyon okuma testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.set_journal_mode('reviews', False)
+        self.reviews = [
+            {"id": i, "user_id": i % 2, "card_id": i, "quality": i % 6, "reviewed_at": "2024-01-01T10:00:00"}
+            for i in range(1, 201)
+        ]
+        storage.save_json('reviews', self.reviews)
+        storage.clear_cache()
+    
+    def tearDown(self):
+        import storage
+        storage.set_journal_mode('reviews', False)
+    
+    def test_streams_from_disk_without_caching(self):
+        """Önbellek soğukken dosya parça parça okunur ve önbelleğe alınmaz."""
+        import storage
+        import serialization
+        from unittest import mock
+        
+        for codec in ['json', 'json-compact', 'records', 'pickle']:
+            storage.set_codec('reviews', codec)
+            storage.clear_cache()
+            with mock.patch('serialization.STREAM_CHUNK_SIZE', 97):
+                items = list(storage.iter_collection(
+                    'reviews', fields=['id', 'quality'], where=lambda r: r['user_id'] == 1
+                ))
+            self.assertEqual(items, [{"id": r['id'], "quality": r['quality']} for r in self.reviews if r['user_id'] == 1])
+            self.assertNotIn(storage.get_file_path('reviews'), storage._cache)
+    
+    def test_applies_journal(self):
+        """Journal'daki güncelleme, silme ve eklemeler akışa yansır."""
+        import storage
+        
+        storage.set_journal_mode('reviews')
+        storage.update('reviews', 2, {"quality": 9})
+        storage.delete('reviews', 3)
+        new = storage.insert('reviews', {"user_id": 1, "card_id": 1, "quality": 4, "reviewed_at": "2024-01-02T09:00:00"})
+        storage.clear_cache()
+        
+        ids = [r['id'] for r in storage.iter_collection('reviews', fields=['id'])]
+        self.assertEqual(ids, [1, 2] + list(range(4, 201)) + [new['id']])
+        self.assertEqual(next(storage.iter_collection('reviews', where=lambda r: r['id'] == 2))['quality'], 9)
+        self.assertEqual(
+            [dict(r) for r in storage.iter_collection('reviews')],
+            [dict(r) for r in storage.load_json('reviews')]
+        )
+    
+    def test_export_csv_streams_cards(self):
+        """CSV dışa aktarma kartları iter_collection ile okur (ikili biçimde de)."""
+        import csv
+        import storage
+        from backup_service import export_to_csv
+        
+        storage.save_json('cards', [{"id": i, "deck_id": 1, "front": f"Q{i}", "back": "A"} for i in range(1, 6)])
+        storage.set_codec('cards', 'records')
+        output = TEST_DATA_DIR / "export.csv"
+        
+        success, msg = export_to_csv(str(output))
+        
+        self.assertTrue(success)
+        with open(output, encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['id', 'deck_id', 'front', 'back', 'created_at'])
+        self.assertEqual(rows[5][:4], ['5', '1', 'Q5', 'A'])
+
+
+
+class TestOffsetIndex(unittest.TestCase):
+    """Konum indeksi (id -> dosyadaki yer) testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        storage.set_journal_mode('cards', False)
+        self.cards = [{"id": i, "deck_id": 1, "front": f"Soru ğ{i}", "back": "Çevap"} for i in range(1, 1001)]
+        storage.save_json('cards', self.cards)
+        storage.clear_cache()
+    
+    def tearDown(self):
+        import storage
+        storage.set_journal_mode('cards', False)
+    
+    def test_cold_lookup_reads_single_record(self):
+        """Soğuk find_by_id koleksiyonu önbelleğe almadan tek kaydı okur."""
+        import storage
+        from unittest import mock
+        
+        for codec in ['json', 'json-compact', 'records']:
+            storage.set_codec('cards', codec)
+            storage.clear_cache()
+            with mock.patch('serialization.loads') as loads:
+                self.assertEqual(dict(storage.find_by_id('cards', 537)), self.cards[536])
+                self.assertIsNone(storage.find_by_id('cards', 5000))
+            loads.assert_not_called()
+            self.assertNotIn(storage.get_file_path('cards'), storage._cache)
+            self.assertTrue(storage.get_index_path('cards').exists())
+    
+    def test_stale_index_is_rebuilt(self):
+        """Snapshot dışarıdan değişirse indeks yeniden oluşturulur."""
+        import storage
+        
+        with open(storage.get_file_path('cards'), 'w', encoding='utf-8') as f:
+            json.dump([{"id": 7, "front": "yeni"}, {"id": 3, "front": "üç"}], f, ensure_ascii=False)
+        
+        self.assertEqual(storage.find_by_id('cards', 3)['front'], "üç")
+        self.assertIsNone(storage.find_by_id('cards', 1))
+        
+        storage.set_codec('cards', 'pickle')
+        storage.clear_cache()
+        self.assertFalse(storage.get_index_path('cards').exists())
+        self.assertEqual(storage.find_by_id('cards', 7)['front'], "yeni")
+    
+    def test_journal_overrides_index(self):
+        """Journal'daki güncelleme ve silmeler soğuk aramada da görülür."""
+        import storage
+        
+        storage.set_journal_mode('cards')
+        storage.update('cards', 10, {"front": "güncel"})
+        storage.delete('cards', 11)
+        storage.clear_cache()
+        
+        self.assertEqual(storage.find_by_id('cards', 10)['front'], "güncel")
+        self.assertIsNone(storage.find_by_id('cards', 11))
+        self.assertEqual(storage.find_by_id('cards', 12)['front'], "Soru ğ12")
+
+
+class TestSharding(unittest.TestCase):
+    """Kullanıcı bazlı shard dizinleri testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        
+        storage.set_sharding(True)
+        storage.save_json('users', [{"id": 1, "email": "a@x.com"}, {"id": 2, "email": "b@x.com"}])
+        storage.save_json('decks', [
+            {"id": 1, "user_id": 1, "name": "D1"}, {"id": 2, "user_id": 2, "name": "D2"}
+        ])
+        storage.save_json('cards', [
+            {"id": i, "deck_id": 1 if i <= 300 else 2, "front": f"Q{i}"} for i in range(1, 401)
+        ])
+        storage.save_json('srs_state', [
+            {"id": i, "user_id": 1 if i <= 300 else 2, "card_id": i} for i in range(1, 401)
+        ])
+        storage.save_json('reviews', [])
+    
+    def tearDown(self):
+        import storage
+        
+        storage.set_sharding(False)
+        shutil.rmtree(TEST_DATA_DIR / storage.SHARD_DIR, ignore_errors=True)
+        storage.clear_cache()
+    
+    def test_writes_go_to_user_shard(self):
+        """Bir kullanıcının yazması sadece kendi shard dosyasını değiştirir."""
+        import storage
+        
+        other = storage.get_file_path('cards@1')
+        before = other.stat().st_mtime_ns
+        storage.insert('cards', {"deck_id": 2, "front": "Yeni"})
+        storage.insert('reviews', {"user_id": 2, "card_id": 301, "quality": 4})
+        
+        self.assertEqual(other.stat().st_mtime_ns, before)
+        self.assertEqual(len(storage.load_json('cards@2')), 101)
+        self.assertTrue((TEST_DATA_DIR / 'users' / '2' / 'reviews.json').exists())
+        self.assertFalse(storage.get_file_path('reviews@1').exists())
+        with self.assertRaises(ValueError):
+            storage.insert('reviews', {"card_id": 1, "quality": 3})
+    
+    def test_cross_shard_reads(self):
+        """Admin okumaları tüm shard'ları, ID aramaları doğru shard'ı bulur."""
+        import storage
+        
+        storage.clear_cache()
+        self.assertEqual(len(storage.load_json('cards')), 400)
+        self.assertEqual(storage.find_by_id('cards', 350)['deck_id'], 2)
+        self.assertEqual(len(storage.find_all_by_field('cards', 'deck_id', 1)), 300)
+        self.assertEqual(sum(1 for _ in storage.iter_collection('srs_state', where=lambda s: s['card_id'] > 250)), 150)
+        self.assertEqual(storage.update('cards', 350, {"front": "Değişti"})['front'], "Değişti")
+        with self.assertRaises(ValueError):
+            storage.update('cards', 350, {"deck_id": 1})
+        self.assertEqual(storage.cascade_delete('users', [2]), {
+            'users': 1, 'decks': 1, 'srs_state': 100, 'reviews': 0, 'review_rollups': 0, 'cards': 100
+        })
+        self.assertEqual(len(storage.load_json('cards')), 300)
+    
+    def test_migrate_to_shards(self):
+        """Tek dosyadaki veri shard'lara taşınır, tek dosyalar silinir."""
+        import storage
+        
+        data = {name: storage.load_json(name) for name in storage.SHARD_KEYS}
+        storage.set_sharding(False)
+        shutil.rmtree(TEST_DATA_DIR / storage.SHARD_DIR)
+        for name, items in data.items():
+            storage.save_json(name, items)
+        
+        counts = storage.migrate_to_shards()
+        
+        self.assertEqual(counts, {'decks': 2, 'cards': 400, 'srs_state': 400, 'reviews': 0, 'review_rollups': 0})
+        self.assertFalse(storage.get_file_path('cards').exists())
+        self.assertEqual(storage.list_shards('srs_state'), ['1', '2'])
+        self.assertEqual(sorted(c['id'] for c in storage.load_json('cards')), list(range(1, 401)))
+
+
+class TestReviewSegments(unittest.TestCase):
+    """Review kayıtlarının aylık segmentleri testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        
+        self.reviews = [
+            {"id": i, "user_id": 1 + i % 2, "card_id": i, "quality": i % 6,
+             "reviewed_at": f"{2024 + (i - 1) // 240}-{(i - 1) // 20 % 12 + 1:02d}-{(i - 1) % 20 + 5:02d}T10:00:00"}
+            for i in range(1, 481)
+        ]
+        storage.save_json('reviews', self.reviews)
+        storage.clear_cache()
+    
+    def tearDown(self):
+        import storage
+        
+        shutil.rmtree(TEST_DATA_DIR / 'reviews', ignore_errors=True)
+        storage.get_file_path('reviews').unlink(missing_ok=True)
+        storage.clear_cache()
+    
+    def test_monthly_segment_files(self):
+        """Kayıtlar ayına göre segment dosyalarına yazılır, min/max bilgisi tutulur."""
+        import storage
+        
+        storage.insert('reviews', {"user_id": 1, "card_id": 1, "quality": 3})
+        
+        segments = storage.get_segments('reviews')
+        self.assertEqual(len(segments), 24)
+        self.assertTrue((TEST_DATA_DIR / 'reviews' / '2025-03.json').exists())
+        self.assertEqual(segments[14], {
+            'name': 'reviews#2025-03', 'segment': '2025-03',
+            'min': '2025-03-05T10:00:00', 'max': '2025-03-24T10:00:00', 'count': 20
+        })
+        self.assertEqual(len(storage.load_json('reviews')), 481)
+        self.assertEqual(storage.find_by_id('reviews', 300)['card_id'], 300)
+        with self.assertRaises(ValueError):
+            storage.update('reviews', 300, {"reviewed_at": "2026-01-01T10:00:00"})
+    
+    def test_range_reads_only_overlapping_segments(self):
+        """Zaman aralıklı okuma sadece aralıkla kesişen segmentleri açar."""
+        import storage
+        from unittest import mock
+        
+        with mock.patch('storage._stream_records', wraps=storage._stream_records) as stream:
+            items = list(storage.iter_collection('reviews', fields=['id'], since='2025-02-20', until='2025-03-10'))
+        
+        opened = sorted(call.args[0].name for call in stream.call_args_list)
+        self.assertEqual(opened, ['2025-02.json', '2025-03.json'])
+        self.assertEqual([r['id'] for r in items], list(range(276, 281)) + list(range(281, 286)))
+        with self.assertRaises(ValueError):
+            list(storage.iter_collection('cards', since='2025-01-01'))
+    
+    def test_converter_command_segments(self):
+        """convert ve info komutları segment dosyalarını da kapsar."""
+        import io
+        import storage
+        import serialization
+        from contextlib import redirect_stdout
+        
+        expected = [dict(r) for r in storage.load_json('reviews')]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(serialization.main(['serialization.py', 'convert', 'json-compact', 'reviews']), 0)
+            self.assertEqual(serialization.main(['serialization.py', 'info']), 0)
+        
+        storage.clear_cache()
+        self.assertEqual(serialization.detect((TEST_DATA_DIR / 'reviews' / '2025-03.json').read_bytes()), 'json-compact')
+        self.assertEqual([dict(r) for r in storage.load_json('reviews')], expected)
+        
+        size = sum(storage.get_file_path(name).stat().st_size for name in storage.list_partitions('reviews'))
+        self.assertIn(f"reviews: json-compact ({size} bayt)", output.getvalue().splitlines())
+    
+    def test_weekly_stats_use_recent_segment(self):
+        """Haftalık rapor sadece son haftanın özet segmentlerini okur."""
+        import storage
+        import rollups
+        from auth import _current_session
+        from report_service import get_weekly_stats, get_today_summary
+        from unittest import mock
+        
+        today = datetime.now()
+        storage.insert('reviews', {"user_id": 1, "card_id": 1, "quality": 5, "reviewed_at": today.isoformat()})
+        storage.insert('reviews', {"user_id": 2, "card_id": 2, "quality": 1, "reviewed_at": today.isoformat()})
+        rollups.rebuild()
+        storage.clear_cache()
+        _current_session['user_id'] = 1
+        _current_session['logged_in'] = True
+        try:
+            with mock.patch('storage._stream_records', wraps=storage._stream_records) as stream:
+                success, msg, stats = get_weekly_stats()
+            self.assertLessEqual(stream.call_count, 2)
+            self.assertTrue(success)
+            self.assertEqual(stats['total_reviews'], 1)
+            self.assertEqual(get_today_summary()[2]['reviewed_today'], 1)
+        finally:
+            _current_session['user_id'] = None
+            _current_session['logged_in'] = False
+
+
+class TestSRSStore(unittest.TestCase):
+    """Sütun bazlı SRS deposu testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        
+        self.states = [
+            {"id": i, "user_id": 2 - i % 2, "card_id": i, "repetition": i % 4, "interval_days": i % 9 + 1,
+             "ef": [1.3, 2.36, 2.5, 2.8][i % 4], "due_date": f"2026-10-{i % 28 + 1:02d}",
+             "last_quality": None if i % 5 == 0 else i % 6}
+            for i in range(1, 301)
+        ]
+        self.states[0]['last_reviewed'] = "2026-10-01T09:30:00"
+        storage.save_json('srs_state', self.states)
+    
+    def test_rows_read_like_records(self):
+        """Satır görünümleri kayıtlarla aynı değerleri verir, satırlar kullanıcıya göre gruplanır."""
+        from srs_store import SRSStore
+        
+        store = SRSStore(self.states)
+        
+        self.assertEqual(list(store.user_id[:150]), [1] * 150)
+        self.assertEqual(dict(store.find(1, 1)), self.states[0])
+        self.assertEqual(dict(store.find(2, 2)), self.states[1])
+        self.assertEqual(store.find(1, 1)['ef'], 2.36)
+        self.assertIsNone(store.find(2, 1))
+        self.assertLessEqual(store.memory_usage(), len(self.states) * 39)
+    
+    def test_scans_match_dict_scans(self):
+        """Due ve ef taramaları dict üzerindeki taramalarla aynı sonucu verir."""
+        from srs_store import SRSStore
+        from datetime import date
+        
+        store = SRSStore(self.states)
+        today = date(2026, 10, 10)
+        card_ids = set(range(1, 301, 7))
+        
+        for user_id in [1, 2]:
+            rows = [s for s in self.states if s['user_id'] == user_id]
+            due = [s for s in rows if s['due_date'] <= today.isoformat()]
+            self.assertEqual([dict(r) for r in store.due_rows(user_id, today.toordinal())], due)
+            self.assertEqual(
+                store.count_due(user_id, today.toordinal(), card_ids),
+                sum(1 for s in due if s['card_id'] in card_ids)
+            )
+            self.assertAlmostEqual(
+                sum(store.ef_values(user_id, card_ids)),
+                sum(s['ef'] for s in rows if s['card_id'] in card_ids), places=4
+            )
+        self.assertEqual(store.due_rows(3, today.toordinal()), [])
+    
+    def test_store_follows_collection(self):
+        """Kullanıcı deposu yazmalarla yerinde güncellenir, yeniden kurulmaz."""
+        import storage
+        from srs_store import get_store
+        from unittest import mock
+        
+        store = get_store(1)
+        other = get_store(2)
+        self.assertIs(get_store(1), store)
+        self.assertEqual(len(store), 150)
+        
+        with mock.patch('srs_store.SRSStore', side_effect=AssertionError("yeniden kurulum")):
+            storage.update('srs_state', 1, {"due_date": "2030-01-01", "ef": 2.46})
+            new = storage.insert('srs_state', {"user_id": 1, "card_id": 999, "due_date": "2026-10-01"})
+            self.assertIs(get_store(1), store)
+            self.assertIs(get_store(2), other)
+        
+        self.assertEqual(store.find(1, 1)['due_date'], "2030-01-01")
+        self.assertEqual(store.find(1, 1)['ef'], 2.46)
+        self.assertEqual(store.find(1, 999)['id'], new['id'])
+        self.assertEqual(len(store), 151)
+        
+        storage.delete('srs_state', 1)
+        self.assertIs(get_store(2), other)
+        self.assertIsNone(get_store(1).find(1, 1))
+        self.assertEqual(len(get_store(1)), 150)
+        
+        storage.save_json('srs_state', self.states)
+        self.assertIsNot(get_store(2), other)
+    
+    def test_ef_is_exact(self):
+        """ef değerleri float64 tutulur; ortalamalar kayıtlarla birebir aynıdır."""
+        from srs_store import SRSStore
+        
+        store = SRSStore(self.states)
+        efs = [s['ef'] for s in self.states if s['user_id'] == 1]
+        self.assertEqual(list(store.ef_values(1)), efs)
+        self.assertEqual(sum(store.ef_values(1)) / len(efs), sum(efs) / len(efs))
+
+
+class TestDayOrdinals(unittest.TestCase):
+    """Gün numarası tabanlı tarih hesapları testleri."""
+    
+    def test_date_arithmetic(self):
+        """Gün ekleme ve due kontrolü gün numaralarıyla eski sonuçları verir."""
+        from utils import add_days, is_due, date_to_ordinal, ordinal_to_date, get_today_str
+        
+        self.assertEqual(add_days('2024-02-28', 1), '2024-02-29')
+        self.assertEqual(add_days('2024-12-31', 6), '2025-01-06')
+        self.assertEqual(add_days('geçersiz', 0), get_today_str())
+        self.assertEqual(ordinal_to_date(date_to_ordinal('2026-10-18T08:00:00')), '2026-10-18')
+        self.assertIsNone(date_to_ordinal(None))
+        self.assertTrue(is_due(get_today_str()))
+        self.assertTrue(is_due(''))
+        self.assertFalse(is_due(add_days(get_today_str(), 1)))
+    
+    def test_today_is_cached_until_midnight(self):
+        """Bugünün gün numarası gece yarısına kadar yeniden hesaplanmaz."""
+        import utils
+        from unittest import mock
+        
+        today = utils.get_today_ordinal()
+        with mock.patch('utils.date') as fake_date:
+            self.assertEqual(utils.get_today_ordinal(), today)
+            fake_date.today.assert_not_called()
+        
+        with mock.patch.dict(utils._today, {'expires': 0.0}):
+            self.assertEqual(utils.get_today_ordinal(), today)
+    
+    def test_last_reviewed_round_trip(self):
+        """last_reviewed gün numarası tabanlı sütunda tutulur ve aynen geri okunur."""
+        from srs_store import SRSStore
+        from utils import date_to_ordinal
+        
+        records = [
+            {"id": 1, "user_id": 1, "card_id": 1, "last_reviewed": "2026-10-18T23:59:59.999999"},
+            {"id": 2, "user_id": 1, "card_id": 2, "last_reviewed": "2026-10-18T08:00:00"},
+            {"id": 3, "user_id": 1, "card_id": 3, "last_reviewed": "2026-10-18T08:00:00+03:00"}
+        ]
+        store = SRSStore(records)
+        
+        for row, record in enumerate(records):
+            self.assertEqual(store.row(row)['last_reviewed'], record['last_reviewed'])
+        self.assertEqual(store.last_reviewed_day(0), date_to_ordinal('2026-10-18'))
+        self.assertIsNone(store.last_reviewed_day(2))
+
+
+class TestDueIndex(unittest.TestCase):
+    """Kullanıcı bazlı due indeksi testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        from utils import date_to_ordinal
+        
+        self.today = date_to_ordinal('2026-10-18')
+        storage.save_json('decks', [
+            {"id": 1, "user_id": 1, "name": "D1"}, {"id": 2, "user_id": 1, "name": "D2"},
+            {"id": 3, "user_id": 2, "name": "D3"}
+        ])
+        storage.save_json('cards', [{"id": i, "deck_id": i % 3 + 1, "front": f"Q{i}"} for i in range(1, 301)])
+        storage.save_json('srs_state', [
+            {"id": i, "user_id": 2 if i % 3 == 2 else 1, "card_id": i, "due_date": f"2026-10-{i % 30 + 1:02d}"}
+            for i in range(1, 301)
+        ])
+    
+    def expected(self, user_id, deck_id=None):
+        import storage
+        from utils import date_to_ordinal
+        
+        rows = [
+            (date_to_ordinal(s['due_date']), s['id']) for s in storage.load_json('srs_state')
+            if s['user_id'] == user_id and date_to_ordinal(s['due_date']) <= self.today
+            and (deck_id is None or storage.find_by_id('cards', s['card_id'])['deck_id'] == deck_id)
+        ]
+        return [srs_id for _, srs_id in sorted(rows)]
+    
+    def test_queue_order_and_filters(self):
+        """Kuyruk due sırasıyla döner, deck ve limit filtreleri indekste uygulanır."""
+        import due_index
+        
+        self.assertEqual(due_index.get_due(1, self.today), self.expected(1))
+        self.assertEqual(due_index.get_due(1, self.today, deck_id=2), self.expected(1, 2))
+        self.assertEqual(due_index.get_due(1, self.today, deck_id=2, limit=5), self.expected(1, 2)[:5])
+        self.assertEqual(due_index.get_due(1, self.today, deck_id=3), [])
+        self.assertEqual(due_index.count_due(2, self.today), len(self.expected(2)))
+    
+    def test_writes_update_index_in_place(self):
+        """Yazmalar indeksi yeniden kurmadan günceller."""
+        import storage
+        import due_index
+        from unittest import mock
+        
+        due_index.get_due(1, self.today)
+        with mock.patch('due_index._build_user', side_effect=AssertionError("yeniden kuruldu")):
+            storage.update('srs_state', 1, {"due_date": "2026-12-01"})
+            card = storage.insert('cards', {"deck_id": 1, "front": "Yeni"})
+            srs = storage.insert('srs_state', {"user_id": 1, "card_id": card['id'], "due_date": "2026-01-01"})
+            storage.delete('srs_state', 4)
+            storage.cascade_delete('decks', [2])
+            
+            queue = due_index.get_due(1, self.today)
+        
+        self.assertEqual(queue[0], srs['id'])
+        self.assertNotIn(1, queue)
+        self.assertNotIn(4, queue)
+        self.assertEqual(queue, self.expected(1))
+    
+    def test_service_queue_and_external_change(self):
+        """get_due_cards indeksi kullanır; dışarıdan yapılan değişiklikte indeks yeniden kurulur."""
+        import storage
+        from auth import _current_session
+        from review_service import get_due_cards
+        from unittest import mock
+        
+        _current_session['user_id'] = 1
+        _current_session['logged_in'] = True
+        try:
+            with mock.patch('review_service.get_today_ordinal', return_value=self.today):
+                success, msg, cards = get_due_cards(deck_id=1, limit=3)
+                self.assertEqual([c['id'] for c in cards], self.expected(1, 1)[:3])
+                self.assertEqual({c['deck_name'] for c in cards}, {"D1"})
+                
+                storage.save_json('srs_state', [])
+                self.assertEqual(get_due_cards()[2], [])
+        finally:
+            _current_session['user_id'] = None
+            _current_session['logged_in'] = False
+
+
+class TestJoinHelpers(unittest.TestCase):
+    """Dict/set tabanlı join yardımcıları ve bunları kullanan servis testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        
+        storage.save_json('decks', [
+            {"id": 1, "user_id": 1, "name": "D1"}, {"id": 2, "user_id": 1, "name": "D2"},
+            {"id": 3, "user_id": 2, "name": "D3"}
+        ])
+        storage.save_json('cards', [
+            {"id": i, "deck_id": i % 3 + 1, "front": f"Soru {i}", "back": f"Cevap {i}"} for i in range(1, 31)
+        ])
+        storage.save_json('srs_state', [
+            {"id": 100 + i, "user_id": 2 if i % 3 == 2 else 1, "card_id": i, "due_date": "2026-10-01", "ef": 2.5,
+             "repetition": i % 4}
+            for i in range(1, 31) if i % 5
+        ])
+    
+    def tearDown(self):
+        from auth import _current_session
+        
+        _current_session['user_id'] = None
+        _current_session['logged_in'] = False
+    
+    def login(self, user_id):
+        from auth import _current_session
+        
+        _current_session['user_id'] = user_id
+        _current_session['logged_in'] = True
+    
+    def test_helpers(self):
+        """find_many, find_all_in, index_by, group_by ve count_by doğru sonuç verir."""
+        import storage
+        
+        found = storage.find_many('cards', [3, 3, 99, 7])
+        self.assertEqual(list(found), [3, 7])
+        self.assertEqual(found[7]['deck_id'], 2)
+        
+        cards = storage.load_json('cards')
+        in_decks = storage.find_all_in('cards', 'deck_id', [1, 2])
+        self.assertEqual({c['id'] for c in in_decks}, {c['id'] for c in cards if c['deck_id'] in (1, 2)})
+        fronts = storage.find_all_in('cards', 'front', {"Soru 4", "Yok"})
+        self.assertEqual([c['id'] for c in fronts], [4])
+        self.assertEqual(storage.find_all_in('cards', 'deck_id', []), [])
+        
+        self.assertEqual(storage.index_by([{"k": 1, "v": "a"}, {"k": 1, "v": "b"}], 'k'), {1: {"k": 1, "v": "a"}})
+        self.assertEqual(storage.group_by(cards, 'deck_id')[1], [c for c in cards if c['deck_id'] == 1])
+        self.assertEqual(storage.count_by(cards, 'deck_id'), {2: 10, 3: 10, 1: 10})
+    
+    def test_services_join_per_user(self):
+        """list_cards, list_decks ve search_cards sadece kullanıcının verisini birleştirir."""
+        import storage
+        from card_service import list_cards, search_cards
+        from deck_service import list_decks
+        
+        self.login(1)
+        _, _, cards = list_cards(2)
+        self.assertEqual([c['id'] for c in cards], list(range(1, 31, 3)))
+        for card in cards:
+            srs = next((s for s in storage.load_json('srs_state') if s['card_id'] == card['id']), None)
+            if srs and srs['user_id'] == 1:
+                self.assertEqual(card['repetition'], srs['repetition'])
+            else:
+                self.assertNotIn('due_date', card)
+        
+        _, _, decks = list_decks()
+        self.assertEqual({d['id']: d['card_count'] for d in decks}, {1: 10, 2: 10})
+        
+        _, _, results = search_cards("soru 2")
+        self.assertEqual([c['id'] for c in results], [c for c in (2, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29)
+                                                      if c % 3 + 1 != 3])
+        self.assertEqual([c['id'] for c in search_cards("soru 2", deck_id=1)[2]], [21, 24, 27])
+    
+    def test_service_joins_use_indexes(self):
+        """list_cards ve list_decks koleksiyonların tamamını taramaz."""
+        from unittest import mock
+        from card_service import list_cards
+        from deck_service import list_decks
+        
+        self.login(1)
+        with mock.patch('storage.load_json', side_effect=AssertionError("tam tarama")):
+            self.assertEqual(len(list_cards(1)[2]), 10)
+            self.assertEqual(len(list_decks()[2]), 2)
+
+
+class TestBatchReviews(unittest.TestCase):
+    """submit_reviews ve tamponlu çalışma oturumu testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        from auth import _current_session
+        
+        storage.save_json('decks', [{"id": 1, "user_id": 1, "name": "D1"}, {"id": 2, "user_id": 2, "name": "D2"}])
+        storage.save_json('cards', [
+            {"id": i, "deck_id": 1 if i <= 5 else 2, "front": f"Q{i}", "back": f"A{i}"} for i in range(1, 7)
+        ])
+        storage.save_json('srs_state', [
+            {"id": 10 + i, "user_id": 1, "card_id": i, "repetition": 2, "interval_days": 6, "ef": 2.5,
+             "due_date": "2026-10-01", "last_quality": 4}
+            for i in (1, 2)
+        ])
+        storage.save_json('reviews', [])
+        _current_session['user_id'] = 1
+        _current_session['logged_in'] = True
+    
+    def tearDown(self):
+        import review_service
+        from auth import _current_session
+        
+        review_service._review_session.update(user_id=None, buffer=[], flushed_at=0.0)
+        review_service._session_journal_path(1).unlink(missing_ok=True)
+        _current_session['user_id'] = None
+        _current_session['logged_in'] = False
+    
+    def test_submit_reviews_single_commit(self):
+        """Parti SM-2'yi cevap sırasıyla uygular ve her koleksiyona bir kez yazar."""
+        import storage
+        from unittest import mock
+        from review_service import submit_reviews, calculate_sm2
+        from utils import date_to_ordinal, ordinal_to_date
+        
+        items = [(1, 4, "2026-10-16T09:00:00"), (3, 5, "2026-10-16T09:01:00"), (1, 3, "2026-10-17T09:02:00")]
+        with mock.patch('storage._notify', wraps=storage._notify) as notify:
+            success, msg, states = submit_reviews(items)
+        
+        self.assertTrue(success)
+        self.assertEqual(sorted(call.args[0] for call in notify.call_args_list), ['review_rollups#2026-10', 'reviews#2026-10', 'srs_state'])
+        self.assertEqual([s['card_id'] for s in states], [1, 3])
+        
+        rep, ef, interval = calculate_sm2(4, 2, 2.5, 6)
+        rep, ef, interval = calculate_sm2(3, rep, ef, interval)
+        card1 = storage.find_by_id('srs_state', 11)
+        self.assertEqual((card1['repetition'], card1['ef'], card1['interval_days']), (rep, ef, interval))
+        self.assertEqual(card1['due_date'], ordinal_to_date(date_to_ordinal("2026-10-17") + interval))
+        self.assertEqual(card1['last_reviewed'], "2026-10-17T09:02:00")
+        
+        card3 = storage.find_all_by_field('srs_state', 'card_id', 3)
+        self.assertEqual([(s['user_id'], s['last_quality'], s['id']) for s in card3], [(1, 5, states[1]['id'])])
+        self.assertEqual([(r['card_id'], r['quality']) for r in storage.load_json('reviews')], [(1, 4), (3, 5), (1, 3)])
+    
+    def test_invalid_batch_is_not_written(self):
+        """Yabancı kart, geçersiz puan veya geçersiz/gelecek zaman içeren parti hiç yazılmaz."""
+        import storage
+        from review_service import submit_reviews
+        
+        before = storage.load_json('srs_state')
+        self.assertFalse(submit_reviews([(1, 4, None), (6, 3, None)])[0])
+        self.assertFalse(submit_reviews([(1, 4, None), (99, 3, None)])[0])
+        self.assertFalse(submit_reviews([(1, 4, None), (2, 7, None)])[0])
+        self.assertEqual(submit_reviews([(1, 4, None), (2, 3, "dün")])[1], "Geçersiz cevap zamanı: dün")
+        self.assertFalse(submit_reviews([(1, 4, None), (2, 3, 20261018)])[0])
+        tomorrow = (datetime.now() + timedelta(days=1)).isoformat()
+        self.assertEqual(submit_reviews([(1, 4, None), (2, 3, tomorrow)])[1], f"Cevap zamanı gelecekte olamaz: {tomorrow}")
+        self.assertFalse(submit_reviews([(2, 3, "2999-01-01T00:00:00+03:00")])[0])
+        self.assertEqual(storage.load_json('srs_state'), before)
+        self.assertEqual(storage.load_json('reviews'), [])
+        self.assertEqual(submit_reviews([]), (True, "Kaydedilecek cevap yok.", []))
+    
+    def test_session_flush_and_recovery(self):
+        """Oturum cevapları tamponlar; yarıda kalan oturum journal'dan bir kez kurtarılır."""
+        import json
+        import storage
+        import review_service
+        from unittest import mock
+        from review_service import start_review_session, record_answer, end_review_session
+        
+        journal_path = review_service._session_journal_path(1)
+        with mock.patch('review_service.SESSION_FLUSH_SIZE', 2):
+            self.assertTrue(start_review_session()[0])
+            record_answer(1, 5)
+            self.assertEqual(storage.load_json('reviews'), [])
+            self.assertEqual(len(journal_path.read_text(encoding='utf-8').splitlines()), 1)
+            
+            record_answer(2, 4)
+            self.assertEqual(len(storage.load_json('reviews')), 2)
+            self.assertFalse(journal_path.exists())
+            
+            record_answer(3, 3)
+        
+        # Çökme: tampon kaybolur, journal kalır; zaten kaydedilmiş bir cevap da journal'da olsun
+        flushed = storage.load_json('reviews')[0]
+        review_service._review_session.update(user_id=None, buffer=[])
+        answer = {'card_id': flushed['card_id'], 'quality': flushed['quality'], 'reviewed_at': flushed['reviewed_at']}
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(answer) + '\n{"card_id": 4, "qua')
+        
+        self.assertEqual(start_review_session()[2], 1)
+        self.assertFalse(journal_path.exists())
+        self.assertEqual(sorted(r['card_id'] for r in storage.load_json('reviews')), [1, 2, 3])
+        
+        self.assertTrue(end_review_session()[0])
+        self.assertFalse(record_answer(1, 5)[0])
+
+
+class TestSM2Batch(unittest.TestCase):
+    """Toplu SM-2 hesaplama testleri."""
+    
+    def columns(self):
+        import random
+        from array import array
+        
+        rng = random.Random(7)
+        rows = [
+            (rng.randrange(6), rng.randrange(-1, 12), round(rng.uniform(1.0, 3.2), rng.choice([2, 4])), rng.randrange(1, 400))
+            for _ in range(5000)
+        ]
+        # Kenar durumlar: alt sınır, tam sayı ef, yarım interval (5 * 2.5 = 12.5), ilk iki tekrar
+        rows += [(0, 3, 1.3, 10), (5, 4, 2, 7), (4, 5, 2.5, 5), (3, 3, 2.64, 5), (5, 0, 2.5, 1), (4, 1, 2.5, 1)]
+        qualities, repetitions, efs, intervals = zip(*rows)
+        return rows, (array('b', qualities), array('i', repetitions), array('d', efs), array('i', intervals))
+    
+    def test_matches_scalar(self):
+        """Saf Python yolu calculate_sm2 ile birebir aynı sonucu verir."""
+        from array import array
+        from review_service import calculate_sm2
+        from sm2_batch import calculate_sm2_batch
+        
+        rows, columns = self.columns()
+        result = calculate_sm2_batch(*columns, use_numpy=False)
+        self.assertEqual([type(column).__name__ for column in result], ['array'] * 3)
+        self.assertEqual(list(zip(*result)), [calculate_sm2(*row) for row in rows])
+        self.assertEqual(calculate_sm2_batch([], [], [], [], use_numpy=False), (array('i'), array('d'), array('q')))
+    
+    def test_validation_and_bench(self):
+        """Geçersiz sütunlar reddedilir; karşılaştırma komutu çalışır."""
+        import io
+        import sm2_batch
+        from contextlib import redirect_stdout
+        
+        with self.assertRaises(ValueError):
+            sm2_batch.calculate_sm2_batch([5, 4], [1], [2.5], [1], use_numpy=False)
+        with self.assertRaises(ValueError):
+            sm2_batch.calculate_sm2_batch([6], [1], [2.5], [1], use_numpy=False)
+        if sm2_batch.np is None:
+            with self.assertRaises(RuntimeError):
+                sm2_batch.calculate_sm2_batch([5], [1], [2.5], [1], use_numpy=True)
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(sm2_batch.main(['sm2_batch.py', 'bench', '2000']), 0)
+        self.assertNotIn('FARKLI', output.getvalue())
+        self.assertIn('aynı', output.getvalue())
+    
+    def test_numpy_matches_scalar(self):
+        """NumPy yolu calculate_sm2 ile birebir aynı sonucu verir."""
+        import sm2_batch
+        from review_service import calculate_sm2
+        
+        if sm2_batch.np is None:
+            self.skipTest("NumPy kurulu değil")
+        
+        rows, columns = self.columns()
+        result = sm2_batch.calculate_sm2_batch(*columns, use_numpy=True)
+        self.assertEqual(list(zip(*result)), [calculate_sm2(*row) for row in rows])
+
+
+class TestReviewRollups(unittest.TestCase):
+    """Günlük review özetleri testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        from auth import _current_session
+        from utils import get_today_ordinal, ordinal_to_date
+        
+        storage.save_json('decks', [{"id": 1, "user_id": 1, "name": "D1"}, {"id": 2, "user_id": 1, "name": "D2"}])
+        storage.save_json('cards', [{"id": i, "deck_id": 1 if i <= 3 else 2, "front": f"Q{i}", "back": "A"} for i in range(1, 7)])
+        storage.save_json('srs_state', [])
+        storage.save_json('reviews', [])
+        storage.save_json('review_rollups', [])
+        _current_session['user_id'] = 1
+        _current_session['logged_in'] = True
+        
+        today = get_today_ordinal()
+        self.days = [ordinal_to_date(today - offset) for offset in (0, 1, 2, 20)]
+    
+    def tearDown(self):
+        from auth import _current_session
+        
+        _current_session['user_id'] = None
+        _current_session['logged_in'] = False
+    
+    def rows(self):
+        import storage
+        
+        return sorted(
+            (r['user_id'], r['day'], r['deck_id'], r['count'], r['quality_sum'], tuple(r['histogram']))
+            for r in storage.load_json('review_rollups')
+        )
+    
+    def submit(self):
+        from review_service import submit_review, submit_reviews
+        
+        submit_review(1, 5)
+        submit_review(4, 2)
+        submit_reviews([
+            (2, 3, f"{self.days[1]}T10:00:00"), (5, 4, f"{self.days[1]}T11:00:00"),
+            (2, 1, f"{self.days[2]}T09:00:00"), (6, 0, f"{self.days[3]}T09:00:00")
+        ])
+    
+    def test_incremental_matches_rebuild(self):
+        """Review yazmaları özetleri yeniden kurulumla aynı sonuca getirir."""
+        import rollups
+        
+        self.submit()
+        incremental = self.rows()
+        self.assertEqual(len(incremental), 6)
+        self.assertIn((1, self.days[1], 1, 1, 3, (0, 0, 0, 1, 0, 0)), incremental)
+        
+        self.assertEqual(rollups.rebuild(), 6)
+        self.assertEqual(self.rows(), incremental)
+    
+    def test_deletes_update_rollups(self):
+        """Kart silme özetten çıkarır, deck silme deck'in özet satırlarını siler."""
+        import rollups
+        from card_service import delete_card
+        from deck_service import delete_deck
+        
+        self.submit()
+        self.assertTrue(delete_card(2)[0])
+        after_card = self.rows()
+        self.assertFalse([row for row in after_card if row[1] == self.days[2]])
+        rollups.rebuild()
+        self.assertEqual(self.rows(), after_card)
+        
+        self.assertTrue(delete_deck(2)[0])
+        self.assertEqual([row[2] for row in self.rows()], [1])
+    
+    def test_period_stats_read_rollups(self):
+        """N günlük rapor review'ları değil özet satırlarını okur."""
+        import rollups
+        from unittest import mock
+        from report_service import get_period_stats, get_weekly_stats, get_today_summary
+        
+        self.submit()
+        with mock.patch('rollups.iter_collection', wraps=rollups.iter_collection) as reads, \
+                mock.patch('storage.load_json', side_effect=AssertionError("tam tarama")):
+            weekly = get_weekly_stats()[2]
+            monthly = get_period_stats(30)[2]
+            summary = get_today_summary()[2]
+        self.assertEqual({call.args[0] for call in reads.call_args_list}, {'review_rollups'})
+        
+        self.assertEqual((weekly['total_reviews'], weekly['average_quality']), (5, 3.0))
+        self.assertEqual(weekly['quality_distribution'], [0, 1, 1, 1, 1, 1])
+        self.assertEqual(weekly['daily_breakdown'][1], {'date': self.days[1], 'count': 2, 'avg_quality': 3.5})
+        self.assertEqual((monthly['period'], monthly['total_reviews'], len(monthly['daily_breakdown'])), ('Son 30 gün', 6, 30))
+        self.assertEqual((summary['reviewed_today'], summary['average_quality']), (2, 3.5))
+        self.assertFalse(get_period_stats(0)[0])
+    
+    def test_today_summary_ignores_future_rows(self):
+        """Bugün özeti ve dönem raporu yarın ve sonrasına tarihli özet satırlarını saymaz."""
+        import storage
+        from report_service import get_today_summary, get_weekly_stats
+        from utils import get_today_ordinal, ordinal_to_date
+        
+        self.submit()
+        for offset in (1, 33):
+            storage.insert('review_rollups', {
+                "user_id": 1, "day": ordinal_to_date(get_today_ordinal() + offset), "deck_id": 1,
+                "count": 1, "quality_sum": 0, "histogram": [1, 0, 0, 0, 0, 0]
+            })
+        summary = get_today_summary()[2]
+        self.assertEqual((summary['reviewed_today'], summary['average_quality']), (2, 3.5))
+        self.assertEqual(get_weekly_stats()[2]['total_reviews'], 5)
+    
+    def test_merge_uses_user_index(self):
+        """Özet güncellemesi koleksiyonu taramaz, user_id indeksinden okur."""
+        import rollups
+        from unittest import mock
+        
+        self.submit()
+        with mock.patch('rollups.iter_collection', side_effect=AssertionError("tarama")) as scans, \
+                mock.patch('rollups.ensure_built', return_value=False):
+            self.submit()
+        self.assertFalse(scans.called)
+        self.assertEqual([row[3] for row in self.rows()], [2] * 6)
+    
+    def test_builds_from_existing_reviews(self):
+        """Özetler boşken review geçmişi varsa ilk okuma ve ilk yazma özetleri kurar."""
+        import rollups
+        import storage
+        from report_service import get_period_stats
+        
+        self.submit()
+        expected = self.rows()
+        storage.save_json('review_rollups', [])
+        self.assertEqual(get_period_stats(30)[2]['total_reviews'], 6)
+        self.assertEqual(self.rows(), expected)
+        
+        storage.save_json('review_rollups', [])
+        self.submit()
+        self.assertEqual(self.rows(), [row[:3] + (2 * row[3], 2 * row[4], tuple(2 * h for h in row[5])) for row in expected])
+        self.assertFalse(rollups.ensure_built())
+
+
+class TestAllDecksReport(unittest.TestCase):
+    """Tek geçişli çoklu deck raporu testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import random
+        import storage
+        from auth import _current_session
+        
+        rng = random.Random(22)
+        storage.save_json('decks', [{"id": d, "user_id": 1 if d <= 8 else 2, "name": f"D{d}"} for d in range(1, 11)])
+        storage.save_json('cards', [{"id": i, "deck_id": rng.randrange(1, 8), "front": "Q"} for i in range(1, 401)])
+        storage.save_json('srs_state', [
+            {"id": i, "user_id": rng.choice([1, 1, 1, 2]), "card_id": rng.randrange(1, 450),
+             "due_date": f"2026-10-{rng.randrange(1, 31):02d}", "ef": round(rng.uniform(1.3, 3.0), 2)}
+            for i in range(1, 601)
+        ])
+        _current_session['user_id'] = 1
+        _current_session['logged_in'] = True
+    
+    def tearDown(self):
+        from auth import _current_session
+        
+        _current_session['user_id'] = None
+        _current_session['logged_in'] = False
+    
+    def test_matches_per_deck_report(self):
+        """Tüm deck'lerin raporu get_deck_report ile birebir aynıdır (kartsız deck dahil)."""
+        from report_service import get_all_decks_report, get_deck_report
+        
+        success, msg, reports = get_all_decks_report()
+        self.assertTrue(success)
+        self.assertEqual([r['deck_id'] for r in reports], list(range(1, 9)))
+        self.assertEqual(reports, [get_deck_report(deck_id)[2] for deck_id in range(1, 9)])
+        self.assertEqual(reports[7]['total_cards'], 0)
+        self.assertEqual(reports[7]['average_ef'], 2.5)
+    
+    def test_single_pass(self):
+        """Rapor deck başına sorgu yapmaz ve SRS satırlarını bir kez tarar."""
+        import srs_store
+        from unittest import mock
+        from report_service import get_all_decks_report
+        
+        with mock.patch('deck_service.get_deck', side_effect=AssertionError("deck başına sorgu")), \
+                mock.patch('storage.load_json', side_effect=AssertionError("tam tarama")), \
+                mock.patch.object(srs_store.SRSStore, 'count_due', side_effect=AssertionError("deck başına tarama")):
+            self.assertEqual(len(get_all_decks_report()[2]), 8)
+    
+    def test_deck_groups(self):
+        """deck_groups her deck için count_due ve ef_values ile aynı sonucu verir."""
+        import storage
+        from srs_store import get_store
+        from utils import date_to_ordinal
+        
+        store = get_store(1)
+        today = date_to_ordinal('2026-10-15')
+        cards = storage.load_json('cards')
+        groups = store.deck_groups(1, today, {c['id']: c['deck_id'] for c in cards})
+        
+        for deck_id in range(1, 8):
+            card_ids = {c['id'] for c in cards if c['deck_id'] == deck_id}
+            due_count, ef_values = groups.get(deck_id, (0, []))
+            self.assertEqual(due_count, store.count_due(1, today, card_ids))
+            self.assertEqual(list(ef_values), list(store.ef_values(1, card_ids)))
+        self.assertEqual(store.deck_groups(3, today, {1: 1}), {})
+
+
+class TestReportCache(unittest.TestCase):
+    """Rapor sonuç önbelleği testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import storage
+        from auth import _current_session
+        from report_service import clear_report_cache
+        from utils import get_today_str
+        
+        storage.save_json('decks', [{"id": d, "user_id": 1, "name": f"D{d}"} for d in range(1, 4)])
+        storage.save_json('cards', [{"id": i, "deck_id": i % 3 + 1, "front": "Q"} for i in range(1, 31)])
+        storage.save_json('srs_state', [
+            {"id": i, "user_id": 1, "card_id": i, "due_date": get_today_str(), "ef": 2.5}
+            for i in range(1, 31)
+        ])
+        storage.save_json('reviews', [])
+        storage.save_json('review_rollups', [])
+        clear_report_cache()
+        _current_session['user_id'] = 1
+        _current_session['logged_in'] = True
+    
+    def tearDown(self):
+        from auth import _current_session
+        from report_service import clear_report_cache
+        
+        _current_session['user_id'] = None
+        _current_session['logged_in'] = False
+        clear_report_cache()
+    
+    def test_repeated_call_served_from_cache(self):
+        """Veri değişmediyse rapor yeniden hesaplanmaz; dönen sonuç önbelleği etkilemez."""
+        from unittest import mock
+        import report_service
+        
+        with mock.patch('report_service.get_rollups', wraps=report_service.get_rollups) as rollups:
+            first = report_service.get_weekly_stats()
+            first[2]['total_reviews'] = 99
+            second = report_service.get_weekly_stats()
+        
+        self.assertEqual(rollups.call_count, 1)
+        self.assertEqual(second[2]['total_reviews'], 0)
+        self.assertEqual(report_service.get_report_cache_stats()['hits'], 1)
+        
+        self.assertEqual(report_service.get_deck_report(1), report_service.get_deck_report(1))
+        self.assertNotEqual(report_service.get_deck_report(1), report_service.get_deck_report(2))
+    
+    def test_writes_invalidate(self):
+        """İlgili koleksiyonlara yazılınca rapor yeniden hesaplanır."""
+        import storage
+        from report_service import get_today_summary, get_all_decks_report
+        from review_service import submit_review
+        
+        self.assertEqual(get_today_summary()[2]['reviewed_today'], 0)
+        self.assertEqual(get_all_decks_report()[2][0]['total_cards'], 10)
+        
+        self.assertTrue(submit_review(1, 5)[0])
+        summary = get_today_summary()[2]
+        self.assertEqual(summary['reviewed_today'], 1)
+        self.assertEqual(summary['due_cards'], 29)
+        
+        storage.insert('cards', {"deck_id": 1, "front": "Yeni"})
+        self.assertEqual(get_all_decks_report()[2][0]['total_cards'], 11)
+        
+        with storage.transaction():
+            storage.insert('cards', {"deck_id": 1, "front": "Yeni 2"})
+            self.assertEqual(get_all_decks_report()[2][0]['total_cards'], 12)
+    
+    def test_day_rollover_and_size_cap(self):
+        """Gün değişince bugünün raporu yeniden hesaplanır; önbellek boyutu sınırlıdır."""
+        from unittest import mock
+        import report_service
+        from utils import get_today_ordinal
+        
+        self.assertEqual(report_service.get_today_summary()[2]['due_cards'], 30)
+        with mock.patch('report_service.get_today_ordinal', return_value=get_today_ordinal() - 1):
+            self.assertEqual(report_service.get_today_summary()[2]['due_cards'], 0)
+        self.assertEqual(report_service.get_report_cache_stats()['hits'], 0)
+        
+        with mock.patch('report_service.REPORT_CACHE_SIZE', 2):
+            for deck_id in (1, 2, 3):
+                report_service.get_deck_report(deck_id)
+            self.assertEqual(report_service.get_report_cache_stats()['entries'], 2)
+            report_service.get_deck_report(3)
+            self.assertEqual(report_service.get_report_cache_stats()['hits'], 1)
+
+
+class TestDueForecast(unittest.TestCase):
+    """Due yükü tahmini testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def setUp(self):
+        import random
+        import storage
+        from auth import _current_session
+        from report_service import clear_report_cache
+        from utils import get_today_ordinal, ordinal_to_date
+        
+        rng = random.Random(24)
+        today = get_today_ordinal()
+        storage.save_json('decks', [{"id": d, "user_id": 1 if d <= 3 else 2, "name": f"D{d}"} for d in range(1, 5)])
+        storage.save_json('cards', [{"id": i, "deck_id": i % 4 + 1, "front": "Q"} for i in range(1, 201)])
+        storage.save_json('srs_state', [
+            {"id": i, "user_id": 1 if i % 4 + 1 <= 3 else 2, "card_id": i,
+             "due_date": ordinal_to_date(today + rng.randrange(-5, 60)), "ef": round(rng.uniform(1.3, 3.0), 2),
+             "repetition": rng.randrange(4), "interval_days": rng.randrange(1, 30)}
+            for i in range(1, 201)
+        ])
+        storage.save_json('review_rollups', [
+            {"id": 1, "user_id": 1, "day": ordinal_to_date(today - 3), "deck_id": 1,
+             "count": 10, "quality_sum": 38, "histogram": [1, 0, 1, 2, 3, 3]}
+        ])
+        clear_report_cache()
+        _current_session['user_id'] = 1
+        _current_session['logged_in'] = True
+    
+    def tearDown(self):
+        from auth import _current_session
+        
+        _current_session['user_id'] = None
+        _current_session['logged_in'] = False
+    
+    def test_histogram_and_prefix_sums(self):
+        """Gecikmiş kartlar bugüne sayılır, ufuk dışındakiler sayılmaz."""
+        from forecast import due_histogram, prefix_sums
+        
+        counts = due_histogram([0, 95, 99, 100, 100, 102, 104, 200], 100, 5)
+        self.assertEqual(counts, [5, 0, 1, 0, 1])
+        self.assertEqual(prefix_sums(counts), [5, 5, 6, 6, 7])
+    
+    def test_projection_follows_sm2(self):
+        """Tek kaliteli geçmişte projeksiyon calculate_sm2'nin planını birebir izler."""
+        import storage
+        from forecast import forecast_user
+        from review_service import calculate_sm2
+        from utils import get_today_ordinal, ordinal_to_date
+        
+        today = get_today_ordinal()
+        storage.save_json('srs_state', [
+            {"id": 1, "user_id": 1, "card_id": 1, "due_date": ordinal_to_date(today), "ef": 2.5,
+             "repetition": 0, "interval_days": 1}
+        ])
+        storage.save_json('review_rollups', [
+            {"id": 1, "user_id": 1, "day": ordinal_to_date(today), "deck_id": 2,
+             "count": 2, "quality_sum": 10, "histogram": [0, 0, 0, 0, 0, 2]}
+        ])
+        
+        expected = [0.0] * 60
+        day, state = 0, (0, 2.5, 1)
+        while day < 60:
+            expected[day] = 1.0
+            state = calculate_sm2(5, *state)
+            day += state[2]
+        
+        result = forecast_user(1, today, 60)
+        self.assertEqual(result['projected'], expected)
+        self.assertEqual(result['scheduled'], [1] + [0] * 59)
+        self.assertEqual(result['cumulative'][-1], sum(expected))
+        self.assertEqual(list(result['by_deck']), [2])
+    
+    def test_zero_interval_row(self):
+        """Interval'i 0 olan çalışılmış kart aynı güne değil ertesi güne planlanır."""
+        from forecast import project
+        
+        self.assertEqual(project([(1, 100, 2, 2.5, 0)], 100, 5, [0, 0, 0, 0, 0, 1]), {1: [1.0] * 5})
+    
+    def test_report(self):
+        """Rapor kullanıcının deck'lerini toplar, tekrarlanabilir ve gün sayısını doğrular."""
+        import report_service
+        from report_service import get_due_forecast
+        
+        success, msg, forecast = get_due_forecast(30)
+        self.assertTrue(success)
+        self.assertEqual(len(forecast['projected']), 30)
+        self.assertEqual([d['deck_id'] for d in forecast['decks']], [1, 2, 3])
+        self.assertEqual(sum(d['scheduled'] for d in forecast['decks']), sum(forecast['scheduled']))
+        self.assertAlmostEqual(sum(d['projected'] for d in forecast['decks']), forecast['cumulative'][-1], delta=0.5)
+        self.assertGreaterEqual(forecast['cumulative'][-1], sum(forecast['scheduled']))
+        self.assertEqual(forecast['quality_distribution'], [0.1, 0.0, 0.1, 0.2, 0.3, 0.3])
+        
+        report_service.clear_report_cache()
+        self.assertEqual(get_due_forecast(30)[2], forecast)
+        
+        self.assertEqual(get_due_forecast(365, deck_id=2)[2]['decks'][0]['deck_id'], 2)
+        self.assertFalse(get_due_forecast(30, deck_id=4)[0])
+        self.assertFalse(get_due_forecast(0)[0])
+        self.assertFalse(get_due_forecast(366)[0])
+
+
+class TestSimulator(unittest.TestCase):
+    """Monte Carlo zamanlama simülatörü testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+    
+    def expected_schedule(self, days, modifier=1.0):
+        """Hep 5 verilen tek yeni kartın review günleri."""
+        from review_service import calculate_sm2
+        
+        expected = [0] * days
+        day, state = 0, (0, 2.5, 0)
+        while day < days:
+            expected[day] = 1
+            repetition, ef, interval = calculate_sm2(5, *state)
+            if modifier != 1.0:
+                interval = max(round(interval * modifier), 1)
+            state = (repetition, ef, interval)
+            day += interval
+        return expected
+    
+    def test_quality_model(self):
+        """Kalite dağılımı ardışık review'lar arasındaki gün farkına göre çıkarılır."""
+        import storage
+        from simulator import quality_model
+        
+        reviews = []
+        for card_id in range(1, 26):
+            reviews.append({"user_id": 1, "card_id": card_id, "quality": 4, "reviewed_at": "2026-10-01T09:00:00"})
+            reviews.append({"user_id": 1, "card_id": card_id, "quality": 2, "reviewed_at": "2026-10-02T09:00:00"})
+        reviews.append({"user_id": 2, "card_id": 99, "quality": 0, "reviewed_at": "2026-10-01T09:00:00"})
+        storage.save_json('reviews', [dict(r, id=i) for i, r in enumerate(reviews, 1)])
+        
+        model = quality_model(1)
+        self.assertEqual(model[0], [0, 0, 0, 0, 1, 0])
+        self.assertEqual(model[1], [0, 0, 1, 0, 0, 0])
+        self.assertEqual(model[5], [0, 0, 0.5, 0, 0.5, 0])
+        self.assertEqual(quality_model(3)[2], [0, 0, 0, 0, 1, 0])
+    
+    def test_schedule_matches_sm2(self):
+        """Tek kaliteli modelde her deneme calculate_sm2'nin planını izler; çarpan interval'leri ölçekler."""
+        from simulator import simulate, synthetic_population
+        
+        model = [[0, 0, 0, 0, 0, 1]] * 8
+        result = simulate(synthetic_population(1), model, days=120, trials=3, workers=1)
+        self.assertEqual(result['reviews'], self.expected_schedule(120))
+        self.assertEqual(sum(result['lapses']), 0)
+        self.assertEqual(result['retention'], 1.0)
+        
+        result = simulate(synthetic_population(1), model, {'interval_modifier': 0.5}, days=120, trials=1, workers=1)
+        self.assertEqual(result['reviews'], self.expected_schedule(120, 0.5))
+        
+        with self.assertRaises(ValueError):
+            simulate(synthetic_population(1), model, {'bilinmeyen': 1})
+    
+    def test_zero_interval_row(self):
+        """Interval'i 0 olan çalışılmış kart aynı güne değil ertesi güne planlanır."""
+        from simulator import simulate
+        
+        model = [[0, 0, 0, 0, 0, 1]] * 8
+        self.assertEqual(simulate([(0, 2, 2.5, 0)], model, days=5, trials=1, workers=1)['reviews'], [1] * 5)
+    
+    def test_parallel_is_deterministic(self):
+        """Sonuç işçi sayısından bağımsızdır; CLI parametreleri karşılaştırır."""
+        import io
+        from contextlib import redirect_stdout
+        from simulator import simulate, synthetic_population, main
+        
+        model = [[0.1, 0.05, 0.05, 0.2, 0.4, 0.2]] * 8
+        population = synthetic_population(200)
+        serial = simulate(population, model, days=90, trials=4, new_per_day=5, workers=1)
+        parallel = simulate(population, model, days=90, trials=4, new_per_day=5, workers=2)
+        self.assertEqual(serial, parallel)
+        self.assertLessEqual(serial['retention_min'], serial['retention'])
+        self.assertLessEqual(serial['retention'], serial['retention_max'])
+        
+        longer = simulate(population, model, {'interval_modifier': 2.0}, days=90, trials=4, new_per_day=5, workers=1)
+        self.assertLess(longer['total_reviews'], serial['total_reviews'])
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(main(['simulator.py', 'compare', '1.0', '1.5', '--cards', '50', '--days', '30',
+                                   '--trials', '2', '--workers', '1']), 0)
+            self.assertEqual(main(['simulator.py', 'compare', '--days', 'x']), 1)
+        self.assertEqual(len(output.getvalue().splitlines()), 2 + 2 + 2)
+
+
+class TestSM2Algorithm(unittest.TestCase):
+    """SM-2 algoritması testi."""
+    
+    def test_sm2_quality_zero(self):
+        """Kalite 0 ise repetition sıfırlanır."""
+        from review_service import calculate_sm2
+        
+        rep, ef, interval = calculate_sm2(0, 3, 2.5, 10)
+        
+        self.assertEqual(rep, 0)
+        self.assertEqual(interval, 1)
+    
+    def test_sm2_quality_five(self):
+        """Kalite 5 ise interval artar."""
+        from review_service import calculate_sm2
+        
+        rep, ef, interval = calculate_sm2(5, 0, 2.5, 1)
+        self.assertEqual(rep, 1)
+        self.assertEqual(interval, 1)
+        
+        rep, ef, interval = calculate_sm2(5, 1, ef, 1)
+        self.assertEqual(rep, 2)
+        self.assertEqual(interval, 6)
+        
+        rep, ef, interval = calculate_sm2(5, 2, ef, 6)
+        self.assertEqual(rep, 3)
+        self.assertGreater(interval, 6)
+    
+    def test_sm2_ef_minimum(self):
+        """EF minimum 1.3 olmalı."""
+        from review_service import calculate_sm2
+        
+        rep, ef, interval = calculate_sm2(0, 3, 1.5, 10)
+        
+        self.assertGreaterEqual(ef, 1.3)
+
+
+class TestBackupService(unittest.TestCase):
+    """Yedekleme servisi testleri."""
+    
+    @classmethod
+    def setUpClass(cls):
+        setup_test_environment()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cleanup_test_environment()
+        backup_dir = Path(__file__).parent / "test_backups"
+        if backup_dir.exists():
+            shutil.rmtree(backup_dir)
+    
+    def setUp(self):
+        """Test ortamını hazırla."""
+        import storage
+        import backup_service
+        
+        backup_service.DATA_DIR = TEST_DATA_DIR
+        backup_service.BACKUP_DIR = Path(__file__).parent / "test_backups"
+        
+        storage.save_json('cards', [
+            {"id": 1, "front": "Test", "back": "Answer"}
+        ])
+    
+    def test_create_backup(self):
+        """Yedek oluşturma testi."""
+        from backup_service import create_backup, BACKUP_DIR
+        
+        success, msg = create_backup()
+        
+        self.assertTrue(success)
+        self.assertIn("Yedek oluşturuldu", msg)
+        
+        self.assertTrue(BACKUP_DIR.exists())
+    
+    def test_list_backups(self):
+        """Yedek listeleme testi."""
+        from backup_service import create_backup, list_backups
+        
+        create_backup()
+        
+        success, msg, backups = list_backups()
+        
+        self.assertTrue(success)
+        self.assertGreater(len(backups), 0)
+    
+    def test_export_csv(self):
+        """CSV dışa aktarma testi."""
+        from backup_service import export_to_csv, BACKUP_DIR
+        
+        success, msg = export_to_csv()
+        
+        self.assertTrue(success)
+        self.assertIn("CSV", msg)
+    
+    def test_export_csv_sharded(self):
+        """Sharding açıkken kartlar shard dosyalarından dışa aktarılır; kart yoksa hata döner."""
+        import csv
+        import storage
+        from backup_service import export_to_csv, BACKUP_DIR
+        
+        output_path = BACKUP_DIR / "sharded_export.csv"
+        storage.set_sharding(True)
+        try:
+            storage.save_json('decks', [{"id": 1, "user_id": 1, "name": "D1"}])
+            storage.save_json('cards', [{"id": 7, "deck_id": 1, "front": "Q", "back": "A"}])
+            self.assertEqual(len(storage.load_json('cards')), 1)
+            
+            success, msg = export_to_csv(str(output_path))
+            self.assertTrue(success)
+            with open(output_path, encoding='utf-8', newline='') as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[1][:4], ['7', '1', 'Q', 'A'])
+            
+            storage.save_json('cards', [])
+            self.assertEqual(export_to_csv(str(output_path)), (False, "Dışa aktarılacak kart bulunamadı."))
+        finally:
+            storage.set_sharding(False)
+            shutil.rmtree(TEST_DATA_DIR / storage.SHARD_DIR, ignore_errors=True)
+            storage.clear_cache()
 
 
 if __name__ == '__main__':
@@ -5,7 +5,14 @@ Tarih işlemleri, input doğrulama ve genel yardımcı fonksiyonlar.
 """
 
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
+
+# Bugünün gün numarası ve geçerli olduğu son an (bkz. get_today_ordinal)
+_today = {
+    'ordinal': None,
+    'expires': 0.0
+}
 
 
 def validate_email(email: str) -> bool:
@@ -77,6 +84,21 @@ def get_today() -> datetime:
     return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
 
+def get_today_ordinal() -> int:
+    """
+    Bugünün gün numarasını (date.toordinal) döndürür.
+    Değer gece yarısına kadar önbellekte tutulur; çağrı başına sadece saat okunur.
+    
+    Returns:
+        int: Bugünün gün numarası
+    """
+    if time.time() >= _today['expires']:
+        today = date.today()
+        _today['ordinal'] = today.toordinal()
+        _today['expires'] = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+    return _today['ordinal']
+
+
 def get_today_str() -> str:
     """
     Bugünün tarihini string olarak döndürür.
@@ -84,26 +106,53 @@ def get_today_str() -> str:
     Returns:
         str: YYYY-MM-DD formatında bugün
     """
-    return format_date(get_today())
+    return ordinal_to_date(get_today_ordinal())
 
 
 def add_days(date_str: str, days: int) -> str:
     """
-    Tarihe gün ekler.
+    Tarihe gün ekler. Hesap gün numaraları üzerinde yapılır.
     
     Args:
-        date_str: YYYY-MM-DD formatında başlangıç tarihi
+        date_str: YYYY-MM-DD formatında başlangıç tarihi (geçersizse bugün)
         days: Eklenecek gün sayısı
     
     Returns:
         str: YYYY-MM-DD formatında yeni tarih
     """
-    dt = parse_date(date_str)
-    if dt is None:
-        dt = get_today()
+    ordinal = date_to_ordinal(date_str)
+    if ordinal is None:
+        ordinal = get_today_ordinal()
+    return ordinal_to_date(ordinal + days)
+
+
+def date_to_ordinal(date_str: str) -> int | None:
+    """
+    YYYY-MM-DD (veya ISO tarih/saat) string'ini gün numarasına çevirir.
     
-    new_dt = dt + timedelta(days=days)
-    return format_date(new_dt)
+    Args:
+        date_str: Tarih
+    
+    Returns:
+        int | None: date.toordinal() değeri veya tarih geçersizse None
+    """
+    try:
+        return date.fromisoformat(date_str[:10]).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def ordinal_to_date(ordinal: int) -> str:
+    """
+    Gün numarasını YYYY-MM-DD formatına çevirir.
+    
+    Args:
+        ordinal: date.toordinal() değeri
+    
+    Returns:
+        str: YYYY-MM-DD formatında tarih
+    """
+    return date.fromordinal(ordinal).isoformat()
 
 
 def is_due(due_date_str: str) -> bool:
@@ -116,11 +165,11 @@ def is_due(due_date_str: str) -> bool:
     Returns:
         bool: Due ise True
     """
-    due_date = parse_date(due_date_str)
+    due_date = date_to_ordinal(due_date_str)
     if due_date is None:
         return True  # Tarih geçersizse due say
     
-    return due_date <= get_today()
+    return due_date <= get_today_ordinal()
 
 
 def get_quality_description(quality: int) -> str: